@@ -1,4 +1,4 @@
-from fastapi import Request, status, HTTPException
+from fastapi import Depends, Request, status, HTTPException
 from app.domain.entities.user import User
 
 # Dependency to get the current user 
@@ -6,4 +6,10 @@ async def get_current_user(request: Request) -> User:
     user: User = request.state.user
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    return user
\ No newline at end of file
+    return user
+
+# Dependency for operator-only endpoints
+async def get_current_admin(user: User = Depends(get_current_user)) -> User:
+    if "admin" not in (user.roles or []):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin permissions required")
+    return user
@@ -36,6 +36,14 @@ async def signout(signout_request: SignoutRequest, request: Request):
 
     return {"msg": "Successfully logged out"}
 
+@auth_router.post("/signout/all")
+async def signout_everywhere(request: Request):
+    user = request.state.user
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    await AuthService.signout_everywhere(user.id)
+    return {"msg": "Successfully logged out of all sessions"}
+
 @auth_router.post("/token/verify")
 async def verify_token(payload: TokenVerifyRequest):
     is_valid = await AuthService.verify_token(payload.token)
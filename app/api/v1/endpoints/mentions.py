@@ -1,27 +1,58 @@
-from fastapi import APIRouter, HTTPException, Body
-from typing import List, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, status
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
 from uuid import UUID
+from app.domain.entities.user import User
 from app.domain.services.mention_service import MentionService
-from app.models.mention import MentionIds, MentionResponse, MentionCreate
+from app.api.v1.dependencies.get_current_user import get_current_user
+from app.models.mention import MentionIds, MentionPage, MentionReadResult, MentionResponse, MentionCreate
+from app.core.responses import json_response
+from app.utils.conditional import Conditional
 
 mention_router = APIRouter(prefix="/mentions")
 
-@mention_router.get("/{user_id}", response_model=List[MentionResponse])
-async def get_mentions(user_id: UUID):
-    return await MentionService.get_mentions(user_id)
+@mention_router.get("/{user_id}", response_model=Union[MentionPage, List[MentionResponse]])
+async def get_mentions(
+    user_id: UUID,
+    conditional: Conditional = Depends(),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; pass an empty value to start cursor pagination; without it only the newest 100 mentions are returned")
+):
+    try:
+        if cursor is not None:
+            result = await MentionService.get_mentions_page(user_id, limit, cursor, conditional)
+        else:
+            result = await MentionService.get_mentions(user_id, conditional)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response = json_response(result)
+    conditional.apply(response)
+    return response
+
+@mention_router.get("/{user_id}/unread-count")
+async def get_unread_count(user_id: UUID, user: User = Depends(get_current_user)):
+    return {"unread_count": await MentionService.get_unread_count(user_id, user)}
 
 @mention_router.put("/{mention_id}/read", response_model=MentionResponse)
-async def mark_as_read_by_id(mention_id: UUID):
-    mention = await MentionService.mark_as_read([mention_id])
-    if not mention:
-        raise HTTPException(status_code=404, detail="Mention not found")
-    return mention
+async def mark_as_read_by_id(
+    mention_id: UUID,
+    post_id: UUID = Query(..., description="The post or reply containing the mention"),
+    user: User = Depends(get_current_user)
+):
+    return await MentionService.mark_one_as_read(post_id, mention_id, user)
 
-@mention_router.put("/read", response_model=List[MentionResponse])
-async def mark_as_read(payload: MentionIds):
-    print(payload, type(payload))
+@mention_router.put("/read", response_model=MentionReadResult, response_model_exclude_none=True)
+async def mark_as_read(payload: MentionIds, include_rows: bool = Query(False), user: User = Depends(get_current_user)):
     mention_tuples = [(UUID(m[0]), UUID(m[1])) for m in payload.mention_ids]
-    mentions = await MentionService.mark_as_read(mention_tuples)
-    if not mentions:
+    result = await MentionService.mark_as_read(mention_tuples, user, include_rows)
+    if not result.found:
         raise HTTPException(status_code=404, detail="No mentions found")
-    return mentions
\ No newline at end of file
+    return result
+
+@mention_router.put("/{user_id}/read-all", response_model=MentionReadResult, response_model_exclude_none=True)
+async def mark_all_as_read(
+    user_id: UUID,
+    up_to: Optional[datetime] = Query(None, description="Mark mentions created up to this time; defaults to now"),
+    user: User = Depends(get_current_user)
+):
+    return await MentionService.mark_all_as_read(user_id, user, up_to)
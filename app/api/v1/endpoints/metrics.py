@@ -0,0 +1,16 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends
+from app.api.v1.dependencies.get_current_user import get_current_admin
+from app.core.statements import statements
+from app.utils.cache import CACHES
+
+# Statement text, latencies and cache sizes are operator data
+metrics_router = APIRouter(prefix="/metrics", dependencies=[Depends(get_current_admin)])
+
+@metrics_router.get("/statements", response_model=List[Dict[str, Any]])
+async def get_statement_metrics():
+    return statements.stats()
+
+@metrics_router.get("/caches", response_model=List[Dict[str, Any]])
+async def get_cache_metrics():
+    return [cache.stats() for cache in CACHES.values()]
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from typing import List, Optional, Union
 from uuid import UUID
 
 from app.domain.entities.user import User
-from app.schemas.news import NewsCreate, NewsResponse, NewsUpdate
+from app.schemas.news import NewsCreate, NewsPage, NewsResponse, NewsUpdate
 from app.domain.services.news_service import NewsService
 from app.api.v1.dependencies.get_current_user import get_current_user
+from app.utils.conditional import Conditional
 
 news_router = APIRouter(prefix="/news", tags=["News"])
 
@@ -13,9 +14,22 @@ news_router = APIRouter(prefix="/news", tags=["News"])
 async def create_news(news: NewsCreate, user: User = Depends(get_current_user)):
     return await NewsService.create_news(news_create=news, user=user)
 
-@news_router.get("/", response_model=List[NewsResponse])
-async def get_all_news():
-    return await NewsService.get_all_news()
+@news_router.get("/", response_model=Union[NewsPage, List[NewsResponse]])
+async def get_all_news(
+    response: Response,
+    conditional: Conditional = Depends(),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; pass an empty value to start cursor pagination; without it only the newest 100 items are returned")
+):
+    try:
+        if cursor is None:
+            result = await NewsService.get_all_news(conditional)
+        else:
+            result = await NewsService.get_news_page(page_size, cursor, conditional)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    conditional.apply(response)
+    return result
 
 @news_router.get("/{news_id}", response_model=NewsResponse)
 async def get_news_item(news_id: UUID):
@@ -1,8 +1,11 @@
-from typing import List
+from typing import List, Literal, Optional, Union
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, Request, status, Query
-from app.models.post import EvaluateRequest, EvaluateResponse, PostBase, PostResponse, PostCreate, PostUpdate, ReplyCreate, ReplyResponse, ReplyUpdate
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from app.models.post import EvaluateRequest, EvaluateResponse, PostBase, PostFeedPage, PostResponse, PostCreate, PostUpdate, ReplyCreate, ReplyResponse, ReplyThreadPage, ReplyUpdate, TagCount
 from app.domain.services.post_service import PostService
+from app.domain.services.reply_service import ReplyService
+from app.core.responses import json_response
+from app.utils.conditional import Conditional
 
 post_router = APIRouter(prefix="/posts")
 
@@ -26,22 +29,54 @@ async def evaluate_post(request: EvaluateRequest):
     # score = PostService.evaluate_content(request.content)
     return {"score": 9}
 
-@post_router.get("/getAll", response_model=List[PostResponse])    
+@post_router.get("/getAll", response_model=Union[PostFeedPage, List[PostResponse]])
 async def get_all_posts(
+    conditional: Conditional = Depends(),
     page: int = Query(1, ge=1), 
-    page_size: int = Query(10, ge=1, le=100)
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; pass an empty value to start cursor pagination"),
+    sort: Literal["new", "hot", "top", "rising"] = Query("new"),
+    tag: Optional[str] = Query(None, description="Only posts carrying this tag, newest first, always cursor-paginated")
 ):
     try:
-        posts = await PostService.get_all(page, page_size)
-        return posts
+        if tag is not None:
+            if sort != "new":
+                raise ValueError("Tag feeds only support sort=new")
+            result = await PostService.get_tag_feed(tag, page_size, cursor or None, conditional)
+        elif sort != "new":
+            if cursor is not None:
+                result = await PostService.get_ranked_feed(sort, page_size, cursor, conditional)
+            else:
+                result = await PostService.get_ranked(sort, page, page_size, conditional)
+        elif cursor is not None:
+            result = await PostService.get_feed(page_size, cursor, conditional)
+        else:
+            result = await PostService.get_all(page, page_size, conditional)
+        response = json_response(result)
+        conditional.apply(response)
+        return response
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@post_router.get("/tags", response_model=List[TagCount])
+async def get_tags(limit: int = Query(100, ge=1, le=1000)):
+    try:
+        return await PostService.get_tags(limit)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @post_router.get("/getPost/{post_id}", response_model=PostResponse)
-async def get_post(post_id: UUID):
+async def get_post(post_id: UUID, conditional: Conditional = Depends()):
     try:
-        post = await PostService.get_post(post_id)
-        return post
+        response = json_response(await PostService.get_post(post_id, conditional))
+        conditional.apply(response)
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -69,6 +104,21 @@ async def reply_post(reply: ReplyCreate):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@post_router.get("/{post_id}/replies", response_model=ReplyThreadPage)
+async def get_replies(
+    post_id: UUID,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page of replies"),
+    max_depth: int = Query(8, ge=0, le=32),
+    per_level: int = Query(20, ge=1, le=200)
+):
+    try:
+        return await ReplyService.get_thread(post_id, limit, cursor, max_depth, per_level)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
 @post_router.put("/reply/update/{reply_id}")
 async def update_reply(reply_id: UUID, reply_update: ReplyUpdate):
     try:
@@ -86,10 +136,17 @@ async def delete_post(reply_id: UUID):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-@post_router.get("/getPostsByUserID/{user_id}", response_model=List[PostResponse])
-async def get_posts_by_user_id(user_id: UUID):
+@post_router.get("/getPostsByUserID/{user_id}", response_model=Union[PostFeedPage, List[PostResponse]])
+async def get_posts_by_user_id(
+    user_id: UUID,
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; pass an empty value to start cursor pagination; without it only the newest 100 posts are returned")
+):
     try:
-        posts = await PostService.get_posts_by_user_id(user_id)
-        return posts
+        if cursor is not None:
+            return json_response(await PostService.get_posts_by_user_page(user_id, page_size, cursor))
+        return json_response(await PostService.get_posts_by_user_id(user_id))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,18 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from app.models.search import SearchKind, SearchPage
+from app.domain.services.search_service import SearchService
+
+search_router = APIRouter(prefix="/search")
+
+@search_router.get("", response_model=SearchPage)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms; the last term also matches as a prefix"),
+    type: Optional[SearchKind] = Query(None, description="Only return posts, replies or news"),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page of results")
+):
+    try:
+        return await SearchService.search(q, type, page_size, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
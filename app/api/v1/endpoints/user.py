@@ -1,8 +1,11 @@
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, Request, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
+from app.api.v1.dependencies.get_current_user import get_current_user
+from app.domain.entities.user import User
 from app.domain.services.user_service import UserService
-from app.schemas.user import UserResponse, UserUpdate
+from app.schemas.user import FollowPage, UserResponse, UserUpdate
+from app.utils.conditional import Conditional
 
 user_router = APIRouter(prefix="/user")
 
@@ -15,12 +18,25 @@ async def get_all_users():
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
+@user_router.get("/me", response_model=UserResponse)
+async def get_me(response: Response, conditional: Conditional = Depends(), user: User = Depends(get_current_user)):
+    # Served from the in-process profile cache; clients may reuse it briefly and then revalidate
+    profile = await UserService.get_profile(user.id, conditional)
+    conditional.apply(response)
+    return profile
+
+@user_router.get("/name-available")
+async def is_display_name_available(name: str = Query(..., min_length=1)):
+    return {"name": name, "available": await UserService.is_display_name_available(name)}
+
 @user_router.put("/update/{user_id}", response_model=UserResponse)
 async def update_user(user_id: UUID, user: UserUpdate):
     try:
         print(user, user_id)
         updated_user = await UserService.update_user(user_id, user)
         return updated_user
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -39,3 +55,25 @@ async def remove_follower(user_id: UUID, follower_id: UUID):
         return updated_user
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@user_router.get("/{user_id}/followers", response_model=FollowPage)
+async def get_followers(
+    user_id: UUID,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page")
+):
+    try:
+        return await UserService.get_followers(user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@user_router.get("/{user_id}/following", response_model=FollowPage)
+async def get_following(
+    user_id: UUID,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page")
+):
+    try:
+        return await UserService.get_following(user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,136 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Type, TypeVar
+
+from cassandra.cluster import ResponseFuture, Session
+from cassandra.cqlengine import columns, connection
+from cassandra.cqlengine.models import Model
+
+M = TypeVar("M", bound=Model)
+
+
+def get_session() -> Session:
+    """The session cqlengine was set up with, shared by the API and the bot."""
+    return connection.get_session()
+
+
+def table(model: Type[Model]) -> str:
+    return model.column_family_name()
+
+
+def _as_dict(row) -> Dict[str, Any]:
+    return row if isinstance(row, dict) else row._asdict()
+
+
+def _bridge(response_future: ResponseFuture, loop: asyncio.AbstractEventLoop, fetch_all: bool) -> asyncio.Future:
+    """Resolves an asyncio future from the driver's callbacks, which run on its event thread."""
+    future = loop.create_future()
+    rows: List[Dict[str, Any]] = []
+
+    def resolve():
+        if not future.done():
+            future.set_result(rows)
+
+    def reject(exc):
+        if not future.done():
+            future.set_exception(exc)
+
+    def on_page(page):
+        rows.extend(_as_dict(row) for row in page or ())
+        if fetch_all and response_future.has_more_pages:
+            response_future.start_fetching_next_page()
+            return
+        loop.call_soon_threadsafe(resolve)
+
+    def on_error(exc):
+        loop.call_soon_threadsafe(reject, exc)
+
+    response_future.add_callbacks(on_page, on_error)
+    return future
+
+
+async def execute(query, parameters: Optional[Sequence] = None, *, fetch_all: bool = True) -> List[Dict[str, Any]]:
+    """Runs a statement without blocking the event loop and returns its rows as dicts."""
+    loop = asyncio.get_running_loop()
+    response_future = get_session().execute_async(query, parameters)
+    return await _bridge(response_future, loop, fetch_all)
+
+
+def _applied(rows: List[Dict[str, Any]]) -> bool:
+    return bool(rows[0].get("[applied]", True)) if rows else True
+
+
+def instantiate(model: Type[M], row: Dict[str, Any]) -> M:
+    return model._construct_instance({key: value for key, value in row.items() if key != "[applied]"})
+
+
+async def select(
+    model: Type[M],
+    where: str = "",
+    parameters: Sequence = (),
+    *,
+    limit: Optional[int] = None,
+    allow_filtering: bool = False,
+) -> List[M]:
+    query = f"SELECT * FROM {table(model)}"
+    if where:
+        query += f" WHERE {where}"
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    if allow_filtering:
+        query += " ALLOW FILTERING"
+    rows = await execute(query, tuple(parameters), fetch_all=limit is None)
+    return [instantiate(model, row) for row in rows]
+
+
+async def select_one(model: Type[M], where: str, parameters: Sequence = (), **kwargs) -> Optional[M]:
+    rows = await select(model, where, parameters, limit=1, **kwargs)
+    return rows[0] if rows else None
+
+
+def _primary_key_clause(instance: Model):
+    names = list(instance._primary_keys.keys())
+    where = " AND ".join(f"{instance._columns[name].db_field_name} = %s" for name in names)
+    values = [instance._columns[name].to_database(getattr(instance, name)) for name in names]
+    return where, values
+
+
+async def insert(instance: Model, *, ttl: Optional[int] = None, if_not_exists: bool = False) -> bool:
+    """Inserts every non-null column of `instance`; returns False if IF NOT EXISTS was not applied."""
+    instance.validate()
+    names, values = [], []
+    for name, column in instance._columns.items():
+        value = getattr(instance, name)
+        if value is None or isinstance(column, columns.Counter):
+            continue
+        names.append(column.db_field_name)
+        values.append(column.to_database(value))
+    query = f"INSERT INTO {table(type(instance))} ({', '.join(names)}) VALUES ({', '.join(['%s'] * len(names))})"
+    if if_not_exists:
+        query += " IF NOT EXISTS"
+    if ttl:
+        query += f" USING TTL {int(ttl)}"
+    applied = _applied(await execute(query, values))
+    if applied:
+        instance._set_persisted()
+    return applied
+
+
+async def save(instance: M) -> M:
+    """Inserts a new instance, or writes only the columns changed since it was read."""
+    if not instance._is_persisted:
+        await insert(instance)
+        return instance
+    changed = [name for name in instance.get_changed_columns() if name not in instance._primary_keys]
+    if changed:
+        instance.validate()
+        assignments = ", ".join(f"{instance._columns[name].db_field_name} = %s" for name in changed)
+        values = [instance._columns[name].to_database(getattr(instance, name)) for name in changed]
+        where, key_values = _primary_key_clause(instance)
+        await execute(f"UPDATE {table(type(instance))} SET {assignments} WHERE {where}", values + key_values)
+        instance._set_persisted()
+    return instance
+
+
+async def delete(instance: Model):
+    where, values = _primary_key_clause(instance)
+    await execute(f"DELETE FROM {table(type(instance))} WHERE {where}", values)
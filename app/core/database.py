@@ -7,7 +7,8 @@ from cassandra.cluster import Cluster
 from cassandra.cqlengine import connection
 from cassandra.cqlengine.management import sync_table
 from app.config.cassandra_config import get_cluster, create_keyspace
-from app.domain.entities import mention, news, post, user, reply, token, vote, badge
+from app.core.statements import statements
+from app.domain.entities import mention, news, post, user, reply, token, vote, badge, follow
 
 def init_db():
     # Connect to the Cassandra cluster
@@ -22,18 +23,42 @@ def init_db():
 
     # Sync tables
     sync_table(user.User)
+    sync_table(user.UserByWallet)
+    sync_table(user.UserByDisplayName)
+    sync_table(follow.FollowerByUser)
+    sync_table(follow.FollowingByUser)
+    sync_table(follow.UserFollowCount)
     sync_table(post.Post)
+    sync_table(post.PostByDay)
+    sync_table(post.FeedDay)
+    sync_table(post.PostByUser)
+    sync_table(post.UserPostCount)
+    sync_table(post.PostByTag)
+    sync_table(post.TagPostCount)
+    sync_table(post.PostActivity)
     sync_table(post.PostView)
     sync_table(token.RefreshToken)
     sync_table(reply.Reply)
+    sync_table(reply.ReplyByPost)
+    sync_table(reply.PostReplyCount)
     sync_table(vote.Vote)
+    sync_table(vote.PostVoteCount)
     sync_table(mention.Mention)
+    sync_table(mention.MentionByUser)
+    sync_table(mention.MentionUnreadCount)
+    sync_table(mention.MentionReadMark)
     sync_table(news.News)
+    sync_table(news.NewsByDay)
+    sync_table(news.CacheGeneration)
     sync_table(badge.Badge)
+    sync_table(badge.BadgeByUser)
     # sync_table(Label)
     # sync_table(LabelPost)
     # sync_table(LabelNews)
 
+    # Prepare the registered hot-path statements once for the cqlengine session
+    statements.prepare_all(connection.get_session())
+
     # Shutdown the session and cluster
     session.shutdown()
     cluster.shutdown()
@@ -0,0 +1,16 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+# Topics published when cached data changes
+USER_CHANGED = "user"
+NEWS_CHANGED = "news"
+
+_listeners: Dict[str, List[Callable[[Any], None]]] = defaultdict(list)
+
+def subscribe(topic: str, listener: Callable[[Any], None]):
+    _listeners[topic].append(listener)
+
+def publish(topic: str, key: Any):
+    """Tells every in-process cache holding `key` under `topic` to drop it."""
+    for listener in _listeners[topic]:
+        listener(key)
@@ -0,0 +1,24 @@
+from typing import Any, Dict, List
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+from app.models.mention import MentionResponse
+from app.models.post import PostResponse
+
+# Serializers for list responses, built once at import; models serialize through their own
+LIST_ADAPTERS: Dict[type, TypeAdapter] = {
+    PostResponse: TypeAdapter(List[PostResponse]),
+    MentionResponse: TypeAdapter(List[MentionResponse]),
+}
+
+def json_response(content: Any) -> Response:
+    """
+    Serializes already-built response models straight to JSON bytes with pydantic-core,
+    skipping FastAPI's re-validation against `response_model` and its dict round trip.
+    """
+    if isinstance(content, BaseModel):
+        return Response(content.model_dump_json(), media_type="application/json")
+    if isinstance(content, list):
+        adapter = LIST_ADAPTERS.get(type(content[0])) if content else None
+        if adapter is not None or not content:
+            return Response(adapter.dump_json(content) if adapter else b"[]", media_type="application/json")
+    return ORJSONResponse(content)
@@ -0,0 +1,116 @@
+import time
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from cassandra.cluster import Session
+from cassandra.query import BatchStatement, BatchType, PreparedStatement
+
+from app.core import async_cassandra as db
+
+
+class StatementStats:
+    __slots__ = ("hits", "errors", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.hits = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, failed: bool):
+        self.hits += 1
+        if failed:
+            self.errors += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+
+class StatementRegistry:
+    """
+    Named CQL statements for the hot read and write paths.
+
+    Repositories register their statements at import time; `prepare_all` prepares them once
+    per session at startup, and `execute` binds values and records per-statement metrics.
+    """
+
+    def __init__(self):
+        self._cql: Dict[str, str] = {}
+        self._prepared: Dict[str, PreparedStatement] = {}
+        self._stats: Dict[str, StatementStats] = {}
+        self._session: Optional[Session] = None
+
+    def register(self, name: str, cql: str) -> str:
+        if name in self._cql and self._cql[name] != cql:
+            raise ValueError(f"Statement {name!r} is already registered with different CQL")
+        self._cql[name] = cql
+        self._stats.setdefault(name, StatementStats())
+        return name
+
+    def prepare_all(self, session: Session):
+        self._prepared = {name: session.prepare(cql) for name, cql in self._cql.items()}
+        self._session = session
+
+    def _get_prepared(self, name: str) -> PreparedStatement:
+        session = db.get_session()
+        if session is not self._session:
+            # A new session (bot process, maintenance command) prepares everything once.
+            self.prepare_all(session)
+        prepared = self._prepared.get(name)
+        if prepared is None:
+            prepared = self._prepared[name] = session.prepare(self._cql[name])
+        return prepared
+
+    async def execute(self, name: str, parameters: Sequence = ()) -> List[Dict[str, Any]]:
+        bound = self._get_prepared(name).bind(parameters)
+        started = time.perf_counter()
+        failed = False
+        try:
+            return await db.execute(bound)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._stats[name].record((time.perf_counter() - started) * 1000, failed)
+
+    async def execute_batch(self, name: str, parameter_rows: Sequence[Sequence]):
+        """
+        Runs one statement for every parameter row as a single unlogged batch.
+
+        Meant for rows of one partition, where the batch is applied as a single mutation.
+        """
+        prepared = self._get_prepared(name)
+        batch = BatchStatement(batch_type=BatchType.UNLOGGED)
+        for parameters in parameter_rows:
+            batch.add(prepared, parameters)
+        started = time.perf_counter()
+        failed = False
+        try:
+            await db.execute(batch)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._stats[name].record((time.perf_counter() - started) * 1000, failed)
+
+    async def fetch(self, model: Type[db.M], name: str, parameters: Sequence = ()) -> List[db.M]:
+        return [db.instantiate(model, row) for row in await self.execute(name, parameters)]
+
+    async def fetch_one(self, model: Type[db.M], name: str, parameters: Sequence = ()) -> Optional[db.M]:
+        rows = await self.fetch(model, name, parameters)
+        return rows[0] if rows else None
+
+    def stats(self) -> List[Dict[str, Any]]:
+        report = [
+            {
+                "name": name,
+                "hits": stats.hits,
+                "errors": stats.errors,
+                "total_ms": round(stats.total_ms, 3),
+                "avg_ms": round(stats.total_ms / stats.hits, 3) if stats.hits else 0.0,
+                "max_ms": round(stats.max_ms, 3),
+            }
+            for name, stats in self._stats.items()
+        ]
+        return sorted(report, key=lambda entry: entry["total_ms"], reverse=True)
+
+
+statements = StatementRegistry()
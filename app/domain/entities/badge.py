@@ -10,3 +10,11 @@ class Badge(Model):
     badge_name = columns.Text(required=True, index=True)
     created_at = columns.DateTime(default=lambda: datetime.now(timezone.utc))
     updated_at = columns.DateTime()
+
+class BadgeByUser(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'badges_by_user'
+    user_id = columns.UUID(partition_key=True)
+    badge_name = columns.Text(primary_key=True, clustering_order="ASC")
+    id = columns.UUID(default=uuid4)
+    created_at = columns.DateTime(default=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,24 @@
+from cassandra.cqlengine import columns
+from cassandra.cqlengine.models import Model
+from datetime import datetime, timezone
+
+class FollowerByUser(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'followers_by_user'
+    user_id = columns.UUID(partition_key=True)
+    follower_id = columns.UUID(primary_key=True, clustering_order="ASC")
+    followed_at = columns.DateTime(default=lambda: datetime.now(timezone.utc))
+
+class FollowingByUser(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'following_by_user'
+    user_id = columns.UUID(partition_key=True)
+    followed_id = columns.UUID(primary_key=True, clustering_order="ASC")
+    followed_at = columns.DateTime(default=lambda: datetime.now(timezone.utc))
+
+class UserFollowCount(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'user_follow_counts'
+    user_id = columns.UUID(primary_key=True)
+    follower_count = columns.Counter()
+    following_count = columns.Counter()
@@ -10,4 +10,30 @@ class Mention(Model):
     id = columns.UUID(primary_key=True, default=uuid4)
     mentioned_user_id = columns.UUID(index=True, required=True) 
     created_at = columns.DateTime(default=lambda: datetime.now(timezone.utc)) 
-    is_read = columns.Boolean(default=False)
\ No newline at end of file
+    is_read = columns.Boolean(default=False)
+
+class MentionByUser(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'mentions_by_user'
+    mentioned_user_id = columns.UUID(partition_key=True)
+    created_at = columns.DateTime(primary_key=True, clustering_order="DESC")
+    id = columns.UUID(primary_key=True, clustering_order="ASC")
+    post_id = columns.UUID(required=True)
+    parent_post_id = columns.UUID()
+    # Copied from the author when the mention is written so the inbox needs no extra lookups
+    author_id = columns.UUID()
+    author_avatar_url = columns.Text()
+    is_read = columns.Boolean(default=False)
+
+class MentionUnreadCount(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'mention_unread_counts'
+    user_id = columns.UUID(primary_key=True)
+    unread_count = columns.Counter()
+
+class MentionReadMark(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'mention_read_marks'
+    user_id = columns.UUID(primary_key=True)
+    # Every mention created at or before this instant counts as read
+    read_up_to = columns.DateTime()
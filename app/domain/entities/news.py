@@ -16,3 +16,17 @@ class News(Model):
     upvotes = columns.Integer(default=0)
     downvotes = columns.Integer(default=0)
 
+
+class NewsByDay(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'news_by_day'
+    day = columns.Text(partition_key=True)
+    created_at = columns.DateTime(primary_key=True, clustering_order="DESC")
+    id = columns.UUID(primary_key=True, clustering_order="ASC")
+
+class CacheGeneration(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'cache_generations'
+    # Bumped on every write to a cached data set, so other processes can tell their copy is stale
+    name = columns.Text(primary_key=True)
+    generation = columns.Counter()
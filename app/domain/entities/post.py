@@ -17,6 +17,54 @@ class Post(Model):
     view_cost = columns.Decimal(default=0.0)
     creation_cost = columns.Decimal(default=0.0)
     
+class PostByDay(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'posts_by_day'
+    day = columns.Text(partition_key=True)
+    created_at = columns.DateTime(primary_key=True, clustering_order="DESC")
+    id = columns.UUID(primary_key=True, clustering_order="ASC")
+
+class FeedDay(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'feed_days'
+    bucket = columns.Text(partition_key=True, default='posts')
+    day = columns.Text(primary_key=True, clustering_order="DESC")
+
+class PostByUser(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'posts_by_user'
+    user_id = columns.UUID(partition_key=True)
+    created_at = columns.DateTime(primary_key=True, clustering_order="DESC")
+    id = columns.UUID(primary_key=True, clustering_order="ASC")
+
+class UserPostCount(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'user_post_counts'
+    user_id = columns.UUID(primary_key=True)
+    post_count = columns.Counter()
+
+class PostByTag(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'posts_by_tag'
+    tag = columns.Text(partition_key=True)
+    created_at = columns.DateTime(primary_key=True, clustering_order="DESC")
+    id = columns.UUID(primary_key=True, clustering_order="ASC")
+
+class TagPostCount(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'tag_post_counts'
+    # Every tag shares one partition so the directory is a single-partition read
+    bucket = columns.Text(partition_key=True, default='posts')
+    tag = columns.Text(primary_key=True)
+    post_count = columns.Counter()
+
+class PostActivity(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'post_activity'
+    # Last reply or vote anywhere under the post; lets readers validate a cached post cheaply
+    post_id = columns.UUID(primary_key=True)
+    last_activity_at = columns.DateTime()
+
 class PostView(Model):
     __keyspace__ = 'lascaux'
     id = columns.UUID(primary_key=True, default=uuid4)
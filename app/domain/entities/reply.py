@@ -16,4 +16,25 @@ class Reply(Model):
     content = columns.Text(required=True)
 
     view_cost = columns.Decimal(default=0.0)
-    creation_cost = columns.Decimal(default=0.0)
\ No newline at end of file
+    creation_cost = columns.Decimal(default=0.0)
+
+class ReplyByPost(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'replies_by_post'
+    parent_post_id = columns.UUID(partition_key=True)
+    created_at = columns.DateTime(primary_key=True, clustering_order="ASC")
+    id = columns.UUID(primary_key=True, clustering_order="ASC")
+    parent_reply_id = columns.Text(default=None)
+    user_id = columns.UUID(required=True)
+    updated_at = columns.DateTime()
+    is_flagged = columns.Boolean(default=False)
+    ipfs_hash = columns.Text()
+    content = columns.Text(required=True)
+    view_cost = columns.Decimal(default=0.0)
+    creation_cost = columns.Decimal(default=0.0)
+
+class PostReplyCount(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'post_reply_counts'
+    post_id = columns.UUID(primary_key=True)
+    reply_count = columns.Counter()
@@ -5,7 +5,9 @@ from datetime import datetime, timezone
 
 class RefreshToken(Model):
     __keyspace__ = 'lascaux'
+    __table_name__ = 'refresh_tokens_by_user'
     user_id = columns.UUID(partition_key=True)
-    token = columns.Text(primary_key=True)
+    # SHA-256 of the token; rows expire through the TTL they are written with
+    token_hash = columns.Blob(primary_key=True)
     expires_at = columns.DateTime(required=True)
     created_at = columns.DateTime(default=lambda: datetime.now(timezone.utc))
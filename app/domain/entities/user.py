@@ -15,6 +15,19 @@ class User(Model):
     roles = columns.List(columns.Text(), default=['general'])
     invited_by = columns.UUID()
     rank = columns.Text(default=None)
+    # Superseded by followers_by_user; only read by the backfill-follows command
     followers = columns.List(columns.UUID(), default=[])
+    # Bumped on every profile update; access tokens carry it as `ver`
+    profile_version = columns.Integer(default=0)
 
+class UserByWallet(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'users_by_wallet'
+    wallet_address = columns.Text(primary_key=True)
+    user_id = columns.UUID(required=True)
 
+class UserByDisplayName(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'users_by_display_name'
+    display_name = columns.Text(primary_key=True)
+    user_id = columns.UUID(required=True)
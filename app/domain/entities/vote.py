@@ -8,4 +8,11 @@ class Vote(Model):
     post_id = columns.UUID(partition_key=True, required=True)
     user_id = columns.UUID(primary_key=True, clustering_order="ASC")
     vote_type = columns.Boolean(required=True)
-    created_at = columns.DateTime(default=datetime.now(timezone.utc))
\ No newline at end of file
+    created_at = columns.DateTime(default=datetime.now(timezone.utc))
+
+class PostVoteCount(Model):
+    __keyspace__ = 'lascaux'
+    __table_name__ = 'post_vote_counts'
+    post_id = columns.UUID(primary_key=True)
+    upvotes = columns.Counter()
+    downvotes = columns.Counter()
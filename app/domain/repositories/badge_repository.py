@@ -1,35 +1,91 @@
+import asyncio
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+from typing import Dict, Iterable, List, Optional
+from app.core import async_cassandra as db
+from app.core.invalidation import USER_CHANGED, publish
+from app.core.statements import statements
+from app.domain.entities.badge import Badge, BadgeByUser
 
-
-from uuid import UUID
-from typing import List
-from app.domain.entities.badge import Badge
+BADGES_BY_USER = statements.register(
+    "badges_by_user", f"SELECT * FROM {db.table(BadgeByUser)} WHERE user_id = ?"
+)
+BADGES_BY_USERS = statements.register(
+    "badges_by_users", f"SELECT user_id, badge_name FROM {db.table(BadgeByUser)} WHERE user_id IN ?"
+)
+BADGE_BY_USER_AND_NAME = statements.register(
+    "badge_by_user_and_name", f"SELECT * FROM {db.table(BadgeByUser)} WHERE user_id = ? AND badge_name = ?"
+)
 
 
 class BadgeRepository:
+    @staticmethod
+    async def award(user_id: UUID, badge_name: str) -> bool:
+        """Gives a user a badge once; False if the user already had it."""
+        awarded = BadgeByUser(user_id=user_id, badge_name=badge_name, id=uuid4(), created_at=datetime.now(timezone.utc))
+        if not await db.insert(awarded, if_not_exists=True):
+            return False
+        await db.insert(Badge(id=awarded.id, user_id=user_id, badge_name=badge_name, created_at=awarded.created_at))
+        publish(USER_CHANGED, user_id)
+        return True
+
     @staticmethod
     async def create_badge(badge_data: dict) -> Badge:
         new_badge = Badge(**badge_data)
-        new_badge.save()
+        await asyncio.gather(
+            db.insert(new_badge),
+            db.insert(BadgeByUser(
+                user_id=new_badge.user_id, badge_name=new_badge.badge_name,
+                id=new_badge.id, created_at=new_badge.created_at,
+            )),
+        )
+        publish(USER_CHANGED, new_badge.user_id)
         return new_badge
     
     @staticmethod
-    async def get_badges_by_user_id(user_id: UUID) -> List[Badge]:
-        return Badge.objects(user_id=user_id).all()
+    async def get_badges_by_user_id(user_id: UUID) -> List[BadgeByUser]:
+        return await statements.fetch(BadgeByUser, BADGES_BY_USER, (user_id,))
     
     @staticmethod
-    async def get_badge_by_user_id_and_badge_name(user_id: UUID, badge_name: str) -> Badge:
-        return Badge.objects(user_id=user_id, badge_name=badge_name).first()
+    async def get_badge_names_by_user_ids(user_ids: Iterable[UUID]) -> Dict[UUID, List[str]]:
+        user_ids = list(set(user_ids))
+        names: Dict[UUID, List[str]] = {user_id: [] for user_id in user_ids}
+        if not user_ids:
+            return names
+        for row in await statements.execute(BADGES_BY_USERS, (user_ids,)):
+            names[row["user_id"]].append(row["badge_name"])
+        return names
+
+    @staticmethod
+    async def get_badge_by_id(badge_id: UUID) -> Optional[Badge]:
+        return await db.select_one(Badge, "id = %s", (badge_id,))
+
+    @staticmethod
+    async def get_badge_by_user_id_and_badge_name(user_id: UUID, badge_name: str) -> Optional[Badge]:
+        awarded = await statements.fetch_one(BadgeByUser, BADGE_BY_USER_AND_NAME, (user_id, badge_name))
+        return await BadgeRepository.get_badge_by_id(awarded.id) if awarded else None
     
     @staticmethod
     async def get_all_badges() -> List[Badge]:
-        return Badge.objects().all()
+        return await db.select(Badge)
     
     @staticmethod
     async def update_badge(badge_id: UUID, badge_data: dict) -> Badge:
         badge = await BadgeRepository.get_badge_by_id(badge_id)
         if badge:
-            badge.update(**badge_data)
-            badge.save()
+            previous = BadgeByUser(user_id=badge.user_id, badge_name=badge.badge_name)
+            for key, value in badge_data.items():
+                setattr(badge, key, value)
+            await db.save(badge)
+            # badges_by_user is keyed by the name, so a rename or reassignment moves the row
+            if (previous.user_id, previous.badge_name) != (badge.user_id, badge.badge_name):
+                await db.delete(previous)
+            await db.insert(BadgeByUser(
+                user_id=badge.user_id, badge_name=badge.badge_name, id=badge.id, created_at=badge.created_at,
+            ))
+            publish(USER_CHANGED, badge.user_id)
+            if previous.user_id != badge.user_id:
+                publish(USER_CHANGED, previous.user_id)
             return badge
         return None
     
@@ -37,6 +93,22 @@ class BadgeRepository:
     async def delete_badge(badge_id: UUID) -> bool:
         badge = await BadgeRepository.get_badge_by_id(badge_id)
         if badge:
-            badge.delete()
+            await asyncio.gather(
+                db.delete(badge),
+                db.delete(BadgeByUser(user_id=badge.user_id, badge_name=badge.badge_name)),
+            )
+            publish(USER_CHANGED, badge.user_id)
             return True
-        return False
\ No newline at end of file
+        return False
+
+    @staticmethod
+    async def backfill_badges_by_user() -> int:
+        """Copies existing badges into badges_by_user, keeping the earliest award of each name."""
+        count = 0
+        for badge in sorted(await db.select(Badge), key=lambda badge: badge.created_at or datetime.min):
+            awarded = BadgeByUser(
+                user_id=badge.user_id, badge_name=badge.badge_name, id=badge.id, created_at=badge.created_at
+            )
+            if await db.insert(awarded, if_not_exists=True):
+                count += 1
+        return count
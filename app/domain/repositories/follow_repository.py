@@ -0,0 +1,125 @@
+import asyncio
+from uuid import UUID
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core import async_cassandra as db
+from app.core.statements import statements
+from app.domain.entities.follow import FollowerByUser, FollowingByUser, UserFollowCount
+from app.domain.entities.user import User
+
+FOLLOWER_REMOVE = statements.register(
+    "follower_remove", f"DELETE FROM {db.table(FollowerByUser)} WHERE user_id = ? AND follower_id = ? IF EXISTS"
+)
+FOLLOWING_REMOVE = statements.register(
+    "following_remove", f"DELETE FROM {db.table(FollowingByUser)} WHERE user_id = ? AND followed_id = ?"
+)
+FOLLOWERS = statements.register(
+    "followers", f"SELECT * FROM {db.table(FollowerByUser)} WHERE user_id = ? LIMIT ?"
+)
+FOLLOWERS_AFTER = statements.register(
+    "followers_after", f"SELECT * FROM {db.table(FollowerByUser)} WHERE user_id = ? AND follower_id > ? LIMIT ?"
+)
+FOLLOWING = statements.register(
+    "following", f"SELECT * FROM {db.table(FollowingByUser)} WHERE user_id = ? LIMIT ?"
+)
+FOLLOWING_AFTER = statements.register(
+    "following_after", f"SELECT * FROM {db.table(FollowingByUser)} WHERE user_id = ? AND followed_id > ? LIMIT ?"
+)
+FOLLOW_COUNTS_BY_IDS = statements.register(
+    "follow_counts_by_ids", f"SELECT * FROM {db.table(UserFollowCount)} WHERE user_id IN ?"
+)
+FOLLOW_COUNTS_ADD = statements.register(
+    "follow_counts_add",
+    f"UPDATE {db.table(UserFollowCount)} SET follower_count = follower_count + ?, "
+    f"following_count = following_count + ? WHERE user_id = ?"
+)
+
+FOLLOW_CURSOR = {"i": str}
+
+def follow_counts(row: Optional[UserFollowCount]) -> Dict[str, int]:
+    return {
+        "follower_count": (row.follower_count or 0) if row else 0,
+        "following_count": (row.following_count or 0) if row else 0,
+    }
+
+class FollowRepository:
+    @staticmethod
+    async def follow(follower_id: UUID, followed_id: UUID) -> bool:
+        """Records that `follower_id` follows `followed_id`; False if it already did."""
+        followed_at = datetime.now(timezone.utc)
+        row = FollowerByUser(user_id=followed_id, follower_id=follower_id, followed_at=followed_at)
+        if not await db.insert(row, if_not_exists=True):
+            return False
+        await asyncio.gather(
+            db.insert(FollowingByUser(user_id=follower_id, followed_id=followed_id, followed_at=followed_at)),
+            statements.execute(FOLLOW_COUNTS_ADD, (1, 0, followed_id)),
+            statements.execute(FOLLOW_COUNTS_ADD, (0, 1, follower_id)),
+        )
+        return True
+
+    @staticmethod
+    async def unfollow(follower_id: UUID, followed_id: UUID) -> bool:
+        """Removes the follow; False if `follower_id` did not follow `followed_id`."""
+        rows = await statements.execute(FOLLOWER_REMOVE, (followed_id, follower_id))
+        if not rows[0]["[applied]"]:
+            return False
+        await asyncio.gather(
+            statements.execute(FOLLOWING_REMOVE, (follower_id, followed_id)),
+            statements.execute(FOLLOW_COUNTS_ADD, (-1, 0, followed_id)),
+            statements.execute(FOLLOW_COUNTS_ADD, (0, -1, follower_id)),
+        )
+        return True
+
+    @staticmethod
+    async def get_followers_page(
+        user_id: UUID, limit: int, after: Optional[dict] = None
+    ) -> Tuple[List[FollowerByUser], Optional[dict]]:
+        if after:
+            rows = await statements.fetch(FollowerByUser, FOLLOWERS_AFTER, (user_id, UUID(after["i"]), limit + 1))
+        else:
+            rows = await statements.fetch(FollowerByUser, FOLLOWERS, (user_id, limit + 1))
+        next_cursor = {"i": str(rows[limit - 1].follower_id)} if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    @staticmethod
+    async def get_following_page(
+        user_id: UUID, limit: int, after: Optional[dict] = None
+    ) -> Tuple[List[FollowingByUser], Optional[dict]]:
+        if after:
+            rows = await statements.fetch(FollowingByUser, FOLLOWING_AFTER, (user_id, UUID(after["i"]), limit + 1))
+        else:
+            rows = await statements.fetch(FollowingByUser, FOLLOWING, (user_id, limit + 1))
+        next_cursor = {"i": str(rows[limit - 1].followed_id)} if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    @staticmethod
+    async def get_follow_counts(user_ids: Iterable[UUID]) -> Dict[UUID, Dict[str, int]]:
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return {}
+        rows = {row.user_id: row for row in await statements.fetch(UserFollowCount, FOLLOW_COUNTS_BY_IDS, (user_ids,))}
+        return {user_id: follow_counts(rows.get(user_id)) for user_id in user_ids}
+
+    @staticmethod
+    async def backfill_follows() -> int:
+        """Copies the legacy User.followers lists into the follow tables and recounts the counters."""
+        copied = 0
+        for user in await db.select(User):
+            for follower_id in set(user.followers or []):
+                await db.insert(FollowerByUser(user_id=user.id, follower_id=follower_id))
+                await db.insert(FollowingByUser(user_id=follower_id, followed_id=user.id))
+                copied += 1
+        # Recount from the table so follows made since the upgrade are kept
+        followers: Dict[UUID, int] = {}
+        following: Dict[UUID, int] = {}
+        for row in await db.select(FollowerByUser):
+            followers[row.user_id] = followers.get(row.user_id, 0) + 1
+            following[row.follower_id] = following.get(row.follower_id, 0) + 1
+        current = {row.user_id: follow_counts(row) for row in await db.select(UserFollowCount)}
+        for user_id in followers.keys() | following.keys() | current.keys():
+            counts = current.get(user_id, follow_counts(None))
+            follower_delta = followers.get(user_id, 0) - counts["follower_count"]
+            following_delta = following.get(user_id, 0) - counts["following_count"]
+            if follower_delta or following_delta:
+                await statements.execute(FOLLOW_COUNTS_ADD, (follower_delta, following_delta, user_id))
+        return copied
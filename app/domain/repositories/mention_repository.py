@@ -1,40 +1,305 @@
-from uuid import UUID
-from typing import List
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from fastapi import HTTPException
-from app.domain.entities.mention import Mention
+from app.core import async_cassandra as db
+from app.core.statements import statements
+from app.domain.entities.mention import Mention, MentionByUser, MentionUnreadCount, MentionReadMark
+from app.domain.entities.post import Post
+from app.domain.entities.reply import Reply
+from app.domain.entities.user import User
+from app.utils.pagination import as_utc, to_millis, from_millis
+
+# The legacy, unpaged inbox returns at most this many of the newest mentions
+MAX_UNPAGED_MENTIONS = 100
+
+MENTIONS_BY_POST_AND_IDS = statements.register(
+    "mentions_by_post_and_ids", f"SELECT * FROM {db.table(Mention)} WHERE post_id = ? AND id IN ?"
+)
+MENTIONS_BY_POST = statements.register(
+    "mentions_by_post", f"SELECT * FROM {db.table(Mention)} WHERE post_id = ?"
+)
+INBOX_PAGE = statements.register(
+    "inbox_page", f"SELECT * FROM {db.table(MentionByUser)} WHERE mentioned_user_id = ? LIMIT ?"
+)
+INBOX_PAGE_AT = statements.register(
+    "inbox_page_at",
+    f"SELECT * FROM {db.table(MentionByUser)} WHERE mentioned_user_id = ? AND created_at = ? AND id > ? LIMIT ?"
+)
+INBOX_PAGE_BEFORE = statements.register(
+    "inbox_page_before",
+    f"SELECT * FROM {db.table(MentionByUser)} WHERE mentioned_user_id = ? AND created_at < ? LIMIT ?"
+)
+INBOX_ROW = statements.register(
+    "inbox_row",
+    f"SELECT * FROM {db.table(MentionByUser)} WHERE mentioned_user_id = ? AND created_at = ? AND id = ?"
+)
+INBOX_UNREAD_AFTER = statements.register(
+    "inbox_unread_after",
+    f"SELECT created_at, is_read FROM {db.table(MentionByUser)} WHERE mentioned_user_id = ? AND created_at > ?"
+)
+INBOX_MARK_READ = statements.register(
+    "inbox_mark_read",
+    f"UPDATE {db.table(MentionByUser)} SET is_read = true "
+    f"WHERE mentioned_user_id = ? AND created_at = ? AND id = ? IF is_read = false"
+)
+READ_MARKS = statements.register(
+    "read_marks", f"SELECT * FROM {db.table(MentionReadMark)} WHERE user_id IN ?"
+)
+READ_MARK_SET = statements.register(
+    "read_mark_set", f"UPDATE {db.table(MentionReadMark)} SET read_up_to = ? WHERE user_id = ?"
+)
+UNREAD_COUNT = statements.register(
+    "unread_count", f"SELECT * FROM {db.table(MentionUnreadCount)} WHERE user_id = ?"
+)
+UNREAD_COUNT_ADD = statements.register(
+    "unread_count_add",
+    f"UPDATE {db.table(MentionUnreadCount)} SET unread_count = unread_count + ? WHERE user_id = ?"
+)
+
+def inbox_row(mention: Mention, author_id: Optional[UUID], author_avatar_url: Optional[str]) -> MentionByUser:
+    return MentionByUser(
+        mentioned_user_id=mention.mentioned_user_id,
+        created_at=mention.created_at,
+        id=mention.id,
+        post_id=mention.post_id,
+        parent_post_id=mention.parent_post_id,
+        author_id=author_id,
+        author_avatar_url=author_avatar_url,
+        is_read=bool(mention.is_read),
+    )
+
+INBOX_CURSOR = {"t": int, "i": str}
+
+def inbox_cursor(row: MentionByUser) -> dict:
+    return {"t": to_millis(row.created_at), "i": str(row.id)}
+
+def is_read(row: MentionByUser, read_up_to: Optional[datetime]) -> bool:
+    return bool(row.is_read) or (read_up_to is not None and as_utc(row.created_at) <= as_utc(read_up_to))
 
 class MentionRepository:
     @staticmethod
-    async def create_mention(mention_data: dict) -> Mention:
+    async def create_mention(mention_data: dict, author: Optional[User]) -> Mention:
+        """Writes a mention and its inbox row; without an author only the mention row is written."""
         new_mention = Mention(**mention_data)
-        new_mention.save()
+        if author is None:
+            # As in backfill_mentions_by_user, a mention whose author is gone stays out of inboxes
+            await db.insert(new_mention)
+            return new_mention
+        await asyncio.gather(
+            db.insert(new_mention),
+            db.insert(inbox_row(new_mention, author.id, author.profile_photo_url)),
+            statements.execute(UNREAD_COUNT_ADD, (1, new_mention.mentioned_user_id)),
+        )
         return new_mention
     
+    @staticmethod
+    async def sync_mentions(
+        post_id: UUID, parent_post_id: Optional[UUID], mentioned_user_ids: Iterable[UUID], author: Optional[User]
+    ) -> Tuple[int, int]:
+        """Brings a post's or reply's mentions in line with its content; returns (added, removed)."""
+        wanted = list(dict.fromkeys(mentioned_user_ids))
+        existing = await statements.fetch(Mention, MENTIONS_BY_POST, (post_id,))
+        existing = [mention for mention in existing if mention.parent_post_id == parent_post_id]
+        existing_ids = {mention.mentioned_user_id for mention in existing}
+        removed = [mention for mention in existing if mention.mentioned_user_id not in wanted]
+        added = [user_id for user_id in wanted if user_id not in existing_ids]
+        await asyncio.gather(
+            *(MentionRepository._delete_mention(mention) for mention in removed),
+            MentionRepository.create_mentions(post_id, parent_post_id, added, author),
+        )
+        return len(added), len(removed)
+
+    @staticmethod
+    async def create_mentions(
+        post_id: UUID, parent_post_id: Optional[UUID], mentioned_user_ids: Iterable[UUID], author: Optional[User]
+    ) -> List[Mention]:
+        now = datetime.now(timezone.utc)
+        return list(await asyncio.gather(*(
+            MentionRepository.create_mention({
+                "id": uuid4(),
+                "post_id": post_id,
+                "parent_post_id": parent_post_id,
+                "mentioned_user_id": user_id,
+                "created_at": now,
+            }, author)
+            for user_id in dict.fromkeys(mentioned_user_ids)
+        )))
+
     @staticmethod
     async def delete_mentions_by_post_id(post_id: UUID, parent_post_id: UUID = None):
         try:
+            mentions = await statements.fetch(Mention, MENTIONS_BY_POST, (post_id,))
             if parent_post_id:
-                mentions = Mention.objects.filter(post_id=post_id, parent_post_id=parent_post_id)
-            else:
-                mentions = Mention.objects.filter(post_id=post_id)
-
-            for mention in mentions:
-                mention.delete()
+                mentions = [mention for mention in mentions if mention.parent_post_id == parent_post_id]
+            await asyncio.gather(*(MentionRepository._delete_mention(mention) for mention in mentions))
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to delete mentions: {str(e)}"
             )
+
+    @staticmethod
+    async def _delete_mention(mention: Mention):
+        key = (mention.mentioned_user_id, mention.created_at, mention.id)
+        row, marks = await asyncio.gather(
+            statements.fetch_one(MentionByUser, INBOX_ROW, key),
+            MentionRepository.get_read_marks([mention.mentioned_user_id]),
+        )
+        await asyncio.gather(
+            db.delete(mention),
+            db.delete(MentionByUser(mentioned_user_id=key[0], created_at=key[1], id=key[2])),
+        )
+        if row is not None and not is_read(row, marks.get(mention.mentioned_user_id)):
+            await statements.execute(UNREAD_COUNT_ADD, (-1, mention.mentioned_user_id))
         
     @staticmethod
-    async def get_mentions_by_user_id(user_id: UUID) -> List[Mention]:
-        return Mention.objects.filter(mentioned_user_id=user_id).all()
+    async def get_mentions_by_user_id(user_id: UUID) -> List[MentionByUser]:
+        rows, marks = await asyncio.gather(
+            statements.fetch(MentionByUser, INBOX_PAGE, (user_id, MAX_UNPAGED_MENTIONS)),
+            MentionRepository.get_read_marks([user_id]),
+        )
+        return MentionRepository._apply_read_mark(rows, marks.get(user_id))
+
+    @staticmethod
+    def _apply_read_mark(rows: List[MentionByUser], read_up_to: Optional[datetime]) -> List[MentionByUser]:
+        for row in rows:
+            row.is_read = is_read(row, read_up_to)
+        return rows
+
+    @staticmethod
+    async def get_read_marks(user_ids: Iterable[UUID]) -> Dict[UUID, datetime]:
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return {}
+        rows = await statements.fetch(MentionReadMark, READ_MARKS, (user_ids,))
+        return {row.user_id: row.read_up_to for row in rows if row.read_up_to}
+
+    @staticmethod
+    async def get_mentions_page(
+        user_id: UUID, limit: int, after: Optional[dict] = None
+    ) -> Tuple[List[MentionByUser], Optional[dict]]:
+        """Returns one newest-first page of a user's inbox and the cursor for the next page, if any."""
+        if after:
+            created_at = from_millis(after["t"])
+            rows = await statements.fetch(
+                MentionByUser, INBOX_PAGE_AT, (user_id, created_at, UUID(after["i"]), limit + 1)
+            )
+            if len(rows) <= limit:
+                rows += await statements.fetch(
+                    MentionByUser, INBOX_PAGE_BEFORE, (user_id, created_at, limit + 1 - len(rows))
+                )
+        else:
+            rows = await statements.fetch(MentionByUser, INBOX_PAGE, (user_id, limit + 1))
+        next_cursor = inbox_cursor(rows[limit - 1]) if len(rows) > limit else None
+        marks = await MentionRepository.get_read_marks([user_id])
+        return MentionRepository._apply_read_mark(rows[:limit], marks.get(user_id)), next_cursor
+
+    @staticmethod
+    async def get_unread_count(user_id: UUID) -> int:
+        counts = await statements.fetch_one(MentionUnreadCount, UNREAD_COUNT, (user_id,))
+        return max(counts.unread_count or 0, 0) if counts else 0
+
+    @staticmethod
+    async def mark_as_read(mention_ids: List[Tuple[UUID, UUID]], owner_id: UUID) -> Tuple[List[MentionByUser], int]:
+        """
+        Marks the given (post_id, mention_id) pairs in `owner_id`'s inbox as read; mentions of
+        other users are skipped as if they did not exist.
+
+        Returns the inbox rows found and how many of them this call marked. Each row is flipped
+        with its own conditional update, and the unread counter only moves by the updates that
+        applied, so concurrent calls for the same mentions cannot both count them.
+        """
+        ids_by_post: Dict[UUID, List[UUID]] = defaultdict(list)
+        for post_id, mention_id in mention_ids:
+            ids_by_post[post_id].append(mention_id)
+        mentions = [
+            mention
+            for post_mentions in await asyncio.gather(*(
+                statements.fetch(Mention, MENTIONS_BY_POST_AND_IDS, (post_id, ids))
+                for post_id, ids in ids_by_post.items()
+            ))
+            for mention in post_mentions
+            if mention.mentioned_user_id == owner_id
+        ]
+        rows, marks = await asyncio.gather(
+            asyncio.gather(*(
+                statements.fetch_one(MentionByUser, INBOX_ROW, (mention.mentioned_user_id, mention.created_at, mention.id))
+                for mention in mentions
+            )),
+            MentionRepository.get_read_marks(mention.mentioned_user_id for mention in mentions),
+        )
+        rows = [row for row in rows if row is not None]
+
+        unread: Dict[UUID, List[MentionByUser]] = defaultdict(list)
+        for row in rows:
+            if not is_read(row, marks.get(row.mentioned_user_id)):
+                unread[row.mentioned_user_id].append(row)
+        marked = await asyncio.gather(*(
+            MentionRepository._mark_partition_read(user_id, user_rows) for user_id, user_rows in unread.items()
+        ))
+        for row in rows:
+            row.is_read = True
+        return rows, sum(marked)
+
+    @staticmethod
+    async def _mark_partition_read(user_id: UUID, rows: List[MentionByUser]) -> int:
+        results = await asyncio.gather(*(
+            statements.execute(INBOX_MARK_READ, (user_id, row.created_at, row.id)) for row in rows
+        ))
+        marked = sum(1 for result in results if result and result[0]["[applied]"])
+        if marked:
+            await statements.execute(UNREAD_COUNT_ADD, (-marked, user_id))
+        return marked
+
+    @staticmethod
+    async def mark_all_as_read(user_id: UUID, up_to: datetime) -> int:
+        """
+        Marks every mention created at or before `up_to` as read by moving the user's read mark.
+
+        Only the unread mentions newer than `up_to` are read, to recount the unread counter.
+        Returns how many mentions stopped counting as unread.
+        """
+        marks = await MentionRepository.get_read_marks([user_id])
+        current_mark = marks.get(user_id)
+        if current_mark is not None and as_utc(current_mark) >= as_utc(up_to):
+            return 0
+        newer, counts = await asyncio.gather(
+            statements.execute(INBOX_UNREAD_AFTER, (user_id, up_to)),
+            statements.fetch_one(MentionUnreadCount, UNREAD_COUNT, (user_id,)),
+        )
+        still_unread = sum(1 for row in newer if not row["is_read"])
+        counter = (counts.unread_count or 0) if counts else 0
+        await statements.execute(READ_MARK_SET, (up_to, user_id))
+        if counter != still_unread:
+            await statements.execute(UNREAD_COUNT_ADD, (still_unread - counter, user_id))
+        return max(counter - still_unread, 0)
 
     @staticmethod
-    async def mark_as_read(post_id: UUID, mention_id: UUID) -> Mention:
-        mention = Mention.objects.filter(post_id=post_id, id=mention_id).first()
-        if mention:
-            mention.is_read = True
-            mention.save()
-        return mention
\ No newline at end of file
+    async def backfill_mentions_by_user() -> int:
+        """Copies legacy mentions into mentions_by_user and recounts the unread counters."""
+        authors = {post.id: post.user_id for post in await db.select(Post)}
+        authors.update({reply.id: reply.user_id for reply in await db.select(Reply)})
+        avatars = {user.id: user.profile_photo_url for user in await db.select(User)}
+        count = 0
+        for mention in await db.select(Mention):
+            author_id = authors.get(mention.post_id)
+            if author_id is None:
+                # The post or reply is gone; its mention no longer belongs in an inbox
+                continue
+            # Rows written since the upgrade already carry the current read state
+            if await db.insert(inbox_row(mention, author_id, avatars.get(author_id)), if_not_exists=True):
+                count += 1
+        unread: Dict[UUID, int] = {}
+        for row in await db.select(MentionByUser):
+            if not row.is_read:
+                unread[row.mentioned_user_id] = unread.get(row.mentioned_user_id, 0) + 1
+        current = {row.user_id: row.unread_count or 0 for row in await db.select(MentionUnreadCount)}
+        for user_id in unread.keys() | current.keys():
+            delta = unread.get(user_id, 0) - current.get(user_id, 0)
+            if delta:
+                await statements.execute(UNREAD_COUNT_ADD, (delta, user_id))
+        return count
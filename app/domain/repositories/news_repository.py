@@ -1,26 +1,112 @@
-from typing import List, Optional
+import asyncio
+from typing import List, Optional, Tuple
 from uuid import UUID
-from app.domain.entities.news import News
+from app.core import async_cassandra as db
+from app.core.invalidation import NEWS_CHANGED, publish
+from app.core.statements import statements
+from app.domain.entities.news import News, NewsByDay, CacheGeneration
+from app.domain.entities.post import FeedDay
+from app.domain.repositories.post_repository import collect_day_rows, feed_day
+from app.utils.pagination import to_millis
+
+# News days are listed in the same feed_days table as posts, under their own bucket.
+NEWS_BUCKET = "news"
+NEWS_GENERATION = "news"
+
+NEWS_BY_IDS = statements.register("news_by_ids", f"SELECT * FROM {db.table(News)} WHERE id IN ?")
+NEWS_ROWS = statements.register("news_rows", f"SELECT * FROM {db.table(NewsByDay)} WHERE day = ? LIMIT ?")
+NEWS_ROWS_AT = statements.register(
+    "news_rows_at", f"SELECT * FROM {db.table(NewsByDay)} WHERE day = ? AND created_at = ? AND id > ? LIMIT ?"
+)
+NEWS_ROWS_BEFORE = statements.register(
+    "news_rows_before", f"SELECT * FROM {db.table(NewsByDay)} WHERE day = ? AND created_at < ? LIMIT ?"
+)
+GENERATION = statements.register(
+    "cache_generation", f"SELECT * FROM {db.table(CacheGeneration)} WHERE name = ?"
+)
+GENERATION_BUMP = statements.register(
+    "cache_generation_bump", f"UPDATE {db.table(CacheGeneration)} SET generation = generation + 1 WHERE name = ?"
+)
+
+NEWS_CURSOR = {"d": str, "t": int, "i": str}
+
+def news_cursor(row: NewsByDay) -> dict:
+    return {"d": row.day, "t": to_millis(row.created_at), "i": str(row.id)}
 
 class NewsRepository:
     @staticmethod
-    def create_news(news_data: dict) -> News:
+    async def create_news(news_data: dict) -> News:
         news = News(**news_data)
-        news.save()
+        await db.insert(news)
+        await NewsRepository._write_day_rows(news)
+        await NewsRepository.bump_generation()
         return news
 
     @staticmethod
-    def get_all_news() -> List[News]:
-        return News.objects().all()
+    async def _write_day_rows(news: News):
+        day = feed_day(news.created_at)
+        await asyncio.gather(
+            db.insert(NewsByDay(day=day, created_at=news.created_at, id=news.id)),
+            db.insert(FeedDay(bucket=NEWS_BUCKET, day=day)),
+        )
+
+    @staticmethod
+    async def get_all_news() -> List[News]:
+        return await db.select(News)
+
+    @staticmethod
+    async def get_news_by_id(news_id: UUID) -> Optional[News]:
+        return await db.select_one(News, "id = %s", (news_id,))
+
+    @staticmethod
+    async def get_news_by_ids(news_ids: List[UUID]) -> List[News]:
+        """Fetches news items by id, preserving the order of `news_ids`."""
+        if not news_ids:
+            return []
+        rows = await statements.fetch(News, NEWS_BY_IDS, (list(news_ids),))
+        items = {news.id: news for news in rows}
+        return [items[news_id] for news_id in news_ids if news_id in items]
+
+    @staticmethod
+    async def get_news_page(limit: int, after: Optional[dict] = None) -> Tuple[List[News], Optional[dict]]:
+        """Returns one newest-first page of news and the cursor for the next page, if any."""
+        rows = await collect_day_rows(
+            NEWS_BUCKET, NewsByDay, NEWS_ROWS, NEWS_ROWS_AT, NEWS_ROWS_BEFORE, limit + 1, after
+        )
+        next_cursor = news_cursor(rows[limit - 1]) if len(rows) > limit else None
+        news = await NewsRepository.get_news_by_ids([row.id for row in rows[:limit]])
+        return news, next_cursor
+
+    @staticmethod
+    async def update_news(news: News):
+        await db.save(news)
+        await NewsRepository.bump_generation()
+
+    @staticmethod
+    async def delete_news(news: News):
+        await asyncio.gather(
+            db.delete(NewsByDay(day=feed_day(news.created_at), created_at=news.created_at, id=news.id)),
+            db.delete(news),
+        )
+        await NewsRepository.bump_generation()
 
     @staticmethod
-    def get_news_by_id(news_id: UUID) -> Optional[News]:
-        return News.objects(id=news_id).first()
+    async def get_generation() -> int:
+        row = await statements.fetch_one(CacheGeneration, GENERATION, (NEWS_GENERATION,))
+        return (row.generation or 0) if row else 0
 
     @staticmethod
-    def update_news(news: News):
-        news.save()
+    async def bump_generation():
+        """Invalidates cached news pages here at once, and in other processes through the shared counter."""
+        publish(NEWS_CHANGED, None)
+        await statements.execute(GENERATION_BUMP, (NEWS_GENERATION,))
 
     @staticmethod
-    def delete_news(news: News):
-        news.delete()
+    async def backfill_news_by_day() -> int:
+        """Writes news_by_day rows for news created before the table existed."""
+        count = 0
+        for news in await db.select(News):
+            await NewsRepository._write_day_rows(news)
+            count += 1
+        await NewsRepository.bump_generation()
+        return count
@@ -1,22 +1,336 @@
+import asyncio
+from datetime import datetime, timezone
 from uuid import UUID
-from typing import List
-from app.domain.entities.post import Post
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core import async_cassandra as db
+from app.core.statements import statements
+from app.domain.entities.post import Post, PostByDay, FeedDay, PostByUser, UserPostCount, PostByTag, TagPostCount, PostActivity
+from app.utils.pagination import as_utc, to_millis, from_millis
+
+FEED_BUCKET = "posts"
+TAG_BUCKET = "posts"
+MAX_TAG_LENGTH = 64
+# The legacy, unpaged listing of a user's posts returns at most this many of the newest
+MAX_UNPAGED_USER_POSTS = 100
+
+POST_BY_ID = statements.register("post_by_id", f"SELECT * FROM {db.table(Post)} WHERE id = ?")
+POSTS_BY_IDS = statements.register("posts_by_ids", f"SELECT * FROM {db.table(Post)} WHERE id IN ?")
+FEED_DAYS = statements.register("feed_days", f"SELECT * FROM {db.table(FeedDay)} WHERE bucket = ?")
+FEED_DAYS_BEFORE = statements.register(
+    "feed_days_before", f"SELECT * FROM {db.table(FeedDay)} WHERE bucket = ? AND day <= ?"
+)
+FEED_ROWS = statements.register("feed_rows", f"SELECT * FROM {db.table(PostByDay)} WHERE day = ? LIMIT ?")
+FEED_ROWS_AT = statements.register(
+    "feed_rows_at", f"SELECT * FROM {db.table(PostByDay)} WHERE day = ? AND created_at = ? AND id > ? LIMIT ?"
+)
+FEED_ROWS_BEFORE = statements.register(
+    "feed_rows_before", f"SELECT * FROM {db.table(PostByDay)} WHERE day = ? AND created_at < ? LIMIT ?"
+)
+POSTS_BY_USER = statements.register(
+    "posts_by_user", f"SELECT * FROM {db.table(PostByUser)} WHERE user_id = ? LIMIT ?"
+)
+POSTS_BY_USER_AT = statements.register(
+    "posts_by_user_at",
+    f"SELECT * FROM {db.table(PostByUser)} WHERE user_id = ? AND created_at = ? AND id > ? LIMIT ?"
+)
+POSTS_BY_USER_BEFORE = statements.register(
+    "posts_by_user_before",
+    f"SELECT * FROM {db.table(PostByUser)} WHERE user_id = ? AND created_at < ? LIMIT ?"
+)
+USER_POST_COUNT = statements.register(
+    "user_post_count", f"SELECT * FROM {db.table(UserPostCount)} WHERE user_id = ?"
+)
+USER_POST_COUNT_ADD = statements.register(
+    "user_post_count_add",
+    f"UPDATE {db.table(UserPostCount)} SET post_count = post_count + ? WHERE user_id = ?"
+)
+POSTS_BY_TAG = statements.register(
+    "posts_by_tag", f"SELECT * FROM {db.table(PostByTag)} WHERE tag = ? LIMIT ?"
+)
+POSTS_BY_TAG_AT = statements.register(
+    "posts_by_tag_at",
+    f"SELECT * FROM {db.table(PostByTag)} WHERE tag = ? AND created_at = ? AND id > ? LIMIT ?"
+)
+POSTS_BY_TAG_BEFORE = statements.register(
+    "posts_by_tag_before",
+    f"SELECT * FROM {db.table(PostByTag)} WHERE tag = ? AND created_at < ? LIMIT ?"
+)
+TAG_COUNTS = statements.register(
+    "tag_counts", f"SELECT * FROM {db.table(TagPostCount)} WHERE bucket = ?"
+)
+TAG_COUNT_ADD = statements.register(
+    "tag_count_add",
+    f"UPDATE {db.table(TagPostCount)} SET post_count = post_count + ? WHERE bucket = ? AND tag = ?"
+)
+POST_ACTIVITY_BY_IDS = statements.register(
+    "post_activity_by_ids", f"SELECT * FROM {db.table(PostActivity)} WHERE post_id IN ?"
+)
+POST_ACTIVITY_TOUCH = statements.register(
+    "post_activity_touch", f"UPDATE {db.table(PostActivity)} SET last_activity_at = ? WHERE post_id = ?"
+)
+
+def normalize_tag(tag: str) -> str:
+    return tag.strip().lstrip("#").strip().lower()[:MAX_TAG_LENGTH]
+
+def post_tags(tags: Optional[Iterable[str]]) -> List[str]:
+    """The distinct, normalized tags a post is indexed under."""
+    return [tag for tag in dict.fromkeys(normalize_tag(tag) for tag in tags or []) if tag]
+
+def feed_day(created_at) -> str:
+    return as_utc(created_at).strftime("%Y-%m-%d")
+
+# Keys and types of the cursors built below, checked by `decode_cursor`
+async def collect_day_rows(
+    bucket: str, model, rows_stmt: str, at_stmt: str, before_stmt: str, needed: int, after: Optional[dict] = None
+) -> List:
+    """
+    Walks the feed_days of `bucket` newest first, reading only as many rows of `model` as needed.
+
+    `rows_stmt` takes (day, limit), `at_stmt` (day, created_at, id, limit) and `before_stmt`
+    (day, created_at, limit); `after` is a FEED_CURSOR-shaped cursor.
+    """
+    rows = []
+    if after:
+        days = await statements.fetch(FeedDay, FEED_DAYS_BEFORE, (bucket, after["d"]))
+    else:
+        days = await statements.fetch(FeedDay, FEED_DAYS, (bucket,))
+    for day in days:
+        if len(rows) >= needed:
+            break
+        if after and day.day == after["d"]:
+            created_at = from_millis(after["t"])
+            # Rows sharing the cursor's timestamp sort by id, so resume after the cursor id first.
+            rows.extend(await statements.fetch(
+                model, at_stmt, (day.day, created_at, UUID(after["i"]), needed - len(rows))
+            ))
+            if len(rows) < needed:
+                rows.extend(await statements.fetch(model, before_stmt, (day.day, created_at, needed - len(rows))))
+        else:
+            rows.extend(await statements.fetch(model, rows_stmt, (day.day, needed - len(rows))))
+    return rows[:needed]
+
+FEED_CURSOR = {"d": str, "t": int, "i": str}
+AUTHOR_CURSOR = {"t": int, "i": str}
+TAG_CURSOR = {"g": str, "t": int, "i": str}
+
+def feed_cursor(row: PostByDay) -> dict:
+    return {"d": row.day, "t": to_millis(row.created_at), "i": str(row.id)}
+
+def author_cursor(row: PostByUser) -> dict:
+    return {"t": to_millis(row.created_at), "i": str(row.id)}
+
+def tag_cursor(row: PostByTag) -> dict:
+    return {"g": row.tag, "t": to_millis(row.created_at), "i": str(row.id)}
 
 class PostRepository:
     @staticmethod
     async def create_post(post_data: dict) -> Post:
         new_post = Post(**post_data)
-        new_post.save()
+        await db.insert(new_post)
+        await asyncio.gather(
+            PostRepository._write_feed_rows(new_post),
+            db.insert(PostByUser(user_id=new_post.user_id, created_at=new_post.created_at, id=new_post.id)),
+            statements.execute(USER_POST_COUNT_ADD, (1, new_post.user_id)),
+            PostRepository._write_tag_rows(new_post, post_tags(new_post.tags)),
+        )
         return new_post
-    
+
+    @staticmethod
+    async def _write_tag_rows(post: Post, tags: List[str]):
+        await asyncio.gather(*(
+            write
+            for tag in tags
+            for write in (
+                db.insert(PostByTag(tag=tag, created_at=post.created_at, id=post.id)),
+                statements.execute(TAG_COUNT_ADD, (1, TAG_BUCKET, tag)),
+            )
+        ))
+
+    @staticmethod
+    async def _delete_tag_rows(post: Post, tags: List[str]):
+        await asyncio.gather(*(
+            write
+            for tag in tags
+            for write in (
+                db.delete(PostByTag(tag=tag, created_at=post.created_at, id=post.id)),
+                statements.execute(TAG_COUNT_ADD, (-1, TAG_BUCKET, tag)),
+            )
+        ))
+
+    @staticmethod
+    async def _write_feed_rows(post: Post):
+        day = feed_day(post.created_at)
+        await asyncio.gather(
+            db.insert(PostByDay(day=day, created_at=post.created_at, id=post.id)),
+            db.insert(FeedDay(bucket=FEED_BUCKET, day=day)),
+        )
+
     @staticmethod
     async def get_all_posts() -> List[Post]:
-        return Post.objects().all()
-    
+        return await db.select(Post)
+
     @staticmethod
     async def get_post_by_id(post_id: UUID) -> Post:
-        return Post.objects(id=post_id).first()
-    
+        return await statements.fetch_one(Post, POST_BY_ID, (post_id,))
+
+    @staticmethod
+    async def get_posts_by_ids(post_ids: List[UUID]) -> List[Post]:
+        """Fetches posts by id, preserving the order of `post_ids`."""
+        if not post_ids:
+            return []
+        rows = await statements.fetch(Post, POSTS_BY_IDS, (list(post_ids),))
+        posts = {post.id: post for post in rows}
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
+
     @staticmethod
     async def get_posts_by_userID(user_id: UUID) -> List[Post]:
-        return Post.objects(user_id=user_id).all()
\ No newline at end of file
+        rows = await statements.fetch(PostByUser, POSTS_BY_USER, (user_id, MAX_UNPAGED_USER_POSTS))
+        return await PostRepository.get_posts_by_ids([row.id for row in rows])
+
+    @staticmethod
+    async def get_posts_by_user_page(
+        user_id: UUID, limit: int, after: Optional[dict] = None
+    ) -> Tuple[List[Post], Optional[dict]]:
+        """Returns one newest-first page of a user's posts and the cursor for the next page, if any."""
+        if after:
+            created_at = from_millis(after["t"])
+            rows = await statements.fetch(
+                PostByUser, POSTS_BY_USER_AT, (user_id, created_at, UUID(after["i"]), limit + 1)
+            )
+            if len(rows) <= limit:
+                rows += await statements.fetch(
+                    PostByUser, POSTS_BY_USER_BEFORE, (user_id, created_at, limit + 1 - len(rows))
+                )
+        else:
+            rows = await statements.fetch(PostByUser, POSTS_BY_USER, (user_id, limit + 1))
+        next_cursor = author_cursor(rows[limit - 1]) if len(rows) > limit else None
+        posts = await PostRepository.get_posts_by_ids([row.id for row in rows[:limit]])
+        return posts, next_cursor
+
+    @staticmethod
+    async def get_post_count(user_id: UUID) -> int:
+        counts = await statements.fetch_one(UserPostCount, USER_POST_COUNT, (user_id,))
+        return (counts.post_count or 0) if counts else 0
+
+    @staticmethod
+    async def update_post(post: Post, previous_tags: Optional[List[str]] = None) -> Post:
+        """Saves a post; pass the tags it had before the edit to move its posts_by_tag rows."""
+        saved = await db.save(post)
+        if previous_tags is not None:
+            old, new = post_tags(previous_tags), post_tags(post.tags)
+            await asyncio.gather(
+                PostRepository._delete_tag_rows(post, [tag for tag in old if tag not in new]),
+                PostRepository._write_tag_rows(post, [tag for tag in new if tag not in old]),
+            )
+        return saved
+
+    @staticmethod
+    async def delete_post(post: Post):
+        await asyncio.gather(
+            db.delete(PostByDay(day=feed_day(post.created_at), created_at=post.created_at, id=post.id)),
+            db.delete(PostByUser(user_id=post.user_id, created_at=post.created_at, id=post.id)),
+            statements.execute(USER_POST_COUNT_ADD, (-1, post.user_id)),
+            PostRepository._delete_tag_rows(post, post_tags(post.tags)),
+            db.delete(post),
+        )
+
+    @staticmethod
+    async def touch_activity(post_id: UUID):
+        await statements.execute(POST_ACTIVITY_TOUCH, (datetime.now(timezone.utc), post_id))
+
+    @staticmethod
+    async def get_activity(post_ids: Iterable[UUID]) -> Dict[UUID, datetime]:
+        post_ids = list(set(post_ids))
+        if not post_ids:
+            return {}
+        rows = await statements.fetch(PostActivity, POST_ACTIVITY_BY_IDS, (post_ids,))
+        return {row.post_id: row.last_activity_at for row in rows if row.last_activity_at}
+
+    @staticmethod
+    async def get_posts_by_tag_page(
+        tag: str, limit: int, after: Optional[dict] = None
+    ) -> Tuple[List[Post], Optional[dict]]:
+        """Returns one newest-first page of the posts carrying `tag` and the cursor for the next page, if any."""
+        tag = normalize_tag(tag)
+        if after:
+            if after.get("g") != tag:
+                raise ValueError("Cursor does not belong to this tag")
+            created_at = from_millis(after["t"])
+            rows = await statements.fetch(PostByTag, POSTS_BY_TAG_AT, (tag, created_at, UUID(after["i"]), limit + 1))
+            if len(rows) <= limit:
+                rows += await statements.fetch(
+                    PostByTag, POSTS_BY_TAG_BEFORE, (tag, created_at, limit + 1 - len(rows))
+                )
+        else:
+            rows = await statements.fetch(PostByTag, POSTS_BY_TAG, (tag, limit + 1))
+        next_cursor = tag_cursor(rows[limit - 1]) if len(rows) > limit else None
+        posts = await PostRepository.get_posts_by_ids([row.id for row in rows[:limit]])
+        return posts, next_cursor
+
+    @staticmethod
+    async def get_tag_counts() -> Dict[str, int]:
+        """Post counts of every tag in use, from the single tag_post_counts partition."""
+        rows = await statements.fetch(TagPostCount, TAG_COUNTS, (TAG_BUCKET,))
+        return {row.tag: row.post_count for row in rows if (row.post_count or 0) > 0}
+
+    @staticmethod
+    async def _collect_feed_rows(needed: int, after: Optional[dict] = None) -> List[PostByDay]:
+        return await collect_day_rows(
+            FEED_BUCKET, PostByDay, FEED_ROWS, FEED_ROWS_AT, FEED_ROWS_BEFORE, needed, after
+        )
+
+    @staticmethod
+    async def get_feed_page(limit: int, after: Optional[dict] = None) -> Tuple[List[Post], Optional[dict]]:
+        """Returns one newest-first page of posts and the cursor for the next page, if any."""
+        rows = await PostRepository._collect_feed_rows(limit + 1, after)
+        next_cursor = feed_cursor(rows[limit - 1]) if len(rows) > limit else None
+        posts = await PostRepository.get_posts_by_ids([row.id for row in rows[:limit]])
+        return posts, next_cursor
+
+    @staticmethod
+    async def get_recent_feed_rows(limit: int) -> List[PostByDay]:
+        return await PostRepository._collect_feed_rows(limit)
+
+    @staticmethod
+    async def get_feed_slice(offset: int, limit: int) -> List[Post]:
+        """Offset pagination over the feed table for clients still using page/page_size."""
+        rows = await PostRepository._collect_feed_rows(offset + limit)
+        return await PostRepository.get_posts_by_ids([row.id for row in rows[offset:]])
+
+    @staticmethod
+    async def backfill_feed() -> int:
+        """Writes feed rows for posts created before the feed table existed."""
+        count = 0
+        for post in await db.select(Post):
+            await PostRepository._write_feed_rows(post)
+            count += 1
+        return count
+
+    @staticmethod
+    async def backfill_posts_by_user() -> int:
+        """Writes posts_by_user rows for existing posts and recounts user_post_counts."""
+        totals: Dict[UUID, int] = {}
+        for post in await db.select(Post):
+            await db.insert(PostByUser(user_id=post.user_id, created_at=post.created_at, id=post.id))
+            totals[post.user_id] = totals.get(post.user_id, 0) + 1
+        current = {counts.user_id: counts.post_count or 0 for counts in await db.select(UserPostCount)}
+        for user_id in totals.keys() | current.keys():
+            delta = totals.get(user_id, 0) - current.get(user_id, 0)
+            if delta:
+                await statements.execute(USER_POST_COUNT_ADD, (delta, user_id))
+        return len(totals)
+
+    @staticmethod
+    async def backfill_posts_by_tag() -> int:
+        """Writes posts_by_tag rows for existing posts and recounts tag_post_counts."""
+        totals: Dict[str, int] = {}
+        for post in await db.select(Post):
+            for tag in post_tags(post.tags):
+                await db.insert(PostByTag(tag=tag, created_at=post.created_at, id=post.id))
+                totals[tag] = totals.get(tag, 0) + 1
+        current = {row.tag: row.post_count or 0 for row in await statements.fetch(TagPostCount, TAG_COUNTS, (TAG_BUCKET,))}
+        for tag in totals.keys() | current.keys():
+            delta = totals.get(tag, 0) - current.get(tag, 0)
+            if delta:
+                await statements.execute(TAG_COUNT_ADD, (delta, TAG_BUCKET, tag))
+        return sum(totals.values())
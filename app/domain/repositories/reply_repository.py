@@ -1,25 +1,150 @@
+import asyncio
 from uuid import UUID
 from datetime import datetime
-from typing import List
-from app.domain.entities.reply import Reply
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core import async_cassandra as db
+from app.core.statements import statements
+from app.domain.entities.reply import Reply, ReplyByPost, PostReplyCount
+from app.utils.pagination import to_millis, from_millis
+
+REPLY_BY_ID = statements.register("reply_by_id", f"SELECT * FROM {db.table(Reply)} WHERE id = ?")
+REPLIES_BY_PARENT = statements.register(
+    "replies_by_parent", f"SELECT * FROM {db.table(ReplyByPost)} WHERE parent_post_id = ?"
+)
+# Replies embedded in each PostResponse; the rest of a thread is paged through /posts/{id}/replies.
+REPLY_PREVIEW_LIMIT = 20
+
+REPLIES_BY_PARENTS = statements.register(
+    "replies_by_parents",
+    f"SELECT * FROM {db.table(ReplyByPost)} WHERE parent_post_id IN ? PER PARTITION LIMIT ?"
+)
+THREAD_PAGE = statements.register(
+    "thread_page", f"SELECT * FROM {db.table(ReplyByPost)} WHERE parent_post_id = ? LIMIT ?"
+)
+THREAD_PAGE_AT = statements.register(
+    "thread_page_at",
+    f"SELECT * FROM {db.table(ReplyByPost)} WHERE parent_post_id = ? AND created_at = ? AND id > ? LIMIT ?"
+)
+THREAD_PAGE_AFTER = statements.register(
+    "thread_page_after",
+    f"SELECT * FROM {db.table(ReplyByPost)} WHERE parent_post_id = ? AND created_at > ? LIMIT ?"
+)
+REPLY_COUNTS_BY_IDS = statements.register(
+    "reply_counts_by_ids", f"SELECT * FROM {db.table(PostReplyCount)} WHERE post_id IN ?"
+)
+REPLY_COUNT_ADD = statements.register(
+    "reply_count_add", f"UPDATE {db.table(PostReplyCount)} SET reply_count = reply_count + ? WHERE post_id = ?"
+)
+THREAD_DELETE = statements.register(
+    "thread_delete", f"DELETE FROM {db.table(ReplyByPost)} WHERE parent_post_id = ?"
+)
+REPLY_COUNT_DELETE = statements.register(
+    "reply_count_delete", f"DELETE FROM {db.table(PostReplyCount)} WHERE post_id = ?"
+)
+
+def thread_row(reply: Reply) -> ReplyByPost:
+    return ReplyByPost(**{name: getattr(reply, name) for name in ReplyByPost._columns})
+
+THREAD_CURSOR = {"t": int, "i": str}
+
+def thread_cursor(row: ReplyByPost) -> dict:
+    return {"t": to_millis(row.created_at), "i": str(row.id)}
 
 class ReplyRepository:
     @staticmethod
     async def create_reply(reply: dict) -> Reply:
-        print("Attempting to create reply with data:", reply)
         new_reply = Reply(**reply)
-        new_reply.save()
+        await db.insert(new_reply)
+        await asyncio.gather(
+            db.insert(thread_row(new_reply)),
+            statements.execute(REPLY_COUNT_ADD, (1, new_reply.parent_post_id)),
+        )
         return new_reply
-    
+
     @staticmethod
-    async def get_all_replies_by_parent_id(parent_id: UUID) -> List[Reply]:
-        try:
-            replies = Reply.objects.filter(parent_post_id=parent_id).all()
-            return list(replies)
-        except Exception as e:
-            print(f"Error fetching replies for parent_id {parent_id}: {e}")
-            return []
-        
+    async def get_all_replies() -> List[Reply]:
+        return await db.select(Reply)
+
+    @staticmethod
+    async def get_all_replies_by_parent_id(parent_id: UUID) -> List[ReplyByPost]:
+        return await statements.fetch(ReplyByPost, REPLIES_BY_PARENT, (parent_id,))
+
+    @staticmethod
+    async def get_replies_by_parent_ids(parent_ids: Iterable[UUID], per_post_limit: int) -> Dict[UUID, List[ReplyByPost]]:
+        """The oldest `per_post_limit` replies of each post, from a single partition-key IN query."""
+        parent_ids = list(dict.fromkeys(parent_ids))
+        replies: Dict[UUID, List[ReplyByPost]] = {parent_id: [] for parent_id in parent_ids}
+        if not parent_ids:
+            return replies
+        for row in await statements.fetch(ReplyByPost, REPLIES_BY_PARENTS, (parent_ids, per_post_limit)):
+            replies[row.parent_post_id].append(row)
+        return replies
+
+    @staticmethod
+    async def get_reply_counts(post_ids: Iterable[UUID]) -> Dict[UUID, int]:
+        post_ids = list(set(post_ids))
+        if not post_ids:
+            return {}
+        rows = await statements.fetch(PostReplyCount, REPLY_COUNTS_BY_IDS, (post_ids,))
+        return {row.post_id: row.reply_count or 0 for row in rows}
+
+    @staticmethod
+    async def get_thread_page(
+        post_id: UUID, limit: int, after: Optional[dict] = None
+    ) -> Tuple[List[ReplyByPost], Optional[dict]]:
+        """Returns the next `limit` replies of a post in creation order and the cursor after them."""
+        if after:
+            created_at = from_millis(after["t"])
+            rows = await statements.fetch(
+                ReplyByPost, THREAD_PAGE_AT, (post_id, created_at, UUID(after["i"]), limit + 1)
+            )
+            if len(rows) <= limit:
+                rows += await statements.fetch(
+                    ReplyByPost, THREAD_PAGE_AFTER, (post_id, created_at, limit + 1 - len(rows))
+                )
+        else:
+            rows = await statements.fetch(ReplyByPost, THREAD_PAGE, (post_id, limit + 1))
+        next_cursor = thread_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
     @staticmethod
     async def get_reply_by_id(reply_id: UUID) -> Reply:
-        return Reply.objects(id=reply_id).first()
+        return await statements.fetch_one(Reply, REPLY_BY_ID, (reply_id,))
+
+    @staticmethod
+    async def update_reply(reply: Reply) -> Reply:
+        await asyncio.gather(db.save(reply), db.insert(thread_row(reply)))
+        return reply
+
+    @staticmethod
+    async def delete_reply(reply: Reply):
+        await asyncio.gather(
+            db.delete(reply),
+            db.delete(thread_row(reply)),
+            statements.execute(REPLY_COUNT_ADD, (-1, reply.parent_post_id)),
+        )
+
+    @staticmethod
+    async def delete_replies_by_post(post_id: UUID) -> List[ReplyByPost]:
+        """Deletes every reply of a post with its thread partition and reply counter; returns the deleted rows."""
+        rows = await statements.fetch(ReplyByPost, REPLIES_BY_PARENT, (post_id,))
+        await asyncio.gather(
+            *(db.delete(Reply(id=row.id)) for row in rows),
+            statements.execute(THREAD_DELETE, (post_id,)),
+            statements.execute(REPLY_COUNT_DELETE, (post_id,)),
+        )
+        return rows
+
+    @staticmethod
+    async def backfill_replies_by_post() -> int:
+        """Copies existing replies into replies_by_post and recounts post_reply_counts."""
+        totals: Dict[UUID, int] = {}
+        for reply in await db.select(Reply):
+            await db.insert(thread_row(reply))
+            totals[reply.parent_post_id] = totals.get(reply.parent_post_id, 0) + 1
+        current = {row.post_id: row.reply_count or 0 for row in await db.select(PostReplyCount)}
+        for post_id in totals.keys() | current.keys():
+            delta = totals.get(post_id, 0) - current.get(post_id, 0)
+            if delta:
+                await statements.execute(REPLY_COUNT_ADD, (delta, post_id))
+        return sum(totals.values())
@@ -1,26 +1,38 @@
+import hashlib
 from uuid import UUID
+from app.core import async_cassandra as db
+from app.core.statements import statements
 from app.domain.entities.token import RefreshToken
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+
+TOKEN_INSERT = statements.register(
+    "refresh_token_insert",
+    f"INSERT INTO {db.table(RefreshToken)} (user_id, token_hash, expires_at, created_at) "
+    f"VALUES (?, ?, ?, ?) USING TTL ?"
+)
+TOKEN_REVOKE = statements.register(
+    "refresh_token_revoke", f"DELETE FROM {db.table(RefreshToken)} WHERE user_id = ? AND token_hash = ? IF EXISTS"
+)
+TOKENS_REVOKE_ALL = statements.register(
+    "refresh_tokens_revoke_all", f"DELETE FROM {db.table(RefreshToken)} WHERE user_id = ?"
+)
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
 
 class RefreshTokenRepository:
     @staticmethod
-    async def delete_by_user_and_token(user_id: UUID, token: str) -> bool:
-        token_record = RefreshToken.objects.filter(user_id=user_id, token=token).first()
-        if token_record:
-            token_record.delete()
-            still_exists = RefreshToken.objects.filter(user_id=user_id, token=token).first()
-            return not still_exists
-        return False
-    
-    @staticmethod
-    async def get_by_user_and_token(user_id: UUID, token: str) -> Optional[RefreshToken]:
-        return RefreshToken.objects.filter(user_id=user_id, token=token).first()
+    async def save(user_id: UUID, token: str, expires_at: datetime):
+        now = datetime.now(timezone.utc)
+        ttl = max(int((expires_at - now).total_seconds()), 1)
+        await statements.execute(TOKEN_INSERT, (user_id, token_digest(token), expires_at, now, ttl))
 
     @staticmethod
-    async def delete(token: RefreshToken):
-        token.delete()
+    async def revoke(user_id: UUID, token: str) -> bool:
+        """Deletes a stored token; False if it did not exist (unknown, expired or already used)."""
+        rows = await statements.execute(TOKEN_REVOKE, (user_id, token_digest(token)))
+        return rows[0]["[applied]"]
 
     @staticmethod
-    async def save(user_id: UUID, token: str, expires_at: datetime):
-        RefreshToken.create(user_id=user_id, token=token, expires_at=expires_at)
+    async def revoke_all(user_id: UUID):
+        await statements.execute(TOKENS_REVOKE_ALL, (user_id,))
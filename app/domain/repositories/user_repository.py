@@ -1,29 +1,134 @@
-from typing import Optional, List
+import asyncio
+from typing import Dict, Iterable, Optional, List
 from uuid import UUID
-from app.domain.entities.user import User
+from app.core import async_cassandra as db
+from app.core.invalidation import USER_CHANGED, publish
+from app.core.statements import statements
+from app.domain.entities.user import User, UserByWallet, UserByDisplayName
 from datetime import datetime, timezone
 
+USER_BY_ID = statements.register("user_by_id", f"SELECT * FROM {db.table(User)} WHERE id = ?")
+USERS_BY_IDS = statements.register("users_by_ids", f"SELECT * FROM {db.table(User)} WHERE id IN ?")
+USER_ID_BY_WALLET = statements.register(
+    "user_id_by_wallet", f"SELECT user_id FROM {db.table(UserByWallet)} WHERE wallet_address = ?"
+)
+USER_ID_BY_DISPLAY_NAME = statements.register(
+    "user_id_by_display_name", f"SELECT user_id FROM {db.table(UserByDisplayName)} WHERE display_name = ?"
+)
+WALLET_RELEASE = statements.register(
+    "wallet_release", f"DELETE FROM {db.table(UserByWallet)} WHERE wallet_address = ? IF user_id = ?"
+)
+DISPLAY_NAME_RELEASE = statements.register(
+    "display_name_release", f"DELETE FROM {db.table(UserByDisplayName)} WHERE display_name = ? IF user_id = ?"
+)
+
 class UserRepository:
     @staticmethod
     async def get_all_users() -> List[User]:
-        return User.objects().all()
+        return await db.select(User)
     
+    @staticmethod
+    async def _get_by_claim(statement: str, key: str) -> Optional[User]:
+        rows = await statements.execute(statement, (key,))
+        if not rows:
+            return None
+        return await UserRepository.get_by_user_id(rows[0]["user_id"])
+
     @staticmethod
     async def get_by_wallet_address(wallet_address: str) -> Optional[User]:
-        return User.objects(wallet_address=wallet_address).first()
+        return await UserRepository._get_by_claim(USER_ID_BY_WALLET, wallet_address)
 
     @staticmethod
     async def get_by_display_name(display_name: str) -> Optional[User]:
-        return User.objects(display_name=display_name).first()
+        return await UserRepository._get_by_claim(USER_ID_BY_DISPLAY_NAME, display_name)
+
+    @staticmethod
+    async def is_display_name_available(display_name: str) -> bool:
+        return not await statements.execute(USER_ID_BY_DISPLAY_NAME, (display_name,))
+
+    @staticmethod
+    async def claim_wallet_address(wallet_address: str, user_id: UUID) -> bool:
+        """Reserves a wallet address for a user; False if another user already holds it."""
+        return await db.insert(UserByWallet(wallet_address=wallet_address, user_id=user_id), if_not_exists=True)
+
+    @staticmethod
+    async def claim_display_name(display_name: str, user_id: UUID) -> bool:
+        """Reserves a display name for a user; False if another user already holds it."""
+        return await db.insert(UserByDisplayName(display_name=display_name, user_id=user_id), if_not_exists=True)
+
+    @staticmethod
+    async def release_wallet_address(wallet_address: str, user_id: UUID):
+        await statements.execute(WALLET_RELEASE, (wallet_address, user_id))
+
+    @staticmethod
+    async def release_display_name(display_name: str, user_id: UUID):
+        await statements.execute(DISPLAY_NAME_RELEASE, (display_name, user_id))
     
     @staticmethod
     async def get_by_user_id(user_id: UUID) -> Optional[User]:
-        return User.objects(id=user_id).first()
+        return await statements.fetch_one(User, USER_BY_ID, (user_id,))
+
+    @staticmethod
+    async def get_by_user_ids(user_ids: Iterable[UUID]) -> Dict[UUID, User]:
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return {}
+        users = await statements.fetch(User, USERS_BY_IDS, (user_ids,))
+        return {user.id: user for user in users}
 
     @staticmethod
     async def create(user_data: dict) -> User:
-        return User.create(**user_data)
+        """Claims the wallet address and display name, then inserts the user."""
+        user = User(**user_data)
+        if not await UserRepository.claim_wallet_address(user.wallet_address, user.id):
+            raise ValueError("User with this wallet address already exists")
+        if not await UserRepository.claim_display_name(user.display_name, user.id):
+            await UserRepository.release_wallet_address(user.wallet_address, user.id)
+            raise ValueError("Display name already taken")
+        try:
+            await db.insert(user)
+        except Exception:
+            await asyncio.gather(
+                UserRepository.release_wallet_address(user.wallet_address, user.id),
+                UserRepository.release_display_name(user.display_name, user.id),
+            )
+            raise
+        return user
+
+    @staticmethod
+    async def save(user: User) -> User:
+        await db.save(user)
+        publish(USER_CHANGED, user.id)
+        return user
 
     @staticmethod
     async def update_last_login(user: User):
-        user.update(last_login=datetime.now(timezone.utc))
\ No newline at end of file
+        user.last_login = datetime.now(timezone.utc)
+        await db.save(user)
+        publish(USER_CHANGED, user.id)
+
+    @staticmethod
+    async def backfill_lookup_tables() -> List[str]:
+        """Claims the wallet address and display name of every existing user; returns the conflicts."""
+        conflicts = []
+        for user in await db.select(User):
+            if not await UserRepository._holds_claim(
+                UserRepository.claim_wallet_address, UserByWallet, USER_ID_BY_WALLET, user.wallet_address, user.id
+            ):
+                conflicts.append(f"wallet {user.wallet_address} of user {user.id}")
+            if not await UserRepository._holds_claim(
+                UserRepository.claim_display_name, UserByDisplayName, USER_ID_BY_DISPLAY_NAME, user.display_name, user.id
+            ):
+                conflicts.append(f"display name {user.display_name} of user {user.id}")
+        return conflicts
+
+    @staticmethod
+    async def _holds_claim(claim, model, statement: str, key: str, user_id: UUID) -> bool:
+        """Claims `key` for the user, or confirms the user already holds it."""
+        if await claim(key, user_id):
+            return True
+        holder = await statements.fetch_one(model, statement, (key,))
+        if holder is None:
+            # Released between the failed claim and the read; try once more
+            return await claim(key, user_id)
+        return holder.user_id == user_id
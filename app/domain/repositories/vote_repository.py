@@ -1,65 +1,140 @@
 from datetime import datetime, timezone
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional
 from uuid import UUID
-from app.domain.entities.vote import Vote
+from app.core import async_cassandra as db
+from app.core.statements import statements
+from app.domain.entities.vote import Vote, PostVoteCount
+
+VOTE_BY_USER = statements.register(
+    "vote_by_user", f"SELECT * FROM {db.table(Vote)} WHERE post_id = ? AND user_id = ?"
+)
+VOTE_INSERT = statements.register(
+    "vote_insert",
+    f"INSERT INTO {db.table(Vote)} (post_id, user_id, vote_type, created_at) VALUES (?, ?, ?, ?) IF NOT EXISTS"
+)
+VOTE_CHANGE = statements.register(
+    "vote_change",
+    f"UPDATE {db.table(Vote)} SET vote_type = ? WHERE post_id = ? AND user_id = ? IF vote_type = ?"
+)
+VOTE_DELETE = statements.register(
+    "vote_delete", f"DELETE FROM {db.table(Vote)} WHERE post_id = ? AND user_id = ? IF vote_type = ?"
+)
+VOTE_COUNTS_BY_ID = statements.register(
+    "vote_counts_by_id", f"SELECT * FROM {db.table(PostVoteCount)} WHERE post_id = ?"
+)
+VOTE_COUNTS_BY_IDS = statements.register(
+    "vote_counts_by_ids", f"SELECT * FROM {db.table(PostVoteCount)} WHERE post_id IN ?"
+)
+VOTE_COUNTS_ADD = statements.register(
+    "vote_counts_add",
+    f"UPDATE {db.table(PostVoteCount)} SET upvotes = upvotes + ?, downvotes = downvotes + ? WHERE post_id = ?"
+)
 
 class VoteRepository:
     @staticmethod
     async def get_all_votes() -> List[Vote]:
-        return Vote.objects().all()
-    
+        return await db.select(Vote)
+
     @staticmethod
     async def get_votes_by_id(post_id: UUID) -> List[Vote]:
-        return Vote.objects(post_id=post_id).all()
+        return await db.select(Vote, "post_id = %s", (post_id,))
 
     @staticmethod
-    async def calculate_vote_totals() -> Dict[UUID, Dict[str, int]]:
-        votes = await VoteRepository.get_all_votes()
-        vote_totals = {}
-        
-        for vote in votes:
-            if vote.post_id not in vote_totals:
-                vote_totals[vote.post_id] = {'upvotes': 0, 'downvotes': 0}
-
-            if vote.vote_type == True:
-                vote_totals[vote.post_id]['upvotes'] += 1
-            elif vote.vote_type == False:
-                vote_totals[vote.post_id]['downvotes'] += 1
+    async def _apply_delta(post_id: UUID, upvotes: int, downvotes: int):
+        await statements.execute(VOTE_COUNTS_ADD, (upvotes, downvotes, post_id))
+
+    @staticmethod
+    async def get_vote(post_id: UUID, user_id: UUID) -> Optional[Vote]:
+        return await statements.fetch_one(Vote, VOTE_BY_USER, (post_id, user_id))
+
+    @staticmethod
+    def _vote_delta(vote_type: bool, sign: int = 1):
+        return (sign, 0) if vote_type else (0, sign)
+
+    @staticmethod
+    async def calculate_votes_by_id(post_id: UUID) -> Dict[str, int]:
+        counts = await statements.fetch_one(PostVoteCount, VOTE_COUNTS_BY_ID, (post_id,))
+        if counts is None:
+            return {'upvotes': 0, 'downvotes': 0}
+        return {'upvotes': counts.upvotes or 0, 'downvotes': counts.downvotes or 0}
 
-        return vote_totals
-    
     @staticmethod
-    async def calculate_votes_by_id(post_id: UUID):
-        votes = await VoteRepository.get_votes_by_id(post_id)
-        vote_totals = {'upvotes': 0, 'downvotes': 0}
+    async def calculate_votes_by_ids(post_ids: Iterable[UUID]) -> Dict[UUID, Dict[str, int]]:
+        post_ids = list(set(post_ids))
+        vote_totals = {post_id: {'upvotes': 0, 'downvotes': 0} for post_id in post_ids}
+        if not post_ids:
+            return vote_totals
 
-        for vote in votes:
-            if vote.vote_type == True:
-                vote_totals['upvotes'] += 1
-            elif vote.vote_type == False:
-                vote_totals['downvotes'] += 1
+        for counts in await statements.fetch(PostVoteCount, VOTE_COUNTS_BY_IDS, (post_ids,)):
+            vote_totals[counts.post_id] = {'upvotes': counts.upvotes or 0, 'downvotes': counts.downvotes or 0}
 
         return vote_totals
-    
+
     @staticmethod
     async def create_vote(post_id: UUID, user_id: UUID, vote_type: bool) -> Vote:
         """Create a vote if the user has not already voted on this post."""
-        existing_vote = Vote.objects(post_id=post_id, user_id=user_id).first()
-        if existing_vote:
+        vote = Vote(post_id=post_id, user_id=user_id, vote_type=vote_type, created_at=datetime.now(timezone.utc))
+        rows = await statements.execute(VOTE_INSERT, (post_id, user_id, vote_type, vote.created_at))
+        if not rows[0]["[applied]"]:
             raise ValueError("You already voted on this post.")
-        vote = Vote.create(post_id=post_id, user_id=user_id, vote_type=vote_type)
+        await VoteRepository._apply_delta(post_id, *VoteRepository._vote_delta(vote_type))
         return vote
-    
+
     @staticmethod
     async def update_vote(post_id: UUID, user_id: UUID, vote_type: bool) -> Vote:
         """Update the vote type for a given post by user."""
-        vote = Vote.objects(post_id=post_id, user_id=user_id).first()
-        if vote:
-            vote.update(vote_type=vote_type)
+        vote = await VoteRepository.get_vote(post_id, user_id)
+        if not vote:
+            raise ValueError("Vote does not exist.")
+        if vote.vote_type == vote_type:
             return vote
-        raise ValueError("Vote does not exist.")
-    
+        # Conditional on the value we read, so a concurrent flip cannot be counted twice.
+        rows = await statements.execute(VOTE_CHANGE, (vote_type, post_id, user_id, vote.vote_type))
+        if not rows[0]["[applied]"]:
+            raise ValueError("Vote was changed concurrently, please retry.")
+        up_added, down_added = VoteRepository._vote_delta(vote_type)
+        up_removed, down_removed = VoteRepository._vote_delta(vote.vote_type, -1)
+        await VoteRepository._apply_delta(post_id, up_added + up_removed, down_added + down_removed)
+        vote.vote_type = vote_type
+        return vote
+
     @staticmethod
     async def delete_vote(post_id: UUID, user_id: UUID) -> None:
         """Delete a user's vote on a post."""
-        Vote.objects(post_id=post_id, user_id=user_id).delete()
+        vote = await VoteRepository.get_vote(post_id, user_id)
+        if not vote:
+            return
+        rows = await statements.execute(VOTE_DELETE, (post_id, user_id, vote.vote_type))
+        if not rows[0]["[applied]"]:
+            raise ValueError("Vote was changed concurrently, please retry.")
+        await VoteRepository._apply_delta(post_id, *VoteRepository._vote_delta(vote.vote_type, -1))
+
+    @staticmethod
+    async def reconcile_vote_counts() -> int:
+        """
+        Rebuilds post_vote_counts from the raw Vote rows.
+
+        Counters can only be incremented, so each row is moved by the difference between the
+        recounted total and its current value. Votes cast while this runs may be off by one
+        until the next reconciliation.
+        """
+        totals: Dict[UUID, List[int]] = {}
+        for vote in await db.select(Vote):
+            up, down = VoteRepository._vote_delta(vote.vote_type)
+            entry = totals.setdefault(vote.post_id, [0, 0])
+            entry[0] += up
+            entry[1] += down
+
+        current = {
+            counts.post_id: (counts.upvotes or 0, counts.downvotes or 0)
+            for counts in await db.select(PostVoteCount)
+        }
+
+        adjusted = 0
+        for post_id in totals.keys() | current.keys():
+            up, down = totals.get(post_id, (0, 0))
+            current_up, current_down = current.get(post_id, (0, 0))
+            if (up, down) != (current_up, current_down):
+                await VoteRepository._apply_delta(post_id, up - current_up, down - current_down)
+                adjusted += 1
+        return adjusted
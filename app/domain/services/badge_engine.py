@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Sequence, Tuple
+from uuid import UUID
+from app.domain.repositories.badge_repository import BadgeRepository
+from app.domain.repositories.follow_repository import FollowRepository
+from app.domain.repositories.post_repository import PostRepository
+from app.domain.repositories.vote_repository import VoteRepository
+from app.domain.services.profile_cache import profile_cache
+
+logger = logging.getLogger(__name__)
+
+BADGE_QUEUE_SIZE = 10000
+
+@dataclass(frozen=True)
+class PostCreated:
+    user_id: UUID
+
+@dataclass(frozen=True)
+class FollowerAdded:
+    user_id: UUID
+
+@dataclass(frozen=True)
+class VotesReceived:
+    post_id: UUID
+
+# A measure reads the current value a rule compares against its threshold and says who would
+# earn the badge; it returns None when the event no longer applies (e.g. the post was deleted).
+Measure = Callable[[Any], Awaitable[Optional[Tuple[UUID, int]]]]
+
+@dataclass(frozen=True)
+class BadgeRule:
+    badge_name: str
+    event_type: type
+    measure: Measure
+    threshold: int
+
+async def posts_written(event: PostCreated) -> Tuple[UUID, int]:
+    return event.user_id, await PostRepository.get_post_count(event.user_id)
+
+async def followers(event: FollowerAdded) -> Tuple[UUID, int]:
+    counts = await FollowRepository.get_follow_counts([event.user_id])
+    return event.user_id, counts[event.user_id]["follower_count"]
+
+async def post_upvotes(event: VotesReceived) -> Optional[Tuple[UUID, int]]:
+    post = await PostRepository.get_post_by_id(event.post_id)
+    if post is None:
+        return None
+    votes = await VoteRepository.calculate_votes_by_id(post.id)
+    return post.user_id, votes["upvotes"]
+
+RULES: Sequence[BadgeRule] = (
+    BadgeRule("First Post", PostCreated, posts_written, 1),
+    BadgeRule("10 Followers", FollowerAdded, followers, 10),
+    BadgeRule("Popular Post", VotesReceived, post_upvotes, 10),
+)
+
+class BadgeEngine:
+    """
+    Awards badges in the background from domain events.
+
+    Services `publish` events without waiting; `run` evaluates the matching rules and awards
+    through BadgeRepository.award, which is idempotent, so replays and races are harmless.
+    """
+
+    def __init__(self, rules: Sequence[BadgeRule] = RULES, maxsize: int = BADGE_QUEUE_SIZE):
+        self._rules = rules
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    def publish(self, event: Any):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Badge event queue is full, dropping %r", event)
+
+    async def run(self):
+        while True:
+            event = await self._queue.get()
+            try:
+                await self.process(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Failed to process badge event %r: %s", event, e)
+            finally:
+                self._queue.task_done()
+
+    async def process(self, event: Any):
+        for rule in self._rules:
+            if not isinstance(event, rule.event_type):
+                continue
+            measured = await rule.measure(event)
+            if measured is None:
+                continue
+            user_id, value = measured
+            if value < rule.threshold:
+                continue
+            badges = await profile_cache.get_badges([user_id])
+            if rule.badge_name not in badges.get(user_id, []):
+                await BadgeRepository.award(user_id, rule.badge_name)
+
+badge_engine = BadgeEngine()
@@ -0,0 +1,33 @@
+from contextvars import ContextVar
+from functools import partial
+from typing import Dict, List, Optional
+from uuid import UUID
+from app.domain.entities.user import User
+from app.domain.repositories.follow_repository import FollowRepository
+from app.domain.entities.reply import ReplyByPost
+from app.domain.repositories.reply_repository import REPLY_PREVIEW_LIMIT, ReplyRepository
+from app.domain.repositories.vote_repository import VoteRepository
+from app.domain.services.profile_cache import profile_cache
+from app.utils.dataloader import DataLoader
+
+class Loaders:
+    """The set of batching loaders shared by everything that runs within one request."""
+
+    def __init__(self):
+        self.users: DataLoader[UUID, User] = DataLoader(profile_cache.get_users)
+        self.badges: DataLoader[UUID, List[str]] = DataLoader(profile_cache.get_badges)
+        self.follow_counts: DataLoader[UUID, Dict[str, int]] = DataLoader(FollowRepository.get_follow_counts)
+        self.votes: DataLoader[UUID, Dict[str, int]] = DataLoader(VoteRepository.calculate_votes_by_ids)
+        self.reply_counts: DataLoader[UUID, int] = DataLoader(ReplyRepository.get_reply_counts)
+        self.reply_previews: DataLoader[UUID, List[ReplyByPost]] = DataLoader(
+            partial(ReplyRepository.get_replies_by_parent_ids, per_post_limit=REPLY_PREVIEW_LIMIT)
+        )
+
+request_loaders: ContextVar[Optional[Loaders]] = ContextVar("request_loaders", default=None)
+
+def get_loaders() -> Loaders:
+    loaders = request_loaders.get()
+    if loaders is None:
+        # Outside of a request (bot, maintenance commands) nothing is shared between calls.
+        loaders = Loaders()
+    return loaders
@@ -1,77 +1,95 @@
+import asyncio
+from datetime import datetime, timezone
 from uuid import UUID
-from typing import List, Tuple
-from app.domain.repositories.mention_repository import MentionRepository
-from app.domain.repositories.post_repository import PostRepository
-from app.domain.repositories.reply_repository import ReplyRepository
-from app.domain.repositories.user_repository import UserRepository
-from app.models.mention import MentionCreate, MentionResponse
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, status
+from app.domain.entities.mention import MentionByUser
+from app.domain.entities.user import User
+from app.domain.repositories.mention_repository import INBOX_CURSOR, MentionRepository
+from app.models.mention import MentionPage, MentionReadResult, MentionResponse
+from app.utils.conditional import Conditional, make_etag
+from app.utils.pagination import as_utc, decode_cursor, encode_cursor
+
+# Mention inboxes are per user, so shared caches must not keep them
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+def mentions_etag(mentions: List[MentionByUser], *extra) -> str:
+    return make_etag([(mention.id, mention.is_read, mention.author_avatar_url) for mention in mentions], extra)
 
 class MentionService:
     @staticmethod
-    async def get_mentions(user_id: UUID) -> List[MentionResponse]:
+    async def get_mentions(user_id: UUID, conditional: Optional[Conditional] = None) -> List[MentionResponse]:
         mentions = await MentionRepository.get_mentions_by_user_id(user_id)
-        mention_response = []
-        for mention in mentions:
-            if mention.parent_post_id is None:
-                fetch_post = await PostRepository.get_post_by_id(mention.post_id)
-                fetch_user = await UserRepository.get_by_user_id(fetch_post.user_id)
-                mention_response.append(
-                    MentionResponse(
-                        id=mention.id,
-                        user_id=fetch_post.user_id,
-                        profile_avatar_url=fetch_user.profile_photo_url,
-                        post_id=mention.post_id,
-                        parent_post_id=mention.parent_post_id,
-                        mentioned_user_id=mention.mentioned_user_id,
-                        created_at=mention.created_at,
-                        is_read=mention.is_read,
-                    )
-                )
-            else:
-                fetch_post = await ReplyRepository.get_reply_by_id(mention.post_id)
-                fetch_user = await UserRepository.get_by_user_id(fetch_post.user_id)
-                mention_response.append(
-                    MentionResponse(
-                        id=mention.id,
-                        user_id=fetch_post.user_id,
-                        profile_avatar_url=fetch_user.profile_photo_url,
-                        post_id=mention.post_id,
-                        parent_post_id=mention.parent_post_id,
-                        mentioned_user_id=mention.mentioned_user_id,
-                        created_at=mention.created_at,
-                        is_read=mention.is_read,
-                    )
-                )
-        return mention_response
+        if conditional:
+            conditional.check(mentions_etag(mentions), cache_control=PRIVATE_CACHE_CONTROL)
+        return [MentionService._build_response(mention) for mention in mentions]
+
+    @staticmethod
+    async def get_mentions_page(
+        user_id: UUID, limit: int, cursor: Optional[str] = None, conditional: Optional[Conditional] = None
+    ) -> MentionPage:
+        after = decode_cursor(cursor, INBOX_CURSOR) if cursor else None
+        (mentions, next_cursor), unread_count = await asyncio.gather(
+            MentionRepository.get_mentions_page(user_id, limit, after),
+            MentionRepository.get_unread_count(user_id),
+        )
+        next_cursor = encode_cursor(next_cursor) if next_cursor else None
+        if conditional:
+            conditional.check(mentions_etag(mentions, unread_count, next_cursor), cache_control=PRIVATE_CACHE_CONTROL)
+        return MentionPage(
+            mentions=[MentionService._build_response(mention) for mention in mentions],
+            unread_count=unread_count,
+            next_cursor=next_cursor,
+        )
+
+    @staticmethod
+    async def get_unread_count(user_id: UUID, user: User) -> int:
+        MentionService._check_owner(user_id, user)
+        return await MentionRepository.get_unread_count(user_id)
+
+    @staticmethod
+    async def mark_as_read(
+        mention_ids: List[Tuple[UUID, UUID]], user: User, include_rows: bool = False
+    ) -> MentionReadResult:
+        mentions, marked = await MentionRepository.mark_as_read(mention_ids, user.id)
+        return MentionReadResult(
+            found=len(mentions),
+            marked=marked,
+            mentions=[MentionService._build_response(mention) for mention in mentions] if include_rows else None,
+        )
+
+    @staticmethod
+    async def mark_one_as_read(post_id: UUID, mention_id: UUID, user: User) -> MentionResponse:
+        mentions, _ = await MentionRepository.mark_as_read([(post_id, mention_id)], user.id)
+        if not mentions:
+            raise HTTPException(status_code=404, detail="Mention not found")
+        return MentionService._build_response(mentions[0])
+
+    @staticmethod
+    async def mark_all_as_read(user_id: UUID, user: User, up_to: Optional[datetime] = None) -> MentionReadResult:
+        MentionService._check_owner(user_id, user)
+        now = datetime.now(timezone.utc)
+        up_to = min(as_utc(up_to), now) if up_to else now
+        marked = await MentionRepository.mark_all_as_read(user_id, up_to)
+        return MentionReadResult(found=marked, marked=marked)
 
     @staticmethod
-    async def mark_as_read(mention_ids: List[Tuple[UUID, UUID]]) -> List[MentionResponse]:
-        mentions = []
-        for post_id, mention_id in mention_ids:
-            mention = await MentionRepository.mark_as_read(post_id, mention_id)
-            if mention:
-                if mention.parent_post_id is None:
-                    fetch_post = await PostRepository.get_post_by_id(mention.post_id)
-                else:
-                    fetch_post = await ReplyRepository.get_reply_by_id(mention.post_id)
-                
-                fetch_user = await UserRepository.get_by_user_id(fetch_post.user_id)
-                
-                mentions.append(
-                    MentionResponse(
-                        id=mention.id,
-                        user_id=fetch_post.user_id,
-                        profile_avatar_url=fetch_user.profile_photo_url,
-                        post_id=mention.post_id,
-                        parent_post_id=mention.parent_post_id,
-                        mentioned_user_id=mention.mentioned_user_id,
-                        created_at=mention.created_at,
-                        is_read=mention.is_read,
-                    )
-                )
-        return mentions
+    def _check_owner(user_id: UUID, user: User) -> None:
+        if user.id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not allowed to access another user's mentions"
+            )
 
     @staticmethod
-    async def mark_as_read_by_id(mention_id: UUID) -> MentionResponse:
-        mention = await MentionRepository.mark_as_read(mention_id)
-        return MentionResponse.model_validate(mention)
+    def _build_response(mention: MentionByUser) -> MentionResponse:
+        return MentionResponse(
+            id=mention.id,
+            user_id=mention.author_id,
+            profile_avatar_url=mention.author_avatar_url,
+            post_id=mention.post_id,
+            parent_post_id=mention.parent_post_id,
+            mentioned_user_id=mention.mentioned_user_id,
+            created_at=mention.created_at,
+            is_read=mention.is_read,
+        )
@@ -0,0 +1,46 @@
+import time
+from typing import Optional
+from app.core.invalidation import NEWS_CHANGED, subscribe
+from app.domain.repositories.news_repository import NewsRepository
+from app.schemas.news import NewsPage
+from app.utils.cache import TTLCache
+
+NEWS_CACHE_SIZE = 16
+NEWS_CACHE_TTL = 300
+NEWS_GENERATION_CHECK_SECONDS = 5
+
+class NewsPageCache:
+    """
+    First pages of the news feed, keyed by page size.
+
+    A NEWS_CHANGED invalidation empties the cache in this process. Writes made by other
+    processes (the Discord bot, other workers) are noticed through the shared news generation
+    counter, read at most every NEWS_GENERATION_CHECK_SECONDS.
+    """
+
+    def __init__(self, maxsize: int = NEWS_CACHE_SIZE, ttl: float = NEWS_CACHE_TTL):
+        self._pages: TTLCache[int, NewsPage] = TTLCache("news_pages", maxsize, ttl)
+        self._generation: Optional[int] = None
+        self._checked_at = 0.0
+        # Bumped on every invalidation so a page read before a write is never stored after it
+        self.version = 0
+        subscribe(NEWS_CHANGED, self.invalidate)
+
+    async def get(self, page_size: int) -> Optional[NewsPage]:
+        if time.monotonic() - self._checked_at >= NEWS_GENERATION_CHECK_SECONDS:
+            self._checked_at = time.monotonic()
+            generation = await NewsRepository.get_generation()
+            if generation != self._generation:
+                self._generation = generation
+                self.invalidate()
+        return self._pages.get(page_size)
+
+    def set(self, page_size: int, page: NewsPage, version: int):
+        if version == self.version:
+            self._pages.set(page_size, page)
+
+    def invalidate(self, _key=None):
+        self.version += 1
+        self._pages.clear()
+
+news_pages = NewsPageCache()
@@ -1,17 +1,40 @@
 # app/services/news_service.py
 
-from typing import List
+from typing import List, Optional
 from uuid import UUID, uuid4
 from datetime import datetime, timezone
 from fastapi import HTTPException, status
 
-from app.schemas.news import NewsCreate, NewsResponse, NewsUpdate
+from app.schemas.news import NewsCreate, NewsPage, NewsResponse, NewsUpdate
+from app.domain.entities.news import News
 from app.domain.entities.user import User
-from app.domain.repositories.news_repository import NewsRepository
+from app.domain.repositories.news_repository import NEWS_CURSOR, NewsRepository
+from app.domain.services.news_cache import news_pages
+from app.domain.services.search_service import content_search
+from app.utils.conditional import Conditional, make_etag
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# The legacy, unpaged news listing returns at most this many of the newest items
+MAX_UNPAGED_NEWS = 100
+
+def news_response(news: News) -> NewsResponse:
+    return NewsResponse(
+        id=news.id,
+        user_id=news.user_id,
+        title=news.title,
+        content=news.content,
+        created_at=news.created_at,
+        updated_at=news.updated_at,
+        tags=news.tags or [],
+        image_url=news.image_url
+    )
+
+def news_etag(news_list: List, next_cursor: Optional[str] = None) -> str:
+    return make_etag([(news.id, news.created_at, news.updated_at) for news in news_list], next_cursor)
 
 class NewsService:
     @staticmethod
-    def create_news(news_create: NewsCreate, user: User) -> NewsResponse:
+    async def create_news(news_create: NewsCreate, user: User) -> NewsResponse:
         # Check if the user is an admin
         if "admin" not in user.roles:
             raise HTTPException(
@@ -31,54 +54,49 @@ class NewsService:
         }
 
         # Create news
-        new_news = NewsRepository.create_news(news_data)
-
-        return NewsResponse(
-            id=new_news.id,
-            user_id=new_news.user_id,
-            title=new_news.title,
-            content=new_news.content,
-            created_at=new_news.created_at,
-            tags=news_create.tags,
-            image_url=new_news.image_url
-        )
+        new_news = await NewsRepository.create_news(news_data)
+        content_search.index_news(new_news)
+
+        return news_response(new_news)
 
     @staticmethod
-    def get_all_news() -> List[NewsResponse]:
-        news_list = NewsRepository.get_all_news()
-        news_responses = []
-        for news in news_list:
-            news_response = NewsResponse(
-                id=news.id,
-                user_id=news.user_id,
-                title=news.title,
-                content=news.content,
-                created_at=news.created_at,
-                updated_at=news.updated_at,
-                tags=news.tags
-            )
-            news_responses.append(news_response)
-        return news_responses
+    async def get_all_news(conditional: Optional[Conditional] = None) -> List[NewsResponse]:
+        """The newest MAX_UNPAGED_NEWS items, served from the cached first page of news_by_day."""
+        page = await NewsService.get_news_page(MAX_UNPAGED_NEWS, None, conditional)
+        return page.news
+
+    @staticmethod
+    async def get_news_page(
+        page_size: int, cursor: Optional[str] = None, conditional: Optional[Conditional] = None
+    ) -> NewsPage:
+        if not cursor:
+            cached = await news_pages.get(page_size)
+            if cached is not None:
+                if conditional:
+                    conditional.check(news_etag(cached.news, cached.next_cursor))
+                return cached
+        version = news_pages.version
+        after = decode_cursor(cursor, NEWS_CURSOR) if cursor else None
+        news_list, next_cursor = await NewsRepository.get_news_page(page_size, after)
+        next_cursor = encode_cursor(next_cursor) if next_cursor else None
+        if conditional:
+            conditional.check(news_etag(news_list, next_cursor))
+        page = NewsPage(news=[news_response(news) for news in news_list], next_cursor=next_cursor)
+        if not cursor:
+            news_pages.set(page_size, page, version)
+        return page
 
     @staticmethod
-    def get_news_item(news_id: UUID) -> NewsResponse:
-        news = NewsRepository.get_news_by_id(news_id)
+    async def get_news_item(news_id: UUID) -> NewsResponse:
+        news = await NewsRepository.get_news_by_id(news_id)
         if not news:
             raise HTTPException(status_code=404, detail="News item not found")
 
-        return NewsResponse(
-            id=news.id,
-            user_id=news.user_id,
-            title=news.title,
-            content=news.content,
-            created_at=news.created_at,
-            updated_at=news.updated_at,
-            tags=news.tags
-        )
+        return news_response(news)
 
     @staticmethod
-    def update_news(news_id: UUID, news_update: NewsUpdate, user: User) -> NewsResponse:
-        news = NewsRepository.get_news_by_id(news_id)
+    async def update_news(news_id: UUID, news_update: NewsUpdate, user: User) -> NewsResponse:
+        news = await NewsRepository.get_news_by_id(news_id)
         if not news:
             raise HTTPException(status_code=404, detail="News item not found")
 
@@ -96,22 +114,17 @@ class NewsService:
             news.content = news_update.content
         if news_update.tags is not None:
             news.tags = news_update.tags
+        if news_update.image_url is not None:
+            news.image_url = news_update.image_url
         news.updated_at = datetime.now(timezone.utc)
-        NewsRepository.update_news(news)
-
-        return NewsResponse(
-            id=news.id,
-            user_id=news.user_id,
-            title=news.title,
-            content=news.content,
-            created_at=news.created_at,
-            updated_at=news.updated_at,
-            tags=news.tags
-        )
+        await NewsRepository.update_news(news)
+        content_search.index_news(news)
+
+        return news_response(news)
 
     @staticmethod
-    def delete_news(news_id: UUID, user: User):
-        news = NewsRepository.get_news_by_id(news_id)
+    async def delete_news(news_id: UUID, user: User):
+        news = await NewsRepository.get_news_by_id(news_id)
         if not news:
             raise HTTPException(status_code=404, detail="News item not found")
 
@@ -123,4 +136,5 @@ class NewsService:
             )
 
         # Delete the news item
-        NewsRepository.delete_news(news)
+        await NewsRepository.delete_news(news)
+        content_search.remove("news", news.id)
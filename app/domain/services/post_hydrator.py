@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Type
+from uuid import UUID
+from fastapi import HTTPException
+from app.domain.entities.post import Post
+from app.domain.entities.reply import Reply
+from app.domain.entities.user import User
+from app.domain.repositories.post_repository import PostRepository
+from app.domain.services.loaders import get_loaders
+from app.models.post import PostResponse, ReplyResponse
+from app.schemas.user import UserResponse
+from app.utils.conditional import make_etag
+from app.utils.pagination import as_utc
+
+class PostHydrator:
+    """Builds responses for a page of posts from a fixed number of bulk lookups."""
+
+    @staticmethod
+    async def hydrate(posts: List[Post]) -> List[PostResponse]:
+        if not posts:
+            return []
+        post_ids = [post.id for post in posts]
+        loaders = get_loaders()
+        replies_by_post, reply_counts = await asyncio.gather(
+            loaders.reply_previews.load_many(post_ids),
+            loaders.reply_counts.load_many(post_ids),
+        )
+        replies = [reply for post_replies in replies_by_post.values() for reply in post_replies]
+
+        author_ids = {post.user_id for post in posts}
+        user_ids = author_ids | {reply.user_id for reply in replies}
+        users, badges, follow_counts, vote_totals = await asyncio.gather(
+            loaders.users.load_many(user_ids),
+            loaders.badges.load_many(author_ids),
+            loaders.follow_counts.load_many(author_ids),
+            loaders.votes.load_many(post_ids + [reply.id for reply in replies]),
+        )
+
+        # Each author is validated from attributes once, then reused as a model by every post
+        authors: Dict[UUID, UserResponse] = {}
+        for author_id in author_ids:
+            user = users.get(author_id)
+            if user is None:
+                raise HTTPException(status_code=404, detail="User not found")
+            user.badges = badges.get(author_id) or []
+            user.follower_count = follow_counts[author_id]["follower_count"]
+            user.following_count = follow_counts[author_id]["following_count"]
+            authors[author_id] = UserResponse.model_validate(user)
+
+        post_responses = []
+        for post in posts:
+            totals = vote_totals.get(post.id) or {}
+            post_responses.append(
+                PostResponse(
+                    id=post.id,
+                    user=authors[post.user_id],
+                    title=post.title,
+                    tags=post.tags or [],
+                    content=post.content,
+                    created_at=post.created_at,
+                    updated_at=post.updated_at,
+                    upvotes=totals.get("upvotes", 0),
+                    downvotes=totals.get("downvotes", 0),
+                    is_flagged=post.is_flagged,
+                    ipfs_hash=post.ipfs_hash,
+                    view_cost=post.view_cost,
+                    creation_cost=post.creation_cost,
+                    replies=[
+                        PostHydrator.build_reply(reply, users.get(reply.user_id), vote_totals.get(reply.id) or {})
+                        for reply in replies_by_post.get(post.id) or []
+                    ],
+                    reply_count=reply_counts.get(post.id) or 0
+                )
+            )
+        return post_responses
+
+    @staticmethod
+    async def validators(posts: List[Post], *extra: Any) -> Tuple[str, Optional[datetime]]:
+        """
+        The ETag and Last-Modified of the responses `posts` would hydrate to, from counters, the
+        post_activity timestamps, the reply previews and the profiles of everyone shown. The
+        lookups go through the request loaders, so hydrating afterwards does not repeat them.
+
+        Last-Modified only suits a single post: a list can change by losing a post, which no
+        remaining timestamp records, so list endpoints send the ETag alone.
+        """
+        post_ids = [post.id for post in posts]
+        author_ids = {post.user_id for post in posts}
+        loaders = get_loaders()
+        replies_by_post, reply_counts, activity, badges, follow_counts = await asyncio.gather(
+            loaders.reply_previews.load_many(post_ids),
+            loaders.reply_counts.load_many(post_ids),
+            PostRepository.get_activity(post_ids),
+            loaders.badges.load_many(author_ids),
+            loaders.follow_counts.load_many(author_ids),
+        )
+        replies = [reply for post_replies in replies_by_post.values() for reply in post_replies or []]
+        # Reply authors' names and avatars are embedded too, so their profile_version counts
+        users, vote_totals = await asyncio.gather(
+            loaders.users.load_many(author_ids | {reply.user_id for reply in replies}),
+            loaders.votes.load_many(post_ids + [reply.id for reply in replies]),
+        )
+        etag = make_etag(
+            extra,
+            [
+                (
+                    post.id, post.updated_at, vote_totals.get(post.id), reply_counts.get(post.id), activity.get(post.id),
+                    [(reply.id, reply.updated_at, vote_totals.get(reply.id)) for reply in replies_by_post.get(post.id) or []],
+                )
+                for post in posts
+            ],
+            sorted(
+                (str(user_id), user.profile_version if user else None, badges.get(user_id), follow_counts.get(user_id))
+                for user_id, user in users.items()
+            ),
+        )
+        last_modified = max(
+            (as_utc(moment) for post in posts for moment in (post.created_at, post.updated_at, activity.get(post.id)) if moment),
+            default=None,
+        )
+        return etag, last_modified
+
+    @staticmethod
+    async def hydrate_one(post: Post) -> PostResponse:
+        return (await PostHydrator.hydrate([post]))[0]
+
+    @staticmethod
+    def build_reply(
+        reply: Reply, reply_user: User, vote_totals: Dict[str, int], model: Type[ReplyResponse] = ReplyResponse
+    ) -> ReplyResponse:
+        return model(
+            id=reply.id,
+            parent_post_id=reply.parent_post_id,
+            parent_reply_id=reply.parent_reply_id,
+            user_id=reply.user_id,
+            user_name=reply_user.display_name if reply_user else "Unknown User",
+            profile_photo_url=reply_user.profile_photo_url if reply_user else None,
+            created_at=reply.created_at,
+            updated_at=reply.updated_at,
+            upvotes=vote_totals.get("upvotes", 0),
+            downvotes=vote_totals.get("downvotes", 0),
+            content=reply.content,
+            view_cost=reply.view_cost,
+            creation_cost=reply.creation_cost,
+        )
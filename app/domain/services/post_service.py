@@ -1,60 +1,45 @@
+import asyncio
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 from uuid import UUID, uuid4
 from datetime import datetime, timezone
 from fastapi import HTTPException, Query
 from app.domain.entities.post import Post, PostView
-from app.domain.repositories.badge_repository import BadgeRepository
-from app.models.post import PostCreate, PostResponse, PostUpdate, ReplyCreate, ReplyResponse, ReplyUpdate
+from app.models.post import PostCreate, PostFeedPage, PostResponse, PostUpdate, ReplyCreate, ReplyResponse, ReplyUpdate, TagCount
 from app.domain.repositories.user_repository import UserRepository
-from app.domain.repositories.post_repository import PostRepository
+from app.domain.repositories.post_repository import AUTHOR_CURSOR, FEED_CURSOR, TAG_CURSOR, PostRepository, normalize_tag
 from app.domain.repositories.vote_repository import VoteRepository
 from app.domain.repositories.reply_repository import ReplyRepository
 from app.domain.repositories.mention_repository import MentionRepository
-from app.utils.mentions_utils import extract_mention_data
+from app.domain.services.loaders import get_loaders
+from app.domain.services.post_hydrator import PostHydrator
+from app.domain.services.badge_engine import PostCreated, badge_engine
+from app.domain.services.ranking_service import ranked_feeds
+from app.domain.services.search_service import content_search
+from app.utils.conditional import Conditional
+from app.utils.content_analyzer import analyze_content
+from app.utils.pagination import decode_cursor, encode_cursor
 
-class PostService:
-    @staticmethod
-    async def get_replies_by_post_id(post_id: UUID) -> List[ReplyResponse]:
-        fetch_replies = await ReplyRepository.get_all_replies_by_parent_id(post_id)
-        replies = []
-        for reply in fetch_replies:
-            reply_user = await UserRepository.get_by_user_id(reply.user_id)
-            profile_photo_url = reply_user.profile_photo_url if reply_user else None
-            reply_vote_totals = await VoteRepository.calculate_votes_by_id(reply.id)
-            replies.append(
-                ReplyResponse(
-                    id=reply.id,
-                    parent_post_id=reply.parent_post_id,
-                    parent_reply_id=reply.parent_reply_id,
-                    user_id=reply.user_id,
-                    user_name=reply_user.display_name if reply_user else "Unknown User",
-                    profile_photo_url=profile_photo_url,
-                    created_at=reply.created_at,
-                    updated_at=reply.updated_at,
-                    upvotes=reply_vote_totals.get("upvotes", 0),
-                    downvotes=reply_vote_totals.get("downvotes", 0),
-                    content=reply.content,
-                    view_cost=reply.view_cost,
-                    creation_cost=reply.creation_cost,
-                )
-            )
-        return replies
+def mentioned_user_ids(content: str) -> List[UUID]:
+    """The distinct, well-formed user ids mentioned with '@' in a post or reply body."""
+    user_ids = []
+    for mention_id in analyze_content(content, "@").mention_ids:
+        try:
+            user_ids.append(UUID(mention_id))
+        except (ValueError, TypeError, AttributeError):
+            continue
+    return user_ids
 
+class PostService:
     @staticmethod
     async def create(post: PostCreate) -> PostResponse:
         try:
             user_uuid = UUID(post.user_id)
         except ValueError as exc:
             raise HTTPException(status_code=400, detail="Invalid user_id format") from exc
-        user = await UserRepository.get_by_user_id(user_uuid)
+        user = await get_loaders().users.load(user_uuid)
         if user is None:
             raise HTTPException(status_code=404, detail="User not found")
-        existing_posts = await PostRepository.get_posts_by_userID(user_uuid)
-        if existing_posts:
-            is_first_post = len(existing_posts) == 0
-        else:
-            is_first_post = True
         new_post = await PostRepository.create_post({
             "id": uuid4(),
             "user_id": user.id,
@@ -65,29 +50,14 @@ class PostService:
             "is_flagged": False,
             "ipfs_hash": None
         })
+        ranked_feeds.note_post(new_post.id, new_post.created_at)
+        content_search.index_post(new_post)
 
-        mentioned_user_list = extract_mention_data(post.content, "@")
-        if mentioned_user_list:
-            for mentioned_user in mentioned_user_list:
-                await MentionRepository.create_mention({
-                    "id": uuid4(),
-                    "post_id": new_post.id,
-                    "mentioned_user_id": mentioned_user['id'],
-                    "created_at": datetime.now(timezone.utc),
-                })
+        await MentionRepository.create_mentions(new_post.id, None, mentioned_user_ids(post.content), user)
                 
-        if is_first_post:
-            existing_badge = await BadgeRepository.get_badge_by_user_id_and_badge_name(user.id, "First Post")
-            if existing_badge is None:
-                await BadgeRepository.create_badge({
-                    "id": uuid4(),
-                    "user_id": user.id,
-                    "badge_name": "First Post",
-                    "created_at": datetime.now(timezone.utc)
-                })
-        
-        badges = await BadgeRepository.get_badges_by_user_id(user.id)
-        user.badges = [badge.badge_name for badge in badges]
+        badge_engine.publish(PostCreated(user.id))
+
+        user.badges = await get_loaders().badges.load(user.id) or []
         return PostResponse(
             id=new_post.id,
             user=user,
@@ -105,74 +75,91 @@ class PostService:
         
         
     @staticmethod
-    async def get_all(page: int, page_size: int) -> List[PostResponse]:
-        posts = await PostRepository.get_all_posts()
-        vote_totals = await VoteRepository.calculate_vote_totals()
-        
-        sorted_posts = sorted(posts, key=lambda post: post.created_at, reverse=True)
-        start = (page - 1) * page_size
-        end = start + page_size
-        paginated_posts = sorted_posts[start:end]
-        
-        post_responses = []
-        for post in paginated_posts:
-            post_id = post.id
-            user = await UserRepository.get_by_user_id(post.user_id)
-            if user is None:
-                raise HTTPException(status_code=404, detail="User not found")
-            upvotes = vote_totals.get(post_id, {}).get('upvotes', 0)
-            downvotes = vote_totals.get(post_id, {}).get('downvotes', 0)
-            replies = await PostService.get_replies_by_post_id(post.id)
-            badges = await BadgeRepository.get_badges_by_user_id(user.id)
-            user.badges = [badge.badge_name for badge in badges]
-            post_response = PostResponse(
-                id=post.id,
-                user=user,
-                title=post.title,
-                tags=post.tags,
-                content=post.content,
-                created_at=post.created_at,
-                updated_at=post.updated_at,
-                upvotes=upvotes,
-                downvotes=downvotes,
-                is_flagged=post.is_flagged,
-                ipfs_hash=post.ipfs_hash,
-                view_cost=post.view_cost,
-                creation_cost=post.creation_cost,
-                replies=replies
-            )
-            post_responses.append(post_response)
-            
-        return post_responses or []
-    
+    async def get_all(page: int, page_size: int, conditional: Optional[Conditional] = None) -> List[PostResponse]:
+        posts = await PostRepository.get_feed_slice((page - 1) * page_size, page_size)
+        if conditional:
+            etag, _ = await PostHydrator.validators(posts)
+            conditional.check(etag)
+        return await PostHydrator.hydrate(posts)
+
+    @staticmethod
+    async def get_ranked(
+        sort: str, page: int, page_size: int, conditional: Optional[Conditional] = None
+    ) -> List[PostResponse]:
+        _, post_ids = await ranked_feeds.get_page(sort, (page - 1) * page_size, page_size)
+        posts = await PostRepository.get_posts_by_ids(post_ids)
+        if conditional:
+            etag, _ = await PostHydrator.validators(posts)
+            conditional.check(etag)
+        return await PostHydrator.hydrate(posts)
+
+    @staticmethod
+    async def get_ranked_feed(
+        sort: str, page_size: int, cursor: Optional[str] = None, conditional: Optional[Conditional] = None
+    ) -> PostFeedPage:
+        after = decode_cursor(cursor, {"s": str, "g": str, "o": int}) if cursor else {"s": sort, "g": "", "o": 0}
+        if after["s"] != sort:
+            raise ValueError("Cursor does not belong to this sort order")
+        if after["o"] < 0:
+            raise ValueError("Invalid cursor")
+        offset = after["o"]
+        # Pages after the first slice the snapshot the walk started on, not a re-sorted one
+        snapshot_id, post_ids = await ranked_feeds.get_page(sort, offset, page_size + 1, after["g"] or None)
+        posts = await PostRepository.get_posts_by_ids(post_ids[:page_size])
+        next_cursor = (
+            encode_cursor({"s": sort, "g": snapshot_id, "o": offset + page_size}) if len(post_ids) > page_size else None
+        )
+        if conditional:
+            etag, _ = await PostHydrator.validators(posts, next_cursor)
+            conditional.check(etag)
+        return PostFeedPage(posts=await PostHydrator.hydrate(posts), next_cursor=next_cursor)
+
     @staticmethod
-    async def get_post(post_id: UUID) -> PostResponse:
+    async def get_feed(
+        page_size: int, cursor: Optional[str] = None, conditional: Optional[Conditional] = None
+    ) -> PostFeedPage:
+        after = decode_cursor(cursor, FEED_CURSOR) if cursor else None
+        posts, next_cursor = await PostRepository.get_feed_page(page_size, after)
+        if conditional:
+            etag, _ = await PostHydrator.validators(posts, next_cursor)
+            conditional.check(etag)
+        return PostFeedPage(
+            posts=await PostHydrator.hydrate(posts),
+            next_cursor=encode_cursor(next_cursor) if next_cursor else None
+        )
+
+    @staticmethod
+    async def get_tag_feed(
+        tag: str, page_size: int, cursor: Optional[str] = None, conditional: Optional[Conditional] = None
+    ) -> PostFeedPage:
+        if not normalize_tag(tag):
+            raise ValueError("Tag cannot be empty")
+        after = decode_cursor(cursor, TAG_CURSOR) if cursor else None
+        posts, next_cursor = await PostRepository.get_posts_by_tag_page(tag, page_size, after)
+        if conditional:
+            etag, _ = await PostHydrator.validators(posts, next_cursor)
+            conditional.check(etag)
+        return PostFeedPage(
+            posts=await PostHydrator.hydrate(posts),
+            next_cursor=encode_cursor(next_cursor) if next_cursor else None
+        )
+
+    @staticmethod
+    async def get_tags(limit: int) -> List[TagCount]:
+        counts = await PostRepository.get_tag_counts()
+        tags = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [TagCount(tag=tag, post_count=post_count) for tag, post_count in tags]
+
+    @staticmethod
+    async def get_post(post_id: UUID, conditional: Optional[Conditional] = None) -> PostResponse:
         fetch_post = await PostRepository.get_post_by_id(post_id)
 
         if fetch_post is None:
             raise HTTPException(status_code=404, detail="Post not found")
+        if conditional:
+            conditional.check(*await PostHydrator.validators([fetch_post]))
         
-        user = await UserRepository.get_by_user_id(fetch_post.user_id)
-        vote_totals = await VoteRepository.calculate_votes_by_id(post_id)
-        replies = await PostService.get_replies_by_post_id(post_id)
-        badges = await BadgeRepository.get_badges_by_user_id(user.id)
-        user.badges = [badge.badge_name for badge in badges]
-        return PostResponse(
-            id=fetch_post.id,
-            user=user,
-            title=fetch_post.title,
-            tags=fetch_post.tags,
-            content=fetch_post.content,
-            created_at=fetch_post.created_at,
-            updated_at=fetch_post.updated_at,
-            upvotes=vote_totals["upvotes"],
-            downvotes=vote_totals["downvotes"],
-            is_flagged=fetch_post.is_flagged,
-            ipfs_hash=fetch_post.ipfs_hash,
-            view_cost=fetch_post.view_cost,
-            creation_cost=fetch_post.creation_cost,
-            replies=replies
-        )
+        return await PostHydrator.hydrate_one(fetch_post)
     
     @staticmethod
     async def update_post(post_id: UUID, post_update: PostUpdate):
@@ -180,23 +167,16 @@ class PostService:
         
         if fetch_post is None:
             raise HTTPException(status_code=404, detail="Post not found")
-        await MentionRepository.delete_mentions_by_post_id(fetch_post.id)
-        
         if post_update.title is not None:
             fetch_post.title = post_update.title
+        previous_tags = None
         if post_update.tags is not None:
+            previous_tags = list(fetch_post.tags or [])
             fetch_post.tags = post_update.tags
         if post_update.content is not None:
             fetch_post.content = post_update.content
-            mentioned_user_list = extract_mention_data(fetch_post.content, "@")
-            if mentioned_user_list:
-                for mentioned_user in mentioned_user_list:
-                    await MentionRepository.create_mention({
-                        "id": uuid4(),
-                        "post_id": fetch_post.id,
-                        "mentioned_user_id": mentioned_user['id'],
-                        "created_at": datetime.now(timezone.utc),
-                    })
+            author = await get_loaders().users.load(fetch_post.user_id)
+            await MentionRepository.sync_mentions(fetch_post.id, None, mentioned_user_ids(fetch_post.content), author)
         if post_update.is_flagged is not None:
             fetch_post.is_flagged = post_update.is_flagged
         if post_update.ipfs_hash is not None:
@@ -206,7 +186,8 @@ class PostService:
         if post_update.creation_cost is not None:
             fetch_post.creation_cost = post_update.creation_cost
         fetch_post.updated_at = datetime.now(timezone.utc)
-        fetch_post.save()
+        await PostRepository.update_post(fetch_post, previous_tags)
+        content_search.index_post(fetch_post)
         return
     
     @staticmethod
@@ -214,7 +195,18 @@ class PostService:
         fetch_post = await PostRepository.get_post_by_id(post_id)
         if fetch_post is None:
             raise HTTPException(status_code=404, detail="Post not found")
-        fetch_post.delete()
+        _, _, replies = await asyncio.gather(
+            PostRepository.delete_post(fetch_post),
+            MentionRepository.delete_mentions_by_post_id(fetch_post.id),
+            ReplyRepository.delete_replies_by_post(fetch_post.id),
+        )
+        await asyncio.gather(*(
+            MentionRepository.delete_mentions_by_post_id(reply.id, fetch_post.id) for reply in replies
+        ))
+        ranked_feeds.forget_post(fetch_post.id)
+        content_search.remove("post", fetch_post.id)
+        for reply in replies:
+            content_search.remove("reply", reply.id)
         return
     
     @staticmethod
@@ -224,7 +216,7 @@ class PostService:
             parent_reply_id = reply.parent_reply_id or None
         except ValueError as exc:
             raise HTTPException(status_code=400, detail="Invalid user_id format") from exc
-        user = await UserRepository.get_by_user_id(user_uuid)
+        user = await get_loaders().users.load(user_uuid)
         if user is None:
             raise HTTPException(status_code=404, detail="User not found")
         new_reply = await ReplyRepository.create_reply({
@@ -238,16 +230,11 @@ class PostService:
             "ipfs_hash": None
         })
 
-        mentioned_user_list = extract_mention_data(new_reply.content, "@")
-        if mentioned_user_list:
-            for mentioned_user in mentioned_user_list:
-                await MentionRepository.create_mention({
-                    "id": uuid4(),
-                    "post_id": new_reply.id,
-                    "parent_post_id": reply.parent_post_id,
-                    "mentioned_user_id": mentioned_user['id'],
-                    "created_at": datetime.now(timezone.utc),
-                })
+        await MentionRepository.create_mentions(
+            new_reply.id, reply.parent_post_id, mentioned_user_ids(new_reply.content), user
+        )
+        await PostRepository.touch_activity(new_reply.parent_post_id)
+        content_search.index_reply(new_reply)
 
         return ReplyResponse(
             id=new_reply.id,
@@ -271,22 +258,12 @@ class PostService:
         if fetch_reply is None:
             raise HTTPException(status_code=404, detail="Reply not found")
         
-        await MentionRepository.delete_mentions_by_post_id(
-            reply_id, fetch_reply.parent_post_id
-        )
-        
         if reply_update.content is not None:
             fetch_reply.content = reply_update.content
-            mentioned_user_list = extract_mention_data(reply_update.content, "@")
-            if mentioned_user_list:
-                for mentioned_user in mentioned_user_list:
-                    await MentionRepository.create_mention({
-                        "id": uuid4(),
-                        "post_id": reply_id,
-                        "parent_post_id": fetch_reply.parent_post_id,
-                        "mentioned_user_id": mentioned_user['id'],
-                        "created_at": datetime.now(timezone.utc),
-                    })
+            author = await get_loaders().users.load(fetch_reply.user_id)
+            await MentionRepository.sync_mentions(
+                reply_id, fetch_reply.parent_post_id, mentioned_user_ids(reply_update.content), author
+            )
         if reply_update.is_flagged is not None:
             fetch_reply.is_flagged = reply_update.is_flagged
         if reply_update.ipfs_hash is not None:
@@ -296,7 +273,10 @@ class PostService:
         if reply_update.creation_cost is not None:
             fetch_reply.creation_cost = reply_update.creation_cost
         fetch_reply.updated_at = datetime.now(timezone.utc)
-        fetch_reply.save()
+        await asyncio.gather(
+            ReplyRepository.update_reply(fetch_reply), PostRepository.touch_activity(fetch_reply.parent_post_id)
+        )
+        content_search.index_reply(fetch_reply)
         return
 
     @staticmethod
@@ -304,7 +284,12 @@ class PostService:
         fetch_reply = await ReplyRepository.get_reply_by_id(reply_id)
         if fetch_reply is None:
             raise HTTPException(status_code=404, detail="Reply not found")
-        fetch_reply.delete()
+        await asyncio.gather(
+            ReplyRepository.delete_reply(fetch_reply),
+            MentionRepository.delete_mentions_by_post_id(fetch_reply.id, fetch_reply.parent_post_id),
+            PostRepository.touch_activity(fetch_reply.parent_post_id),
+        )
+        content_search.remove("reply", fetch_reply.id)
         return
     
     @staticmethod
@@ -328,36 +313,13 @@ class PostService:
     @staticmethod
     async def get_posts_by_user_id(user_id: UUID) -> List[PostResponse]:
         fetch_posts = await PostRepository.get_posts_by_userID(user_id)
-        vote_totals = await VoteRepository.calculate_vote_totals()
-        post_responses = []
-        for post in fetch_posts:
-            post_id = post.id
-            user = await UserRepository.get_by_user_id(post.user_id)
-            if user is None:
-                user_name = "Unknown User"
-            else:
-                user_name = user.display_name
-            upvotes = vote_totals.get(post_id, {}).get('upvotes', 0)
-            downvotes = vote_totals.get(post_id, {}).get('downvotes', 0)
-            replies = await PostService.get_replies_by_post_id(post.id)
-            badges = await BadgeRepository.get_badges_by_user_id(user.id)
-            user.badges = [badge.badge_name for badge in badges]
-            post_response = PostResponse(
-                id=post.id,
-                user=user,
-                title=post.title,
-                tags=post.tags,
-                content=post.content,
-                created_at=post.created_at,
-                updated_at=post.updated_at,
-                upvotes=upvotes,
-                downvotes=downvotes,
-                is_flagged=post.is_flagged,
-                ipfs_hash=post.ipfs_hash,
-                view_cost=post.view_cost,
-                creation_cost=post.creation_cost,
-                replies=replies
-            )
-            post_responses.append(post_response)
-            
-        return post_responses or []
\ No newline at end of file
+        return await PostHydrator.hydrate(fetch_posts)
+
+    @staticmethod
+    async def get_posts_by_user_page(user_id: UUID, page_size: int, cursor: Optional[str] = None) -> PostFeedPage:
+        after = decode_cursor(cursor, AUTHOR_CURSOR) if cursor else None
+        posts, next_cursor = await PostRepository.get_posts_by_user_page(user_id, page_size, after)
+        return PostFeedPage(
+            posts=await PostHydrator.hydrate(posts),
+            next_cursor=encode_cursor(next_cursor) if next_cursor else None
+        )
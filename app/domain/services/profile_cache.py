@@ -0,0 +1,91 @@
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+from app.core import async_cassandra as db
+from app.core.invalidation import USER_CHANGED, subscribe
+from app.domain.entities.user import User
+from app.domain.repositories.badge_repository import BadgeRepository
+from app.domain.repositories.user_repository import UserRepository
+from app.utils.cache import TTLCache
+
+PROFILE_CACHE_SIZE = 10000
+PROFILE_CACHE_TTL = 300
+
+class ProfileRecord:
+    __slots__ = ("user", "badges")
+
+    def __init__(self, user: User, badges: Optional[List[str]] = None):
+        self.user = user
+        self.badges = badges
+
+def detached(user: User) -> User:
+    """A copy of a cached row that callers may set attributes on or save."""
+    return db.instantiate(User, {name: getattr(user, name) for name in User._columns})
+
+class ProfileCache:
+    """
+    Process-wide cache of user rows together with their badge names.
+
+    Entries are dropped whenever a USER_CHANGED invalidation is published for the user, and
+    expire after PROFILE_CACHE_TTL seconds regardless. Callers always get copies of the
+    cached rows, never the rows themselves.
+    """
+
+    def __init__(self, maxsize: int = PROFILE_CACHE_SIZE, ttl: float = PROFILE_CACHE_TTL):
+        self._profiles: TTLCache[UUID, ProfileRecord] = TTLCache("profiles", maxsize, ttl)
+        self._wallets: TTLCache[str, UUID] = TTLCache("profile_wallets", maxsize, ttl)
+        # Bumped on every invalidation so a row read before a write is never stored after it
+        self.version = 0
+        subscribe(USER_CHANGED, self.invalidate)
+
+    def _store(self, user: User, version: int):
+        if version == self.version:
+            self._profiles.set(user.id, ProfileRecord(user))
+            self._wallets.set(user.wallet_address, user.id)
+
+    async def get_users(self, user_ids: Iterable[UUID]) -> Dict[UUID, User]:
+        user_ids = list(set(user_ids))
+        users = {user_id: record.user for user_id, record in self._profiles.get_many(user_ids).items()}
+        missing = [user_id for user_id in user_ids if user_id not in users]
+        if missing:
+            version = self.version
+            for user_id, user in (await UserRepository.get_by_user_ids(missing)).items():
+                self._store(user, version)
+                users[user_id] = user
+        return {user_id: detached(user) for user_id, user in users.items()}
+
+    async def get_user(self, user_id: UUID) -> Optional[User]:
+        return (await self.get_users([user_id])).get(user_id)
+
+    async def get_badges(self, user_ids: Iterable[UUID]) -> Dict[UUID, List[str]]:
+        user_ids = list(set(user_ids))
+        records = self._profiles.get_many(user_ids)
+        badges = {user_id: record.badges for user_id, record in records.items() if record.badges is not None}
+        missing = [user_id for user_id in user_ids if user_id not in badges]
+        if missing:
+            version = self.version
+            fetched = await BadgeRepository.get_badge_names_by_user_ids(missing)
+            for user_id, names in fetched.items():
+                badges[user_id] = names
+                if user_id in records and version == self.version:
+                    records[user_id].badges = names
+        return {user_id: list(names) for user_id, names in badges.items()}
+
+    async def get_by_wallet(self, wallet_address: str) -> Optional[User]:
+        user_id = self._wallets.get(wallet_address)
+        record = self._profiles.get(user_id) if user_id else None
+        if record is not None:
+            return detached(record.user)
+        version = self.version
+        user = await UserRepository.get_by_wallet_address(wallet_address)
+        if user is None:
+            return None
+        self._store(user, version)
+        return detached(user)
+
+    def invalidate(self, user_id: UUID):
+        self.version += 1
+        record = self._profiles.pop(user_id)
+        if record is not None:
+            self._wallets.pop(record.user.wallet_address)
+
+profile_cache = ProfileCache()
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+from app.domain.repositories.post_repository import PostRepository
+from app.domain.repositories.vote_repository import VoteRepository
+from app.utils.cache import TTLCache
+from app.utils.pagination import as_utc
+
+logger = logging.getLogger(__name__)
+
+SORT_MODES = ("hot", "top", "rising")
+
+# How many of the newest posts are ranked, and how often the snapshot is maintained.
+RANKING_CANDIDATES = 1000
+RANKING_REFRESH_SECONDS = 10
+RANKING_REBUILD_SECONDS = 300
+VOTE_COUNT_CHUNK = 100
+# Superseded snapshots stay readable this long so a cursor keeps paging the ordering it started on.
+SNAPSHOT_RETENTION_SECONDS = 600
+SNAPSHOT_RETENTION_COUNT = SNAPSHOT_RETENTION_SECONDS // RANKING_REFRESH_SECONDS + 1
+
+HOT_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+RISING_WINDOW_HOURS = 48
+
+def hot_score(upvotes: int, downvotes: int, created_ts: float, now: float) -> float:
+    score = upvotes - downvotes
+    order = math.log10(max(abs(score), 1))
+    sign = 1 if score > 0 else -1 if score < 0 else 0
+    return sign * order + (created_ts - HOT_EPOCH) / 45000
+
+def top_score(upvotes: int, downvotes: int, created_ts: float, now: float) -> float:
+    return upvotes - downvotes
+
+def rising_score(upvotes: int, downvotes: int, created_ts: float, now: float) -> float:
+    age_hours = max(now - created_ts, 0) / 3600
+    if age_hours > RISING_WINDOW_HOURS:
+        return float("-inf")
+    return (upvotes - downvotes) / math.pow(age_hours + 2, 1.8)
+
+SCORERS = {"hot": hot_score, "top": top_score, "rising": rising_score}
+
+class RankedFeeds:
+    """
+    In-memory snapshot of the ranked feeds.
+
+    A full rebuild loads the newest posts and their vote counters; between rebuilds, posts
+    touched by votes are re-counted and the lists re-sorted, so requests only slice a list.
+    Every re-sort produces a new snapshot with its own id. Superseded snapshots are kept for
+    SNAPSHOT_RETENTION_SECONDS, so offsets from a cursor always index the ordering they came from.
+    """
+
+    def __init__(self):
+        self._entries: Dict[UUID, List] = {}
+        self._ranked: Dict[str, List[UUID]] = {mode: [] for mode in SORT_MODES}
+        self._snapshot_id = ""
+        self._snapshots: TTLCache[str, Dict[str, List[UUID]]] = TTLCache(
+            "ranked_snapshots", SNAPSHOT_RETENTION_COUNT, SNAPSHOT_RETENTION_SECONDS
+        )
+        self._dirty: Set[UUID] = set()
+        # Posts noted (created_ts) or forgotten (None) while a rebuild is loading
+        self._pending: Optional[List[Tuple[UUID, Optional[float]]]] = None
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._built_at > 0
+
+    async def get_page(
+        self, sort: str, offset: int, limit: int, snapshot_id: Optional[str] = None
+    ) -> Tuple[str, List[UUID]]:
+        """
+        Slices one ranked list and returns it with the id of the snapshot it came from. Pass that
+        id back to page the same ordering; once it has expired the current snapshot is used.
+        """
+        if not self.ready:
+            async with self._lock:
+                if not self.ready:
+                    await self._build()
+        ranked = self._snapshots.get(snapshot_id) if snapshot_id else None
+        if ranked is None:
+            snapshot_id, ranked = self._snapshot_id, self._ranked
+        return snapshot_id, ranked[sort][offset:offset + limit]
+
+    def note_post(self, post_id: UUID, created_at: datetime):
+        created_ts = as_utc(created_at).timestamp()
+        self._entries[post_id] = [created_ts, 0, 0]
+        self._dirty.add(post_id)
+        if self._pending is not None:
+            self._pending.append((post_id, created_ts))
+
+    def note_vote(self, post_id: UUID):
+        if post_id in self._entries:
+            self._dirty.add(post_id)
+
+    def forget_post(self, post_id: UUID):
+        # Snapshots are never edited in place; the next re-sort drops the post
+        self._entries.pop(post_id, None)
+        if self._pending is not None:
+            self._pending.append((post_id, None))
+
+    async def rebuild(self):
+        async with self._lock:
+            await self._build()
+
+    async def _build(self):
+        # Votes and posts that arrive while loading stay dirty or pending and are applied on top
+        self._dirty.clear()
+        self._pending = []
+        try:
+            rows = await PostRepository.get_recent_feed_rows(RANKING_CANDIDATES)
+            counts = await self._load_counts(row.id for row in rows)
+            entries = {
+                row.id: [as_utc(row.created_at).timestamp(), counts[row.id]["upvotes"], counts[row.id]["downvotes"]]
+                for row in rows
+            }
+            for post_id, created_ts in self._pending:
+                if created_ts is None:
+                    entries.pop(post_id, None)
+                else:
+                    entries[post_id] = [created_ts, 0, 0]
+            self._entries = entries
+            self._resort()
+            self._built_at = time.monotonic()
+        finally:
+            self._pending = None
+
+    async def refresh(self):
+        """Re-counts only the posts voted on since the last refresh."""
+        async with self._lock:
+            dirty = [post_id for post_id in self._dirty if post_id in self._entries]
+            self._dirty.clear()
+            counts = await self._load_counts(dirty)
+            for post_id in dirty:
+                entry = self._entries.get(post_id)
+                if entry is not None:
+                    entry[1], entry[2] = counts[post_id]["upvotes"], counts[post_id]["downvotes"]
+            self._resort()
+
+    async def run(self):
+        while True:
+            try:
+                if time.monotonic() - self._built_at >= RANKING_REBUILD_SECONDS:
+                    await self.rebuild()
+                else:
+                    await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Failed to refresh ranked feeds: %s", e)
+            await asyncio.sleep(RANKING_REFRESH_SECONDS)
+
+    def _resort(self):
+        now = time.time()
+        ranked = {}
+        for mode, scorer in SCORERS.items():
+            scores = {
+                post_id: scorer(upvotes, downvotes, created_ts, now)
+                for post_id, (created_ts, upvotes, downvotes) in self._entries.items()
+            }
+            ranked[mode] = [
+                post_id for post_id in sorted(scores, key=scores.get, reverse=True)
+                if scores[post_id] != float("-inf")
+            ]
+        self._snapshot_id, self._ranked = uuid4().hex[:16], ranked
+        self._snapshots.set(self._snapshot_id, ranked)
+
+    @staticmethod
+    async def _load_counts(post_ids: Iterable[UUID]):
+        post_ids = list(post_ids)
+        chunks = await asyncio.gather(*(
+            VoteRepository.calculate_votes_by_ids(post_ids[start:start + VOTE_COUNT_CHUNK])
+            for start in range(0, len(post_ids), VOTE_COUNT_CHUNK)
+        ))
+        counts = {}
+        for chunk in chunks:
+            counts.update(chunk)
+        return counts
+
+ranked_feeds = RankedFeeds()
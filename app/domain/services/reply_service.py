@@ -0,0 +1,73 @@
+import asyncio
+from typing import Dict, List, Optional
+from uuid import UUID
+from app.domain.repositories.reply_repository import THREAD_CURSOR, ReplyRepository
+from app.domain.services.loaders import get_loaders
+from app.domain.services.post_hydrator import PostHydrator
+from app.models.post import ReplyNode, ReplyThreadPage
+from app.utils.pagination import decode_cursor, encode_cursor
+
+class ReplyService:
+    @staticmethod
+    async def get_thread(
+        post_id: UUID,
+        limit: int,
+        cursor: Optional[str] = None,
+        max_depth: int = 8,
+        per_level: int = 20,
+    ) -> ReplyThreadPage:
+        """
+        Loads the next window of a post's replies in creation order and nests it.
+
+        Replies whose parent was delivered on an earlier page come back as roots; clients attach
+        them using `parent_reply_id`.
+        """
+        after = decode_cursor(cursor, THREAD_CURSOR) if cursor else None
+        rows, next_cursor = await ReplyRepository.get_thread_page(post_id, limit, after)
+        loaders = get_loaders()
+        users, vote_totals = await asyncio.gather(
+            loaders.users.load_many(row.user_id for row in rows),
+            loaders.votes.load_many(row.id for row in rows),
+        )
+        nodes = [
+            PostHydrator.build_reply(row, users.get(row.user_id), vote_totals.get(row.id) or {}, model=ReplyNode)
+            for row in rows
+        ]
+        return ReplyThreadPage(
+            replies=ReplyService.build_tree(nodes, max_depth, per_level),
+            next_cursor=encode_cursor(next_cursor) if next_cursor else None
+        )
+
+    @staticmethod
+    def build_tree(nodes: List[ReplyNode], max_depth: int, per_level: int) -> List[ReplyNode]:
+        """
+        Nests replies given in creation order in a single pass.
+
+        A parent is always created before its replies, so it has been placed by the time its
+        children arrive. Replies deeper than `max_depth`, or past the first `per_level` children
+        of a reply, are left out together with their descendants and counted in the
+        `more_replies` of the nearest reply that was kept.
+        """
+        placed: Dict[str, ReplyNode] = {}
+        dropped: Dict[str, ReplyNode] = {}
+        roots: List[ReplyNode] = []
+        for node in nodes:
+            key = str(node.id)
+            parent_key = node.parent_reply_id
+            if parent_key in dropped:
+                anchor = dropped[key] = dropped[parent_key]
+                anchor.more_replies += 1
+                continue
+            parent = placed.get(parent_key) if parent_key else None
+            if parent is None:
+                node.depth = 0
+                roots.append(node)
+            elif parent.depth >= max_depth or len(parent.children) >= per_level:
+                parent.more_replies += 1
+                dropped[key] = parent
+                continue
+            else:
+                node.depth = parent.depth + 1
+                parent.children.append(node)
+            placed[key] = node
+        return roots
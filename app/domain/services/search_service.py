@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from fastapi import HTTPException, status
+from app.domain.entities.news import News
+from app.domain.entities.post import Post
+from app.domain.entities.reply import Reply
+from app.domain.repositories.news_repository import NewsRepository
+from app.domain.repositories.post_repository import PostRepository
+from app.domain.repositories.reply_repository import ReplyRepository
+from app.models.search import SearchHit, SearchPage
+from app.utils.content_analyzer import analyze_content
+from app.utils.pagination import as_utc, decode_cursor, encode_cursor
+from app.utils.search_index import InvertedIndex
+
+logger = logging.getLogger(__name__)
+
+SEARCH_KINDS = ("post", "reply", "news")
+
+# Writes made by other processes (the Discord bot, other API workers) only show up after a rebuild.
+SEARCH_REBUILD_SECONDS = 900
+# Until the first build succeeds, searches answer 503 and the build is retried this often.
+SEARCH_RETRY_SECONDS = 30
+SNIPPET_LENGTH = 200
+MAX_SEARCH_RESULTS = 1000
+REBUILD_YIELD_EVERY = 500
+
+# Term frequency multipliers per field
+TITLE_WEIGHT = 3.0
+TAG_WEIGHT = 2.0
+BODY_WEIGHT = 1.0
+
+DocKey = Tuple[str, UUID]
+
+@dataclass
+class SearchDocument:
+    kind: str
+    id: UUID
+    user_id: UUID
+    parent_post_id: Optional[UUID]
+    title: Optional[str]
+    snippet: str
+    tags: List[str]
+    created_at: datetime
+
+# A document and the weighted (text, weight) fields it is indexed under
+IndexEntry = Tuple[SearchDocument, List[Tuple[str, float]]]
+
+class ContentSearch:
+    """
+    Full-text search over posts, replies and news, held in process.
+
+    The services index each write as it happens; a periodic rebuild from Cassandra picks up
+    writes made elsewhere. Writes that land while a rebuild is loading are replayed onto the
+    new index before it replaces the old one.
+    """
+
+    def __init__(self):
+        self._index = InvertedIndex()
+        self._documents: Dict[DocKey, SearchDocument] = {}
+        # Writes seen while a rebuild is loading; None entries are removals
+        self._pending: Optional[List[Tuple[DocKey, Optional[IndexEntry]]]] = None
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._built_at > 0
+
+    def index_post(self, post: Post):
+        self._apply(post_document(post))
+
+    def index_reply(self, reply: Reply):
+        self._apply(reply_document(reply))
+
+    def index_news(self, news: News):
+        self._apply(news_document(news))
+
+    def remove(self, kind: str, doc_id: UUID):
+        key = (kind, doc_id)
+        self._index.remove(key)
+        self._documents.pop(key, None)
+        if self._pending is not None:
+            self._pending.append((key, None))
+
+    async def search(self, query: str, kinds: Tuple[str, ...], offset: int, limit: int) -> List[Tuple[SearchDocument, float]]:
+        """Searches the current index; only the background task builds it, so this never loads anything."""
+        documents = self._documents
+        results = self._index.search(
+            query,
+            offset + limit,
+            accept=lambda key: key[0] in kinds,
+            tiebreak=lambda key: as_utc(documents[key].created_at).timestamp(),
+        )
+        return [(documents[key], score) for key, score in results[offset:]]
+
+    async def rebuild(self):
+        async with self._lock:
+            self._pending = []
+            try:
+                posts, replies, news = await asyncio.gather(
+                    PostRepository.get_all_posts(), ReplyRepository.get_all_replies(), NewsRepository.get_all_news()
+                )
+                index, documents = InvertedIndex(), {}
+                entries = [post_document(post) for post in posts]
+                entries += [reply_document(reply) for reply in replies]
+                entries += [news_document(item) for item in news]
+                for count, (document, fields) in enumerate(entries, 1):
+                    self._add_to(index, documents, document, fields)
+                    if count % REBUILD_YIELD_EVERY == 0:
+                        # Let requests run while a large corpus is indexed
+                        await asyncio.sleep(0)
+                for key, entry in self._pending:
+                    if entry is None:
+                        index.remove(key)
+                        documents.pop(key, None)
+                    else:
+                        self._add_to(index, documents, *entry)
+                self._index, self._documents = index, documents
+                self._built_at = time.monotonic()
+            finally:
+                self._pending = None
+
+    async def run(self):
+        while True:
+            try:
+                await self.rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Failed to rebuild the search index: %s", e)
+            await asyncio.sleep(SEARCH_REBUILD_SECONDS if self.ready else SEARCH_RETRY_SECONDS)
+
+    def _apply(self, entry: IndexEntry):
+        self._add_to(self._index, self._documents, *entry)
+        if self._pending is not None:
+            self._pending.append(((entry[0].kind, entry[0].id), entry))
+
+    @staticmethod
+    def _add_to(index: InvertedIndex, documents: Dict[DocKey, SearchDocument], document: SearchDocument, fields):
+        key = (document.kind, document.id)
+        index.add(key, fields)
+        documents[key] = document
+
+def _entry(document: SearchDocument, body: str) -> IndexEntry:
+    fields = [(document.title or "", TITLE_WEIGHT), (" ".join(document.tags), TAG_WEIGHT), (body, BODY_WEIGHT)]
+    return document, fields
+
+def _merge_tags(tags: Optional[List[str]], extracted: List[str]) -> List[str]:
+    return list(dict.fromkeys([tag.lower() for tag in tags or []] + extracted))
+
+def post_document(post: Post) -> IndexEntry:
+    analysis = analyze_content(post.content or "")
+    return _entry(SearchDocument(
+        "post", post.id, post.user_id, None, post.title, analysis.plaintext[:SNIPPET_LENGTH],
+        _merge_tags(post.tags, analysis.tags), post.created_at
+    ), analysis.plaintext)
+
+def reply_document(reply: Reply) -> IndexEntry:
+    analysis = analyze_content(reply.content or "")
+    return _entry(SearchDocument(
+        "reply", reply.id, reply.user_id, reply.parent_post_id, None, analysis.plaintext[:SNIPPET_LENGTH],
+        analysis.tags, reply.created_at
+    ), analysis.plaintext)
+
+def news_document(news: News) -> IndexEntry:
+    analysis = analyze_content(news.content or "")
+    return _entry(SearchDocument(
+        "news", news.id, news.user_id, None, news.title, analysis.plaintext[:SNIPPET_LENGTH],
+        _merge_tags(news.tags, analysis.tags), news.created_at
+    ), analysis.plaintext)
+
+content_search = ContentSearch()
+
+class SearchService:
+    @staticmethod
+    async def search(query: str, kind: Optional[str], page_size: int, cursor: Optional[str] = None) -> SearchPage:
+        query = query.strip()
+        if not query:
+            raise ValueError("Search query cannot be empty")
+        if not content_search.ready:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The search index is still being built",
+                headers={"Retry-After": str(SEARCH_RETRY_SECONDS)},
+            )
+        after = decode_cursor(cursor, {"o": int}) if cursor else {"q": query, "k": kind, "o": 0}
+        if after.get("q") != query or after.get("k") != kind:
+            raise ValueError("Cursor does not belong to this search")
+        if after["o"] < 0:
+            raise ValueError("Invalid cursor")
+        offset = after["o"]
+        if offset >= MAX_SEARCH_RESULTS:
+            return SearchPage()
+        kinds = (kind,) if kind else SEARCH_KINDS
+        results = await content_search.search(query, kinds, offset, min(page_size + 1, MAX_SEARCH_RESULTS - offset))
+        hits = [
+            SearchHit(
+                kind=document.kind,
+                id=document.id,
+                user_id=document.user_id,
+                parent_post_id=document.parent_post_id,
+                title=document.title,
+                snippet=document.snippet,
+                tags=document.tags,
+                created_at=document.created_at,
+                score=round(score, 4),
+            )
+            for document, score in results[:page_size]
+        ]
+        next_cursor = {"q": query, "k": kind, "o": offset + page_size} if len(results) > page_size else None
+        return SearchPage(hits=hits, next_cursor=encode_cursor(next_cursor) if next_cursor else None)
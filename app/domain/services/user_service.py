@@ -1,31 +1,72 @@
-from typing import List
-from uuid import UUID, uuid4
+import asyncio
+from functools import partial
+from typing import List, Optional
+from uuid import UUID
 from datetime import datetime, timezone
 from fastapi import HTTPException, Query
-from app.domain.repositories.badge_repository import BadgeRepository
+from app.domain.entities.user import User
+from app.domain.repositories.follow_repository import FOLLOW_CURSOR, FollowRepository
 from app.domain.repositories.user_repository import UserRepository
-from app.schemas.user import UserResponse, UserUpdate
+from app.domain.services.badge_engine import FollowerAdded, badge_engine
+from app.domain.services.loaders import get_loaders
+from app.schemas.user import FollowEntry, FollowPage, UserResponse, UserUpdate
+from app.utils.conditional import Conditional, make_etag
+from app.utils.pagination import decode_cursor, encode_cursor
 
 class UserService:
     @staticmethod
     async def get_all_users() -> List[UserResponse]:
-        users = await UserRepository.get_all_users()
+        return await UserService.with_profile_details(list(await UserRepository.get_all_users()))
+
+    @staticmethod
+    async def with_profile_details(users: List[User]) -> List[User]:
+        """Attaches badge names and follow counts for the response models."""
+        loaders = get_loaders()
+        user_ids = [user.id for user in users]
+        badges, follow_counts = await asyncio.gather(
+            loaders.badges.load_many(user_ids), loaders.follow_counts.load_many(user_ids)
+        )
         for user in users:
-            badges = await BadgeRepository.get_badges_by_user_id(user.id)
-            if badges:
-                user.badges = [badge.badge_name for badge in badges]
-            else:
-                user.badges = []
+            user.badges = badges.get(user.id) or []
+            user.follower_count = follow_counts[user.id]["follower_count"]
+            user.following_count = follow_counts[user.id]["following_count"]
         return users
     
+    @staticmethod
+    async def get_profile(user_id: UUID, conditional: Optional[Conditional] = None) -> UserResponse:
+        user = await get_loaders().users.load(user_id)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        user = (await UserService.with_profile_details([user]))[0]
+        if conditional:
+            # profile_version moves on every profile edit; badges and follow counts live in their own tables
+            conditional.check(
+                make_etag(user.id, user.profile_version, user.last_login, user.badges, user.follower_count, user.following_count),
+                cache_control="private, max-age=60",
+            )
+        return user
+
+    @staticmethod
+    async def is_display_name_available(display_name: str) -> bool:
+        return await UserRepository.is_display_name_available(display_name)
+
     @staticmethod
     async def update_user(user_id: UUID, user: UserUpdate) -> UserResponse:
         fetch_user = await UserRepository.get_by_user_id(user_id)
         if fetch_user is None:
             raise HTTPException(status_code=404, detail="User not found")
-        if user.display_name is not None:
+        old_display_name, old_wallet_address = fetch_user.display_name, fetch_user.wallet_address
+        claimed = []
+        if user.display_name is not None and user.display_name != old_display_name:
+            if not await UserRepository.claim_display_name(user.display_name, user_id):
+                raise HTTPException(status_code=400, detail="Display name already taken")
+            claimed.append(partial(UserRepository.release_display_name, user.display_name, user_id))
             fetch_user.display_name = user.display_name
-        if user.wallet_address is not None:
+        if user.wallet_address is not None and user.wallet_address != old_wallet_address:
+            if not await UserRepository.claim_wallet_address(user.wallet_address, user_id):
+                await asyncio.gather(*(release() for release in claimed))
+                raise HTTPException(status_code=400, detail="User with this wallet address already exists")
+            claimed.append(partial(UserRepository.release_wallet_address, user.wallet_address, user_id))
             fetch_user.wallet_address = user.wallet_address
         if user.bio is not None:
             fetch_user.bio = user.bio
@@ -35,59 +76,82 @@ class UserService:
             fetch_user.roles = user.roles
         if user.rank is not None:
             fetch_user.rank = user.rank
-        if user.followers is not None:
-            fetch_user.followers = user.followers
         fetch_user.updated_at = datetime.now(timezone.utc)
-        fetch_user.save()
-        badges = await BadgeRepository.get_badges_by_user_id(fetch_user.id)
-        fetch_user.badges = [badge.badge_name for badge in badges]
-        return fetch_user
+        fetch_user.profile_version = (fetch_user.profile_version or 0) + 1
+        try:
+            await UserRepository.save(fetch_user)
+        except Exception:
+            await asyncio.gather(*(release() for release in claimed))
+            raise
+        # The previous name and wallet are only given up once the user row points at the new ones
+        releases = []
+        if fetch_user.display_name != old_display_name:
+            releases.append(UserRepository.release_display_name(old_display_name, user_id))
+        if fetch_user.wallet_address != old_wallet_address:
+            releases.append(UserRepository.release_wallet_address(old_wallet_address, user_id))
+        await asyncio.gather(*releases)
+        return (await UserService.with_profile_details([fetch_user]))[0]
     
     @staticmethod
     async def add_follower(user_id: UUID, follower_id: UUID) -> UserResponse:
+        """Makes `user_id` a follower of `follower_id` and returns the followed user."""
         try:
-            print(user_id, follower_id)
             fetch_user = await UserRepository.get_by_user_id(follower_id)
             if fetch_user is None:
                 raise HTTPException(status_code=404, detail="User not found")
-            
-            if user_id not in fetch_user.followers:
-                fetch_user.followers.append(user_id)
-                fetch_user.save()
-                if len(fetch_user.followers) == 10:
-                    existing_badge = await BadgeRepository.get_badge_by_user_id_and_badge_name(fetch_user.id, "10 Followers")
-                    if existing_badge is None:
-                        await BadgeRepository.create_badge({
-                            "id": uuid4(),
-                            "user_id": fetch_user.id,
-                            "badge_name": "10 Followers",
-                            "created_at": datetime.now(timezone.utc)
-                        })
-                badges = await BadgeRepository.get_badges_by_user_id(fetch_user.id)
-                fetch_user.badges = [badge.badge_name for badge in badges]
-                return fetch_user
-            else:
+            if not await FollowRepository.follow(user_id, follower_id):
                 raise HTTPException(status_code=400, detail="User already follows this user")
-        
+
+            badge_engine.publish(FollowerAdded(follower_id))
+            return (await UserService.with_profile_details([fetch_user]))[0]
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error adding follower: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
-    
+
     @staticmethod
     async def remove_follower(user_id: UUID, follower_id: UUID) -> UserResponse:
         try:
             fetch_user = await UserRepository.get_by_user_id(follower_id)
             if fetch_user is None:
                 raise HTTPException(status_code=404, detail="User not found")
-            if user_id in fetch_user.followers:
-                fetch_user.followers.remove(user_id)
-                fetch_user.save()
-                badges = await BadgeRepository.get_badges_by_user_id(fetch_user.id)
-                fetch_user.badges = [badge.badge_name for badge in badges]
-                return fetch_user
-            else:
+            if not await FollowRepository.unfollow(user_id, follower_id):
                 raise HTTPException(status_code=400, detail="User does not follow this user")
-        
+            return (await UserService.with_profile_details([fetch_user]))[0]
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error removing follower: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
+
+    @staticmethod
+    async def get_followers(user_id: UUID, limit: int, cursor: Optional[str] = None) -> FollowPage:
+        rows, next_cursor = await FollowRepository.get_followers_page(
+            user_id, limit, decode_cursor(cursor, FOLLOW_CURSOR) if cursor else None
+        )
+        return await UserService._follow_page([(row.follower_id, row.followed_at) for row in rows], next_cursor)
+
+    @staticmethod
+    async def get_following(user_id: UUID, limit: int, cursor: Optional[str] = None) -> FollowPage:
+        rows, next_cursor = await FollowRepository.get_following_page(
+            user_id, limit, decode_cursor(cursor, FOLLOW_CURSOR) if cursor else None
+        )
+        return await UserService._follow_page([(row.followed_id, row.followed_at) for row in rows], next_cursor)
+
+    @staticmethod
+    async def _follow_page(follows, next_cursor: Optional[dict]) -> FollowPage:
+        users = await get_loaders().users.load_many(user_id for user_id, _ in follows)
+        return FollowPage(
+            users=[
+                FollowEntry(
+                    id=user_id,
+                    display_name=users[user_id].display_name,
+                    profile_photo_url=users[user_id].profile_photo_url,
+                    followed_at=followed_at,
+                )
+                for user_id, followed_at in follows
+                if users.get(user_id) is not None
+            ],
+            next_cursor=encode_cursor(next_cursor) if next_cursor else None,
+        )
@@ -1,23 +1,44 @@
 from typing import Dict, List
 from uuid import UUID
+from app.domain.repositories.post_repository import PostRepository
+from app.domain.repositories.reply_repository import ReplyRepository
 from app.domain.repositories.vote_repository import VoteRepository
 from app.domain.entities.vote import Vote
+from app.domain.services.badge_engine import VotesReceived, badge_engine
+from app.domain.services.ranking_service import ranked_feeds
+
+async def touch_post_activity(target_id: UUID):
+    """Votes target posts and replies alike; a vote on a reply counts as activity on its post."""
+    reply = await ReplyRepository.get_reply_by_id(target_id)
+    await PostRepository.touch_activity(reply.parent_post_id if reply else target_id)
 
 class VoteService:
     @staticmethod
     async def add_vote(post_id: UUID, user_id: UUID, vote_type: bool) -> Vote:
         """Add a new vote, ensuring no duplicate votes."""
-        return await VoteRepository.create_vote(post_id=post_id, user_id=user_id, vote_type=vote_type)
+        vote = await VoteRepository.create_vote(post_id=post_id, user_id=user_id, vote_type=vote_type)
+        ranked_feeds.note_vote(post_id)
+        await touch_post_activity(post_id)
+        if vote_type:
+            badge_engine.publish(VotesReceived(post_id))
+        return vote
 
     @staticmethod
     async def change_vote(post_id: UUID, user_id: UUID, vote_type: bool) -> Vote:
         """Change an existing vote (toggle between upvote and downvote)."""
-        return await VoteRepository.update_vote(post_id=post_id, user_id=user_id, vote_type=vote_type)
+        vote = await VoteRepository.update_vote(post_id=post_id, user_id=user_id, vote_type=vote_type)
+        ranked_feeds.note_vote(post_id)
+        await touch_post_activity(post_id)
+        if vote_type:
+            badge_engine.publish(VotesReceived(post_id))
+        return vote
 
     @staticmethod
     async def remove_vote(post_id: UUID, user_id: UUID) -> None:
         """Remove a vote."""
         await VoteRepository.delete_vote(post_id=post_id, user_id=user_id)
+        ranked_feeds.note_vote(post_id)
+        await touch_post_activity(post_id)
 
     @staticmethod
     async def calculate_votes_for_post(post_id: UUID) -> Dict[str, int]:
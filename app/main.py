@@ -1,4 +1,7 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from app.api.v1.endpoints import auth
 from app.api.v1.endpoints import user
@@ -6,14 +9,37 @@ from app.api.v1.endpoints import posts
 from app.api.v1.endpoints import news
 from app.api.v1.endpoints import votes
 from app.api.v1.endpoints import mentions
+from app.api.v1.endpoints import metrics
+from app.api.v1.endpoints import search
 from app.core.database import init_db
 from fastapi.middleware.cors import CORSMiddleware
 from app.middleware.auth_middleware import AuthMiddleware
+from app.middleware.loader_middleware import RequestLoadersMiddleware
+from app.middleware.compression_middleware import CompressionMiddleware
+from app.domain.services.badge_engine import badge_engine
+from app.domain.services.ranking_service import ranked_feeds
+from app.domain.services.search_service import content_search
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background jobs that keep in-process snapshots fresh
+    tasks = [
+        asyncio.create_task(ranked_feeds.run()),
+        asyncio.create_task(badge_engine.run()),
+        asyncio.create_task(content_search.run()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    # Let the cancellations finish before the loop closes
+    await asyncio.gather(*tasks, return_exceptions=True)
 
 app = FastAPI(
     title="Social Platform API",
     description="API for social platform with Cassandra database",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -25,6 +51,9 @@ app.add_middleware(
 )
 
 app.add_middleware(AuthMiddleware)
+app.add_middleware(RequestLoadersMiddleware)
+# Outermost, so every response (including CORS and auth errors) leaves through it
+app.add_middleware(CompressionMiddleware)
 
 init_db()
 
@@ -38,6 +67,8 @@ app.include_router(posts.post_router, prefix="/api/v1", tags=["Posts And Replies
 app.include_router(mentions.mention_router, prefix="/api/v1", tags=["Mentions"])
 app.include_router(news.news_router, prefix="/api/v1", tags=["News"])
 app.include_router(votes.vote_router, prefix="/api/v1", tags=["Votes"])
+app.include_router(search.search_router, prefix="/api/v1", tags=["Search"])
+app.include_router(metrics.metrics_router, prefix="/api/v1", tags=["Metrics"])
 
 @app.get("/healthcheck")
 async def healthcheck():
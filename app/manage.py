@@ -0,0 +1,92 @@
+# app/manage.py
+import argparse
+import asyncio
+import logging
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import init_db
+from app.domain.repositories.badge_repository import BadgeRepository
+from app.domain.repositories.follow_repository import FollowRepository
+from app.domain.repositories.mention_repository import MentionRepository
+from app.domain.repositories.news_repository import NewsRepository
+from app.domain.repositories.post_repository import PostRepository
+from app.domain.repositories.reply_repository import ReplyRepository
+from app.domain.repositories.user_repository import UserRepository
+from app.domain.repositories.vote_repository import VoteRepository
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COMMANDS = {}
+
+def command(name: str):
+    """Registers a maintenance coroutine under a command-line name."""
+    def register(func):
+        COMMANDS[name] = func
+        return func
+    return register
+
+@command("backfill-post-feed")
+async def backfill_post_feed():
+    count = await PostRepository.backfill_feed()
+    logger.info("Wrote feed rows for %d posts", count)
+
+@command("backfill-posts-by-user")
+async def backfill_posts_by_user():
+    users = await PostRepository.backfill_posts_by_user()
+    logger.info("Rebuilt posts_by_user and post counters for %d users", users)
+
+@command("backfill-replies-by-post")
+async def backfill_replies_by_post():
+    replies = await ReplyRepository.backfill_replies_by_post()
+    logger.info("Copied %d replies into replies_by_post", replies)
+
+@command("reconcile-vote-counts")
+async def reconcile_vote_counts():
+    adjusted = await VoteRepository.reconcile_vote_counts()
+    logger.info("Adjusted vote counters for %d posts and replies", adjusted)
+
+@command("backfill-user-lookups")
+async def backfill_user_lookups():
+    conflicts = await UserRepository.backfill_lookup_tables()
+    for conflict in conflicts:
+        logger.warning("Already claimed by another user: %s", conflict)
+    logger.info("Claimed wallet addresses and display names (%d conflicts)", len(conflicts))
+
+@command("backfill-follows")
+async def backfill_follows():
+    follows = await FollowRepository.backfill_follows()
+    logger.info("Copied %d follows into followers_by_user / following_by_user", follows)
+
+@command("backfill-badges-by-user")
+async def backfill_badges_by_user():
+    badges = await BadgeRepository.backfill_badges_by_user()
+    logger.info("Copied %d badges into badges_by_user", badges)
+
+@command("backfill-mentions-by-user")
+async def backfill_mentions_by_user():
+    mentions = await MentionRepository.backfill_mentions_by_user()
+    logger.info("Copied %d mentions into mentions_by_user", mentions)
+
+@command("backfill-posts-by-tag")
+async def backfill_posts_by_tag():
+    tagged = await PostRepository.backfill_posts_by_tag()
+    logger.info("Copied %d tagged posts into posts_by_tag", tagged)
+
+@command("backfill-news-by-day")
+async def backfill_news_by_day():
+    news = await NewsRepository.backfill_news_by_day()
+    logger.info("Copied %d news items into news_by_day", news)
+
+def main():
+    parser = argparse.ArgumentParser(description="Lascaux maintenance commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    init_db()
+    asyncio.run(COMMANDS[args.command]())
+
+if __name__ == "__main__":
+    main()
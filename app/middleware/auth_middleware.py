@@ -1,33 +1,102 @@
+import hashlib
 import os
 import sys
+import time
+from typing import Optional, Set
+from uuid import UUID
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from fastapi import Request, HTTPException, status
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
 from jose import JWTError, jwt
-from starlette.middleware.base import BaseHTTPMiddleware
-from app.domain.repositories.user_repository import UserRepository
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.invalidation import USER_CHANGED, subscribe
 from app.core.security import SECRET_KEY, ALGORITHM
+from app.domain.entities.user import User
+from app.domain.services.profile_cache import profile_cache
+from app.utils.cache import TTLCache
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        authorization: str = request.headers.get("Authorization")
-        if authorization:
-            try:
-                scheme, token = authorization.split()
-                if scheme.lower() != "bearer":
-                    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication scheme")
-                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                wallet_address: str = payload.get("sub")
-                if wallet_address is None:
-                    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
-                user = await UserRepository.get_by_wallet_address(wallet_address)
-                if user is None:
-                    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-                # Attach user to request state
-                request.state.user = user
-            except (JWTError, ValueError) as exc:
-                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
-        else:
-            request.state.user = None
-        response = await call_next(request)
-        return response
+# Verified tokens are trusted for at most this long before the JWT is decoded again.
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_TTL = 60
+
+class AuthMiddleware:
+    """
+    Resolves the bearer token of each HTTP request to a user on `request.state.user`.
+
+    Verified tokens are cached by digest until they expire (or TOKEN_CACHE_TTL passes), so a
+    repeated token costs neither a JWT decode nor a user lookup. USER_CHANGED drops the
+    cached tokens of that user.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._tokens: TTLCache[bytes, User] = TTLCache("auth_tokens", TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+        # Bounded and expired like the tokens it indexes
+        self._digests_by_user: TTLCache[UUID, Set[bytes]] = TTLCache(
+            "auth_token_digests", TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL
+        )
+        subscribe(USER_CHANGED, self.invalidate_user)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        authorization = self._get_authorization(scope)
+        try:
+            user = await self._authenticate(authorization) if authorization else None
+        except HTTPException as exc:
+            response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code)
+            await response(scope, receive, send)
+            return
+        scope.setdefault("state", {})["user"] = user
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _get_authorization(scope: Scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                return value.decode("latin-1")
+        return None
+
+    async def _authenticate(self, authorization: str) -> User:
+        try:
+            scheme, token = authorization.split()
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
+        if scheme.lower() != "bearer":
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication scheme")
+
+        digest = hashlib.sha256(token.encode()).digest()
+        user = self._tokens.get(digest)
+        if user is not None:
+            return user
+
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError as exc:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
+        wallet_address: str = payload.get("sub")
+        if wallet_address is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+        user = await profile_cache.get_by_wallet(wallet_address)
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        self._remember(digest, user, payload.get("exp"))
+        return user
+
+    def _remember(self, digest: bytes, user: User, expires_at: Optional[int]):
+        ttl = TOKEN_CACHE_TTL
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+        self._tokens.set(digest, user, ttl=ttl)
+        # Drop digests that already expired or were evicted so each user's set stays small.
+        digests = {known for known in self._digests_by_user.get(user.id, ()) if known in self._tokens}
+        digests.add(digest)
+        self._digests_by_user.set(user.id, digests)
+
+    def invalidate_user(self, user_id: UUID):
+        for digest in self._digests_by_user.pop(user_id, ()):
+            self._tokens.pop(digest)
@@ -0,0 +1,124 @@
+import hashlib
+from typing import Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.utils.cache import TTLCache
+from app.utils.compression import MINIMUM_SIZE, StreamCompressor, compress, is_compressible, negotiate
+
+# Compressed bodies of responses carrying an ETag, keyed by a digest of the uncompressed bytes.
+COMPRESSED_CACHE_SIZE = 256
+COMPRESSED_CACHE_TTL = 300
+MAX_CACHED_BODY = 1024 * 1024
+
+CacheKey = Tuple[bytes, str]
+
+class CompressionMiddleware:
+    """
+    Compresses responses with brotli or gzip, as negotiated through Accept-Encoding.
+
+    Only allowlisted content types of at least MINIMUM_SIZE bytes are compressed, and responses
+    that already carry a Content-Encoding pass through untouched. GET responses with an ETag
+    keep their compressed body in the "compressed_responses" cache, keyed by a digest of the
+    uncompressed body and the encoding, so a representation is compressed once however often
+    it is served. The ETag is weak and does not cover every byte; the digest does, and hashing
+    costs far less than compressing.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressed_bodies: TTLCache[CacheKey, bytes] = TTLCache(
+            "compressed_responses", COMPRESSED_CACHE_SIZE, COMPRESSED_CACHE_TTL
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingSend(self, scope, encoding, send)
+        await self.app(scope, receive, responder)
+
+class _CompressingSend:
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, encoding: str, send: Send):
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        # "pending" until the first body chunk decides; then "identity" or "compress"
+        self.mode = "pending"
+        self.compressor: Optional[StreamCompressor] = None
+
+    async def __call__(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.mode == "pending":
+            await self._begin(body, more_body)
+        elif self.mode == "identity":
+            await self.send(message)
+        elif self.mode == "compress":
+            await self._send_compressed(self.compressor.process(body), more_body)
+
+    async def _begin(self, body: bytes, more_body: bool):
+        headers = MutableHeaders(raw=self.start["headers"])
+        if not self._should_compress(headers, body, more_body):
+            self.mode = "identity"
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        self._set_encoding_headers(headers)
+        self.mode = "compress"
+        if not more_body:
+            compressed = self._compress_once(headers, body)
+            headers["Content-Length"] = str(len(compressed))
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": compressed, "more_body": False})
+            return
+
+        # Streamed bodies are compressed as they arrive and never cached
+        del headers["Content-Length"]
+        self.compressor = StreamCompressor(self.encoding)
+        await self.send(self.start)
+        await self._send_compressed(self.compressor.process(body), more_body)
+
+    def _compress_once(self, headers: MutableHeaders, body: bytes) -> bytes:
+        if "etag" not in headers or self.scope["method"] != "GET" or len(body) > MAX_CACHED_BODY:
+            return compress(body, self.encoding)
+        cache_key = (hashlib.blake2b(body, digest_size=16).digest(), self.encoding)
+        compressed = self.middleware.compressed_bodies.get(cache_key)
+        if compressed is None:
+            compressed = compress(body, self.encoding)
+            self.middleware.compressed_bodies.set(cache_key, compressed)
+        return compressed
+
+    async def _send_compressed(self, chunk: bytes, more_body: bool):
+        if not more_body:
+            chunk += self.compressor.finish()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        status = self.start["status"]
+        if status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        if not is_compressible(headers.get("content-type", "")):
+            return False
+        return more_body or len(body) >= self.middleware.minimum_size
+
+    def _set_encoding_headers(self, headers: MutableHeaders):
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
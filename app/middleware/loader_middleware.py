@@ -0,0 +1,18 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.domain.services.loaders import Loaders, request_loaders
+
+class RequestLoadersMiddleware:
+    """Gives every HTTP request its own set of batching loaders."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = request_loaders.set(Loaders())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_loaders.reset(token)
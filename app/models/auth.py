@@ -18,7 +18,7 @@ class Token(BaseModel):
     access_token: str
     refresh_token: str
     token_type: str = "bearer"
-    user_info: dict
+    user_info: "UserInfo"
     
 class TokenVerifyRequest(BaseModel):
     token: str
@@ -40,5 +40,10 @@ class UserInfo(BaseModel):
     roles: List[str] = ["general"]
     invited_by: Optional[UUID]
     rank: Optional[str] = None
-    followers: List[UUID] = []
+    follower_count: int = 0
+    following_count: int = 0
     badges: List[str] = []
+
+    model_config = {'from_attributes': True}
+
+Token.model_rebuild()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
@@ -12,7 +12,7 @@ class MentionCreate(BaseModel):
 class MentionResponse(BaseModel):
     id: UUID
     user_id: UUID
-    profile_avatar_url: str
+    profile_avatar_url: str | None
     post_id: UUID
     parent_post_id: UUID | None
     mentioned_user_id: UUID
@@ -22,4 +22,14 @@ class MentionResponse(BaseModel):
     model_config = {'from_attributes': True}
 
 class MentionIds(BaseModel):
-    mention_ids: List[List[str]] 
\ No newline at end of file
+    mention_ids: List[List[str]]
+
+class MentionPage(BaseModel):
+    mentions: List[MentionResponse]
+    unread_count: int
+    next_cursor: str | None = None
+
+class MentionReadResult(BaseModel):
+    found: int
+    marked: int
+    mentions: Optional[List[MentionResponse]] = None
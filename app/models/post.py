@@ -18,7 +18,7 @@ class ReplyResponse(BaseModel):
     user_id: UUID
     user_name: str
     content: str
-    profile_photo_url: str
+    profile_photo_url: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     upvotes: int = 0
@@ -38,9 +38,27 @@ class PostResponse(PostBase):
     view_cost: Decimal = Decimal("0.0")
     creation_cost: Decimal = Decimal("0.0")
     replies: List[ReplyResponse] = []
+    reply_count: int = 0
     
     model_config = {'from_attributes': True}
 
+class ReplyNode(ReplyResponse):
+    depth: int = 0
+    children: List["ReplyNode"] = []
+    more_replies: int = 0
+
+class ReplyThreadPage(BaseModel):
+    replies: List[ReplyNode] = []
+    next_cursor: Optional[str] = None
+
+class PostFeedPage(BaseModel):
+    posts: List[PostResponse] = []
+    next_cursor: Optional[str] = None
+
+class TagCount(BaseModel):
+    tag: str
+    post_count: int
+
 class PostCreate(BaseModel):
     user_id: str
     title: str
@@ -0,0 +1,21 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+
+SearchKind = Literal["post", "reply", "news"]
+
+class SearchHit(BaseModel):
+    kind: SearchKind
+    id: UUID
+    user_id: UUID
+    parent_post_id: Optional[UUID] = None
+    title: Optional[str] = None
+    snippet: str
+    tags: List[str] = []
+    created_at: datetime
+    score: float
+
+class SearchPage(BaseModel):
+    hits: List[SearchHit] = []
+    next_cursor: Optional[str] = None
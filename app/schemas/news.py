@@ -29,8 +29,12 @@ class NewsResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
     tags: List[str] = Field(default_factory=list) 
-    image_url: str
+    image_url: Optional[str] = None
 
     model_config = {'from_attributes': True}
 
+class NewsPage(BaseModel):
+    news: List[NewsResponse] = []
+    next_cursor: Optional[str] = None
+
 
@@ -10,7 +10,6 @@ class UserBase(BaseModel):
     profile_photo_url: Optional[str] = Field(None, description="URL for the user's profile photo")
     roles: List[str] = Field(default=["general"], description="Roles assigned to the user")
     rank: Optional[str] = Field(None, description="Rank of the user")
-    followers: List[UUID] = Field(default=[], description="List of followers the user has")
 
 class UserCreate(UserBase):
     signature: str
@@ -24,7 +23,6 @@ class UserUpdate(BaseModel):
     profile_photo_url: Optional[str] = Field(None, description="Updated profile photo URL of the user")
     roles: Optional[List[str]] = Field(None, description="Updated roles assigned to the user")
     rank: Optional[str] = Field(None, description="Updated rank of the user")
-    followers: Optional[List[UUID]] = Field(None, description="Updated followers of the user")
 
 class UserResponse(UserBase):
     id: UUID = Field(..., description="The unique identifier of the user")
@@ -32,6 +30,17 @@ class UserResponse(UserBase):
     last_login: Optional[datetime] = Field(None, description="The last login time of the user")
     invited_by: Optional[UUID] = Field(None, description="The UUID of the user who invited this user")
     badges: List[str] = Field(default=[], description="List of badges the user has")
+    follower_count: int = Field(default=0, description="Number of users following this user")
+    following_count: int = Field(default=0, description="Number of users this user follows")
 
     model_config = {'from_attributes': True}
-    
+
+class FollowEntry(BaseModel):
+    id: UUID = Field(..., description="The unique identifier of the user")
+    display_name: str = Field(..., description="The display name of the user")
+    profile_photo_url: Optional[str] = Field(None, description="URL for the user's profile photo")
+    followed_at: Optional[datetime] = Field(None, description="When the follow started")
+
+class FollowPage(BaseModel):
+    users: List[FollowEntry]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,68 @@
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+from fastapi import HTTPException, Request, Response
+from app.utils.pagination import as_utc
+
+def make_etag(*parts: Any) -> str:
+    """A weak ETag over the validator values a response is built from."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+def http_date(value: datetime) -> str:
+    return format_datetime(as_utc(value).replace(microsecond=0), usegmt=True)
+
+class NotModified(HTTPException):
+    def __init__(self, headers: Dict[str, str]):
+        super().__init__(status_code=304, headers=headers)
+
+class Conditional:
+    """
+    If-None-Match / If-Modified-Since handling for one GET request, used as a dependency.
+
+    Services call `check` with validators computed from cheap lookups, before building the
+    response, and `check` raises NotModified when the client's copy is current. Endpoints
+    then `apply` the same validators to the full response.
+    """
+
+    def __init__(self, request: Request):
+        self.if_none_match = request.headers.get("if-none-match")
+        self.if_modified_since = request.headers.get("if-modified-since")
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[datetime] = None
+        self.cache_control = "no-cache"
+
+    def check(self, etag: str, last_modified: Optional[datetime] = None, cache_control: str = "no-cache"):
+        self.etag, self.last_modified, self.cache_control = etag, last_modified, cache_control
+        if self._is_current():
+            raise NotModified(self.headers())
+
+    def headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag is not None:
+            headers["ETag"] = self.etag
+            headers["Cache-Control"] = self.cache_control
+        if self.last_modified is not None:
+            headers["Last-Modified"] = http_date(self.last_modified)
+        return headers
+
+    def apply(self, response: Response):
+        response.headers.update(self.headers())
+
+    def _is_current(self) -> bool:
+        # If-None-Match takes precedence; If-Modified-Since is only consulted without it
+        if self.if_none_match is not None:
+            if self.if_none_match.strip() == "*":
+                return True
+            opaque = self.etag.removeprefix("W/")
+            return any(tag.strip().removeprefix("W/") == opaque for tag in self.if_none_match.split(","))
+        if self.if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(self.if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return as_utc(self.last_modified).replace(microsecond=0) <= since
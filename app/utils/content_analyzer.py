@@ -0,0 +1,106 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import orjson
+
+# Nodes nested deeper than this are not walked; Lexical documents from the editor stay far below it.
+MAX_DEPTH = 64
+
+MENTION_NODE = "beautifulMention"
+TEXT_NODES = ("text", "hashtag", "code-highlight")
+BLOCK_NODES = ("paragraph", "heading", "quote", "listitem", "code")
+
+HASHTAG_PATTERN = re.compile(r"#(\w{1,64})")
+
+_BLOCK_END = object()
+
+@dataclass
+class ContentAnalysis:
+    # Mention targets in document order, deduplicated by id
+    mentions: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    plaintext: str = ""
+    word_count: int = 0
+    tags: List[str] = field(default_factory=list)
+
+    @property
+    def mention_ids(self) -> List[str]:
+        return list(self.mentions)
+
+def analyze_content(content: str, trigger: str = "@", max_depth: int = MAX_DEPTH) -> ContentAnalysis:
+    """
+    Walks a Lexical JSON document once, without recursion, collecting mentions, plaintext,
+    word count and hashtags. Content that is not JSON at all is analyzed as plaintext.
+    """
+    analysis = ContentAnalysis()
+    try:
+        document = orjson.loads(content)
+    except orjson.JSONDecodeError:
+        # Malformed or absurdly nested documents yield nothing rather than their raw JSON
+        return _finish(analysis, [] if content.lstrip().startswith(("{", "[")) else [content])
+
+    parts: List[str] = []
+    stack = [(document, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if node is _BLOCK_END:
+            parts.append("\n")
+            continue
+        if isinstance(node, list):
+            if depth < max_depth:
+                stack.extend((item, depth + 1) for item in reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        node_type = node.get("type")
+        if node_type == MENTION_NODE:
+            node_trigger = node.get("trigger") or ""
+            parts.append(f"{node_trigger}{node.get('value') or ''}")
+            data = node.get("data")
+            if node_trigger == trigger and isinstance(data, dict):
+                mention_id = data.get("id")
+                # Ids come from client JSON; anything but a string (a list, a dict) is ignored
+                if isinstance(mention_id, str) and mention_id and mention_id not in analysis.mentions:
+                    analysis.mentions[mention_id] = {"id": mention_id, "avatar": data.get("avatar")}
+            continue
+        if node_type in TEXT_NODES:
+            text = node.get("text")
+            if isinstance(text, str):
+                parts.append(text)
+            continue
+        if node_type == "linebreak":
+            parts.append("\n")
+            continue
+
+        if depth >= max_depth:
+            continue
+        if node_type in BLOCK_NODES:
+            stack.append((_BLOCK_END, depth))
+        children = node.get("children")
+        if isinstance(children, list):
+            # Lexical element nodes keep all nested content under "children"
+            depth += 1
+            stack.extend([(child, depth) for child in reversed(children)])
+        else:
+            stack.extend(
+                (value, depth + 1) for value in reversed(list(node.values())) if isinstance(value, (dict, list))
+            )
+    return _finish(analysis, parts)
+
+def _finish(analysis: ContentAnalysis, parts: List[str]) -> ContentAnalysis:
+    analysis.plaintext = "".join(parts).strip()
+    analysis.word_count = len(analysis.plaintext.split())
+    analysis.tags = _hashtags(analysis.plaintext)
+    return analysis
+
+def _hashtags(text: str) -> List[str]:
+    tags = {}
+    for match in HASHTAG_PATTERN.finditer(text):
+        # Skip '#' inside words or runs such as "a#b" and "##b"; checked here because a
+        # lookbehind in the pattern makes the scan several times slower
+        start = match.start()
+        if start and (text[start - 1].isalnum() or text[start - 1] in "_#"):
+            continue
+        tags.setdefault(match.group(1).lower(), None)
+    return list(tags)
@@ -0,0 +1,60 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class DataLoader(Generic[K, V]):
+    """
+    Batches and deduplicates key lookups.
+
+    Keys requested during the same event-loop tick are handed to `batch_load` together,
+    and every key is memoized for the lifetime of the loader.
+    """
+
+    def __init__(self, batch_load: Callable[[List[K]], Awaitable[Dict[K, V]]]):
+        self._batch_load = batch_load
+        self._memo: Dict[K, asyncio.Future] = {}
+        self._pending: List[K] = []
+
+    async def load(self, key: K) -> Optional[V]:
+        future = self._memo.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._memo[key] = future
+            self._pending.append(key)
+            if len(self._pending) == 1:
+                loop.call_soon(self._schedule_dispatch)
+        return await future
+
+    async def load_many(self, keys: Iterable[K]) -> Dict[K, Optional[V]]:
+        keys = list(dict.fromkeys(keys))
+        values = await asyncio.gather(*(self.load(key) for key in keys))
+        return dict(zip(keys, values))
+
+    def prime(self, key: K, value: V):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._memo[key] = future
+
+    def clear(self, key: K):
+        self._memo.pop(key, None)
+
+    def _schedule_dispatch(self):
+        keys, self._pending = self._pending, []
+        asyncio.ensure_future(self._dispatch(keys))
+
+    async def _dispatch(self, keys: List[K]):
+        try:
+            results = await self._batch_load(keys)
+        except Exception as exc:
+            for key in keys:
+                future = self._memo.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+        for key in keys:
+            future = self._memo.get(key)
+            if future is not None and not future.done():
+                future.set_result(results.get(key))
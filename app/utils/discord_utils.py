@@ -1,8 +1,6 @@
 # discord_utils.py
 import os
 import uuid
-import asyncio
-from functools import partial
 
 from cassandra.cluster import Cluster, ExecutionProfile, EXEC_PROFILE_DEFAULT
 from cassandra.cqlengine import connection
@@ -117,9 +115,7 @@ async def on_message(message):
         )
 
         try:
-            loop = asyncio.get_running_loop()
-            create_news_func = partial(NewsService.create_news, news_create=news_create, user=user)
-            await loop.run_in_executor(None, create_news_func)
+            await NewsService.create_news(news_create=news_create, user=user)
             await message.channel.send(f"News titled '{title}' has been successfully saved to the platform.")
         except Exception as e:
             await message.channel.send(f"Failed to save news: {str(e)}")
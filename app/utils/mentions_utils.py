@@ -1,4 +1,4 @@
-import json
+from app.utils.content_analyzer import analyze_content
 
 def extract_mention_data(content: str, trigger: str):
     """
@@ -9,30 +9,6 @@ def extract_mention_data(content: str, trigger: str):
         trigger (str): The trigger to filter mentions (e.g., '@').
     
     Returns:
-        list: A list of dictionaries containing 'id' and 'avatar' for matching mentions.
+        list: A list of dictionaries containing 'id' and 'avatar' for matching mentions, one per mentioned id.
     """
-    mention_data = []
-    
-    try:
-        content_dict = json.loads(content)
-        
-        def traverse(node):
-            if isinstance(node, dict):
-                if node.get("type") == "beautifulMention" and node.get("trigger") == trigger:
-                    data = node.get("data", {})
-                    mention_data.append({
-                        "id": data.get("id"),
-                        "avatar": data.get("avatar")
-                    })
-                for key, value in node.items():
-                    traverse(value)
-            elif isinstance(node, list):
-                for item in node:
-                    traverse(item)
-        
-        traverse(content_dict)
-    
-    except json.JSONDecodeError as e:
-        print(f"Invalid JSON content: {e}")
-    
-    return mention_data
\ No newline at end of file
+    return list(analyze_content(content, trigger).mentions.values())
@@ -0,0 +1,47 @@
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+
+def encode_cursor(values: dict) -> str:
+    """Encodes a cursor payload into an opaque, URL-safe token."""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, fields: Optional[Dict[str, type]] = None) -> dict:
+    """
+    Decodes a token produced by `encode_cursor`, raising ValueError if it is malformed or is
+    missing any of `fields`, or holds a value of another type for one.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, dict):
+        raise ValueError("Invalid cursor")
+    for key, kind in (fields or {}).items():
+        value = values.get(key)
+        if not isinstance(value, kind) or isinstance(value, bool):
+            raise ValueError("Invalid cursor")
+    return values
+
+
+def as_utc(value: datetime) -> datetime:
+    """Cassandra returns naive UTC datetimes; make them timezone-aware."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def to_millis(value: datetime) -> int:
+    return int(as_utc(value).timestamp() * 1000)
+
+
+def from_millis(value: int) -> datetime:
+    try:
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+    except (OverflowError, OSError) as exc:
+        raise ValueError("Timestamp out of range") from exc
@@ -0,0 +1,136 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+MAX_TOKEN_LENGTH = 64
+
+# Standard BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# A prefix term expands to at most this many indexed terms, taken in sorted order.
+PREFIX_EXPANSIONS = 50
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) <= MAX_TOKEN_LENGTH]
+
+class InvertedIndex:
+    """
+    In-memory inverted index with BM25 ranking.
+
+    Documents are bags of weighted terms; a field can be boosted by passing a weight with its
+    text. The sorted term list lets the last query term match as a prefix.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Hashable, float]] = {}
+        self._doc_terms: Dict[Hashable, Dict[str, float]] = {}
+        self._doc_lengths: Dict[Hashable, float] = {}
+        self._total_length = 0.0
+        self._terms: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._doc_terms
+
+    def add(self, doc_id: Hashable, fields: Iterable[Tuple[str, float]]):
+        """Indexes (text, weight) pairs under `doc_id`, replacing anything indexed for it before."""
+        self.remove(doc_id)
+        frequencies: Counter = Counter()
+        for text, weight in fields:
+            for token in tokenize(text or ""):
+                frequencies[token] += weight
+        if not frequencies:
+            return
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._terms, term)
+            postings[doc_id] = frequency
+        length = sum(frequencies.values())
+        self._doc_terms[doc_id] = dict(frequencies)
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+
+    def remove(self, doc_id: Hashable):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+
+    def expand_prefix(self, prefix: str, limit: int = PREFIX_EXPANSIONS) -> List[str]:
+        start = bisect_left(self._terms, prefix)
+        expanded = []
+        for term in self._terms[start:start + limit]:
+            if not term.startswith(prefix):
+                break
+            expanded.append(term)
+        return expanded
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        prefix: bool = True,
+        accept: Optional[Callable[[Hashable], bool]] = None,
+        tiebreak: Optional[Callable[[Hashable], float]] = None,
+    ) -> List[Tuple[Hashable, float]]:
+        """
+        Returns up to `limit` (doc_id, score) pairs for documents matching every query term,
+        best first. With `prefix`, the last term also matches indexed terms starting with it.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._doc_terms:
+            return []
+        groups = [[token] if token in self._postings else [] for token in tokens]
+        if prefix:
+            groups[-1] = self.expand_prefix(tokens[-1])
+        if not all(groups):
+            return []
+
+        document_count = len(self._doc_terms)
+        average_length = self._total_length / document_count
+        # Each query term scores a document by its best matching expansion.
+        group_scores: List[Dict[Hashable, float]] = []
+        for group in groups:
+            scores: Dict[Hashable, float] = {}
+            for term in group:
+                postings = self._postings[term]
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[doc_id] / average_length)
+                    score = idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                    if score > scores.get(doc_id, 0.0):
+                        scores[doc_id] = score
+            group_scores.append(scores)
+
+        group_scores.sort(key=len)
+        totals = {}
+        for doc_id, score in group_scores[0].items():
+            if accept is not None and not accept(doc_id):
+                continue
+            for scores in group_scores[1:]:
+                other = scores.get(doc_id)
+                if other is None:
+                    break
+                score += other
+            else:
+                totals[doc_id] = score
+        if tiebreak is None:
+            best = heapq.nlargest(limit, totals, key=totals.get)
+        else:
+            best = heapq.nlargest(limit, totals, key=lambda doc_id: (totals[doc_id], tiebreak(doc_id)))
+        return [(doc_id, totals[doc_id]) for doc_id in best]
@@ -0,0 +1,72 @@
+"""
+Compares the old recursive `json` mention extractor with `analyze_content` on large Lexical
+documents. The analyzer also produces plaintext, word count and tags in the same pass.
+
+    python benchmarks/content_analyzer.py [--paragraphs 100 1000 5000] [--iterations 20]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from uuid import uuid4
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.content_analyzer import analyze_content
+
+def legacy_extract_mention_data(content: str, trigger: str):
+    mention_data = []
+    content_dict = json.loads(content)
+
+    def traverse(node):
+        if isinstance(node, dict):
+            if node.get("type") == "beautifulMention" and node.get("trigger") == trigger:
+                data = node.get("data", {})
+                mention_data.append({"id": data.get("id"), "avatar": data.get("avatar")})
+            for key, value in node.items():
+                traverse(value)
+        elif isinstance(node, list):
+            for item in node:
+                traverse(item)
+
+    traverse(content_dict)
+    return mention_data
+
+def build_document(paragraphs: int, users: int = 20) -> str:
+    user_ids = [str(uuid4()) for _ in range(users)]
+    children = []
+    for index in range(paragraphs):
+        user_id = user_ids[index % users]
+        children.append({
+            "type": "paragraph", "version": 1, "direction": "ltr", "format": "", "indent": 0,
+            "children": [
+                {"type": "text", "text": f"Paragraph {index} talks about the exhibition with ", "format": 0,
+                 "detail": 0, "mode": "normal", "style": "", "version": 1},
+                {"type": "beautifulMention", "trigger": "@", "value": f"user{index % users}", "version": 1,
+                 "data": {"id": user_id, "avatar": f"https://example.com/static/{user_id}.png"}},
+                {"type": "text", "text": " and a few more words before the tag ", "format": 0,
+                 "detail": 0, "mode": "normal", "style": "", "version": 1},
+                {"type": "hashtag", "text": f"#topic{index % 7}", "format": 0, "detail": 0,
+                 "mode": "normal", "style": "", "version": 1},
+            ],
+        })
+    return json.dumps({"root": {"type": "root", "version": 1, "children": children}})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'paragraphs':>10}{'bytes':>10}{'legacy ms':>12}{'analyzer ms':>13}{'speedup':>9}")
+    for paragraphs in args.paragraphs:
+        document = build_document(paragraphs)
+        legacy = timeit.timeit(lambda: legacy_extract_mention_data(document, "@"), number=args.iterations)
+        analyzer = timeit.timeit(lambda: analyze_content(document, "@"), number=args.iterations)
+        legacy_ms = legacy / args.iterations * 1000
+        analyzer_ms = analyzer / args.iterations * 1000
+        print(f"{paragraphs:>10}{len(document):>10}{legacy_ms:>12.2f}{analyzer_ms:>13.2f}{legacy_ms / analyzer_ms:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Serialization cost of one feed page of posts, each with a preview of replies.
+
+"before" mirrors the old path: validating constructors with the author read from attributes
+per post, then FastAPI's response_model handling (dump, re-validate, JSON-mode dict, json.dumps).
+"after" validates each author once and reuses the model, then writes bytes with pydantic-core and
+no second validation pass, as the hydrator and `json_response` now do. The constructors still
+validate: with pydantic 2.9 that runs in Rust and beats model_construct's Python loop.
+
+    python benchmarks/serialization.py [--posts 100] [--replies 5] [--iterations 50]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List, Union
+from uuid import uuid4
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pydantic import TypeAdapter
+from app.models.post import PostFeedPage, PostResponse, ReplyResponse
+from app.schemas.user import UserResponse
+
+RESPONSE_MODEL = TypeAdapter(Union[PostFeedPage, List[PostResponse]])
+
+def build_rows(posts: int, replies: int, authors: int = 20):
+    now = datetime.now(timezone.utc)
+    users = [
+        SimpleNamespace(
+            id=uuid4(), wallet_address=f"T{index:033d}", display_name=f"user{index}", bio="bio " * 20,
+            profile_photo_url=f"https://example.com/{index}.png", roles=["general"], rank="Novice",
+            created_at=now, last_login=now, invited_by=None, badges=["First Post", "10 Followers"],
+            follower_count=index * 3, following_count=index,
+        )
+        for index in range(authors)
+    ]
+    post_rows = []
+    for index in range(posts):
+        post_rows.append((
+            SimpleNamespace(
+                id=uuid4(), user_id=users[index % authors].id, title=f"Post {index}", tags=["tech", "finance"],
+                content='{"root":{"children":[{"type":"paragraph","children":[{"type":"text","text":"' + "lorem " * 80 + '"}]}]}}',
+                created_at=now, updated_at=None, is_flagged=False, ipfs_hash=None,
+                view_cost=Decimal("0.0"), creation_cost=Decimal("0.0"),
+            ),
+            [
+                SimpleNamespace(
+                    id=uuid4(), parent_post_id=uuid4(), parent_reply_id=None, user_id=users[(index + reply) % authors].id,
+                    content="a short reply " * 5, created_at=now, updated_at=None,
+                    view_cost=Decimal("0.0"), creation_cost=Decimal("0.0"),
+                )
+                for reply in range(replies)
+            ],
+        ))
+    return {user.id: user for user in users}, post_rows
+
+def reply_fields(reply, user):
+    return dict(
+        id=reply.id, parent_post_id=reply.parent_post_id, parent_reply_id=reply.parent_reply_id,
+        user_id=reply.user_id, user_name=user.display_name, profile_photo_url=user.profile_photo_url,
+        created_at=reply.created_at, updated_at=reply.updated_at, upvotes=1, downvotes=0, content=reply.content,
+        view_cost=reply.view_cost, creation_cost=reply.creation_cost,
+    )
+
+def post_fields(post, author, replies):
+    return dict(
+        id=post.id, user=author, title=post.title, tags=post.tags, content=post.content,
+        created_at=post.created_at, updated_at=post.updated_at, upvotes=3, downvotes=1,
+        is_flagged=post.is_flagged, ipfs_hash=post.ipfs_hash, view_cost=post.view_cost,
+        creation_cost=post.creation_cost, replies=replies, reply_count=len(replies),
+    )
+
+def before(users, post_rows) -> bytes:
+    page = PostFeedPage(
+        posts=[
+            PostResponse(**post_fields(
+                post, users[post.user_id],
+                [ReplyResponse(**reply_fields(reply, users[reply.user_id])) for reply in replies],
+            ))
+            for post, replies in post_rows
+        ],
+        next_cursor="cursor",
+    )
+    content = page.model_dump(by_alias=True)
+    value = RESPONSE_MODEL.validate_python(content)
+    jsonable = RESPONSE_MODEL.dump_python(value, mode="json", by_alias=True)
+    return json.dumps(jsonable, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+def after(users, post_rows) -> bytes:
+    authors = {user_id: UserResponse.model_validate(user) for user_id, user in users.items()}
+    page = PostFeedPage(
+        posts=[
+            PostResponse(**post_fields(
+                post, authors[post.user_id],
+                [ReplyResponse(**reply_fields(reply, users[reply.user_id])) for reply in replies],
+            ))
+            for post, replies in post_rows
+        ],
+        next_cursor="cursor",
+    )
+    return page.model_dump_json()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--replies", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    users, post_rows = build_rows(args.posts, args.replies)
+    old_body, new_body = before(users, post_rows), after(users, post_rows)
+    assert json.loads(old_body) == json.loads(new_body), "serialized pages differ"
+
+    old = min(timeit.repeat(lambda: before(users, post_rows), number=args.iterations, repeat=3)) / args.iterations
+    new = min(timeit.repeat(lambda: after(users, post_rows), number=args.iterations, repeat=3)) / args.iterations
+    print(f"{args.posts} posts x {args.replies} replies, {len(new_body)} bytes per page")
+    print(f"before  {old * 1000:8.2f} ms/page")
+    print(f"after   {new * 1000:8.2f} ms/page  ({old / new:.1f}x)")
+
+if __name__ == "__main__":
+    main()
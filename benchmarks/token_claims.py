@@ -0,0 +1,73 @@
+"""
+Compares access-token size and decode time for the old claims (full profile plus the
+followers list) and the slim claims minted by `create_access_token`.
+
+    python benchmarks/token_claims.py [--followers 0 100 1000] [--iterations 2000]
+
+One run with python-jose 3.3.0, 5000 iterations:
+
+    claims                       bytes   decode us
+    slim                           260        53.7
+    legacy (0 followers)           720        72.9
+    legacy (100 followers)        5919       142.6
+    legacy (1000 followers)      52719       818.0
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from jose import jwt
+
+SECRET_KEY = "benchmark_secret_key"
+ALGORITHM = "HS256"
+
+ROLE_DESCRIPTION = (
+    "General role is the default role given to every user. You'll be promoted based on your "
+    "activity and contributions to the platform."
+)
+
+def legacy_claims(followers: int) -> dict:
+    return {
+        "sub": "T" + "x" * 33,
+        "username": "benchmark_user",
+        "avatar": "https://example.com/static/avatars/benchmark_user.png",
+        "wallet_address": "T" + "x" * 33,
+        "bio": "A bio of reasonable length for a profile page.",
+        "roles": ["general"],
+        "rank": None,
+        "followers": [str(uuid4()) for _ in range(followers)],
+        "role": "general",
+        "role_description": ROLE_DESCRIPTION,
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=30),
+    }
+
+def slim_claims() -> dict:
+    return {
+        "sub": "T" + "x" * 33,
+        "uid": str(uuid4()),
+        "roles": ["general"],
+        "ver": 3,
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=30),
+    }
+
+def measure(claims: dict, iterations: int):
+    token = jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+    seconds = timeit.timeit(lambda: jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]), number=iterations)
+    return len(token), seconds / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--followers", type=int, nargs="+", default=[0, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'claims':<24}{'bytes':>10}{'decode us':>12}")
+    size, micros = measure(slim_claims(), args.iterations)
+    print(f"{'slim':<24}{size:>10}{micros:>12.1f}")
+    for followers in args.followers:
+        size, micros = measure(legacy_claims(followers), args.iterations)
+        print(f"{f'legacy ({followers} followers)':<24}{size:>10}{micros:>12.1f}")
+
+if __name__ == "__main__":
+    main()